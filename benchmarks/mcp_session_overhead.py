@@ -0,0 +1,118 @@
+"""
+Benchmark del overhead por llamada MCP: sesión nueva por llamada vs pool de sesiones persistentes.
+
+Levanta un servidor MCP stub local (fastmcp, transporte streamable HTTP) con una tool
+venta_chat que responde al instante, de modo que lo medido es solo el costo de sesión
+(conexión + initialize + cierre) más el call_tool.
+
+- per_call: tool de langchain-mcp-adapters obtenida con client.get_tools() (abre una sesión
+  por llamada; comportamiento anterior del orquestador).
+- pooled:   MCPSessionPool del orquestador (sesión persistente reutilizada).
+
+Uso (desde la raíz del repo):
+    python benchmarks/mcp_session_overhead.py --calls 200
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+import uvicorn
+from fastmcp import FastMCP
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from orquestador.integrations.mcp_session_pool import MCPSessionPool  # noqa: E402
+
+_ARGS = {"message": "hola", "session_id": 1, "context": {}}
+
+
+def _build_stub() -> FastMCP:
+    mcp = FastMCP("stub-venta")
+
+    @mcp.tool()
+    def venta_chat(message: str, session_id: int, context: dict) -> str:
+        """Tool de chat del agente de ventas (stub)."""
+        return f"ok: {message}"
+
+    return mcp
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int) -> uvicorn.Server:
+    app = _build_stub().http_app(path="/mcp")
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def _measure(call: Callable[[], Awaitable[object]], calls: int) -> List[float]:
+    await call()  # descarta la primera (imports, primera conexión)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name: str, samples: List[float]) -> float:
+    samples = sorted(samples)
+    mean = statistics.fmean(samples)
+    p50 = samples[len(samples) // 2]
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<10} mean={mean:7.2f} ms  p50={p50:7.2f} ms  p95={p95:7.2f} ms")
+    return mean
+
+
+async def _run(calls: int, url: str) -> None:
+    client = MultiServerMCPClient({"venta": {"transport": "http", "url": url}})
+
+    tools = await client.get_tools(server_name="venta")
+    tool = next(t for t in tools if t.name == "venta_chat")
+    per_call = await _measure(lambda: tool.ainvoke(_ARGS), calls)
+
+    pool = MCPSessionPool(client, "venta", size=1)
+
+    async def pooled_call():
+        async with pool.session() as session:
+            return await session.call_tool("venta_chat", _ARGS)
+
+    pooled = await _measure(pooled_call, calls)
+    await pool.aclose()
+
+    print(f"{calls} llamadas secuenciales a venta_chat ({url})")
+    before = _report("per_call", per_call)
+    after = _report("pooled", pooled)
+    print(f"Overhead evitado por llamada: {before - after:.2f} ms ({before / after:.1f}x más rápido)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = _start_server(port)
+    try:
+        asyncio.run(_run(args.calls, f"http://127.0.0.1:{port}/mcp"))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de huella de memoria del historial conversacional.
+
+Compara la representación anterior (lista de dicts con timestamp ISO, re-creada en cada add)
+con la actual (deque de Turn con __slots__) para N sesiones x M turnos.
+
+Uso (desde la raíz del repo):
+    python benchmarks/memory_footprint.py --sessions 10000 --turns 10
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from orquestador.services.memory import Turn  # noqa: E402
+
+_AGENTS = ("cita", None, "venta", None)
+
+
+def _legacy_store(sessions: int, turns: int) -> dict:
+    """Formato anterior: list[dict] con 4 claves + timestamp ISO, rebanado a history[-10:]."""
+    store = {}
+    for sid in range(sessions):
+        history = []
+        for t in range(turns):
+            history = list(history)
+            history.append({
+                "user": f"mensaje {t} de la sesión {sid}",
+                "agent": _AGENTS[t % len(_AGENTS)],
+                "response": f"respuesta {t}",
+                "timestamp": datetime.now().isoformat(),
+            })
+            history = history[-10:]
+        store[sid] = history
+    return store
+
+
+def _compact_store(sessions: int, turns: int) -> dict:
+    """Formato actual: deque(maxlen=10) de Turn (__slots__, agente IntEnum, timestamp float)."""
+    store = {}
+    for sid in range(sessions):
+        history = deque(maxlen=10)
+        for t in range(turns):
+            history.append(Turn(f"mensaje {t} de la sesión {sid}", _AGENTS[t % len(_AGENTS)], f"respuesta {t}"))
+        store[sid] = history
+    return store
+
+
+def _measure(builder, sessions: int, turns: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    store = builder(sessions, turns)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current
+
+
+def _measure_overhead(builder, sessions: int, turns: int) -> int:
+    """Memoria sin contar el texto de los mensajes (idéntico en ambos formatos)."""
+    total = _measure(builder, sessions, turns)
+    texts = _measure(
+        lambda s, t: [[f"mensaje {i} de la sesión {sid}" for i in range(t)] + [f"respuesta {i}" for i in range(t)]
+                      for sid in range(s)],
+        sessions, turns,
+    )
+    return total - texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+
+    n_turns = args.sessions * args.turns
+    legacy = _measure(_legacy_store, args.sessions, args.turns)
+    compact = _measure(_compact_store, args.sessions, args.turns)
+    legacy_overhead = _measure_overhead(_legacy_store, args.sessions, args.turns)
+    compact_overhead = _measure_overhead(_compact_store, args.sessions, args.turns)
+
+    print(f"{args.sessions} sesiones x {args.turns} turnos ({n_turns} turnos)")
+    print(f"{'formato':<28}{'total MB':>10}{'bytes/turno':>14}{'sin texto B/turno':>20}")
+    for name, total, overhead in (
+        ("list[dict] + ISO timestamp", legacy, legacy_overhead),
+        ("deque[Turn] (__slots__)", compact, compact_overhead),
+    ):
+        print(f"{name:<28}{total / 1e6:>10.2f}{total / n_turns:>14.0f}{overhead / n_turns:>20.0f}")
+    print(f"reducción total: {legacy / compact:.2f}x | sin texto: {legacy_overhead / compact_overhead:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
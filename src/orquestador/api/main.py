@@ -2,14 +2,13 @@
 
 import asyncio
 import json as _json_mod
+import math
 import os
 import sys
 import time
-import urllib.request
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
-
-from cachetools import TTLCache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
 
 # Permitir ejecución directa con python main.py
 # Si se ejecuta directamente (no como módulo), ajustar el path
@@ -22,121 +21,105 @@ if __package__ is None:
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, Response
+from sse_starlette.sse import EventSourceResponse
+from starlette.background import BackgroundTask
 
 # Importación que funciona tanto como módulo como script directo
 try:
     from ..config.models import ChatRequest, ChatResponse
     from ..config import config as app_config
-    from ..prompts import build_orquestador_system_prompt_with_memory, modalidad_to_agent
-    from ..integrations.llm import invoke_orquestador
-    from ..integrations.mcp_client import invoke_mcp_agent, get_circuit_breaker_states
+    from ..prompts import build_orquestador_messages, get_orquestador_prefix, modalidad_to_agent
+    from ..prompts.tokens import start_tokenizer_load
+    from ..integrations.llm import invoke_orquestador_messages
+    from ..integrations.rate_limiter import OpenAIThrottledError
+    from ..integrations.mcp_client import (
+        invoke_mcp_agent,
+        get_circuit_breaker_states,
+        get_tools_status,
+        reload_mcp_tools,
+        start_tools_refresher,
+        stop_tools_refresher,
+    )
+    from ..integrations.mcp_session_pool import close_session_pools
+    from ..integrations.contexto_negocio import fetch_contexto_negocio, close_http_client
     from ..services.memory import memory_manager
+    from ..services.router import fast_path_router
+    from ..services.decision_cache import decision_cache
+    from ..services.session_mailbox import SessionMailbox
+    from ..services.admission import admission_controller, AdmissionRejected, AdmissionTicket
+    from ..services import warmup
     from ..infrastructure.logging_config import get_logger
     from ..infrastructure import metrics as app_metrics
 except ImportError:
     from orquestador.config.models import ChatRequest, ChatResponse
     from orquestador.config import config as app_config
-    from orquestador.prompts import build_orquestador_system_prompt_with_memory, modalidad_to_agent
-    from orquestador.integrations.llm import invoke_orquestador
-    from orquestador.integrations.mcp_client import invoke_mcp_agent, get_circuit_breaker_states
+    from orquestador.prompts import build_orquestador_messages, get_orquestador_prefix, modalidad_to_agent
+    from orquestador.prompts.tokens import start_tokenizer_load
+    from orquestador.integrations.llm import invoke_orquestador_messages
+    from orquestador.integrations.rate_limiter import OpenAIThrottledError
+    from orquestador.integrations.mcp_client import (
+        invoke_mcp_agent,
+        get_circuit_breaker_states,
+        get_tools_status,
+        reload_mcp_tools,
+        start_tools_refresher,
+        stop_tools_refresher,
+    )
+    from orquestador.integrations.mcp_session_pool import close_session_pools
+    from orquestador.integrations.contexto_negocio import fetch_contexto_negocio, close_http_client
     from orquestador.services.memory import memory_manager
+    from orquestador.services.router import fast_path_router
+    from orquestador.services.decision_cache import decision_cache
+    from orquestador.services.session_mailbox import SessionMailbox
+    from orquestador.services.admission import admission_controller, AdmissionRejected, AdmissionTicket
+    from orquestador.services import warmup
     from orquestador.infrastructure.logging_config import get_logger
     from orquestador.infrastructure import metrics as app_metrics
 
 logger = get_logger("main")
 
-# Cache con TTL y límite de tamaño para evitar memory leak en producción multiempresa.
-# maxsize=500 → máximo 500 empresas en memoria simultáneamente (LRU eviction al superar límite)
-# ttl=3600    → cada entrada expira automáticamente a la 1 hora (evita datos obsoletos)
-_contexto_cache: TTLCache = TTLCache(maxsize=500, ttl=3600)  # id_empresa -> contexto (str)
+# Turnos serializados por session_id, con agrupación opcional de ráfagas
+_session_mailbox = SessionMailbox(window_seconds=app_config.CHAT_COALESCE_WINDOW_MS / 1000)
 
-# Circuit breaker: también acotado con TTL (5 min) para auto-reset de fallos antiguos
-_contexto_failures: TTLCache = TTLCache(maxsize=500, ttl=300)  # id_empresa -> failure_count (int)
-_contexto_failure_threshold = 3
+# Emisor de eventos del flujo chat (endpoint streaming): (nombre_evento, payload) -> None
+ChatEventEmitter = Callable[[str, Dict[str, Any]], Awaitable[None]]
 
-
-def _is_contexto_circuit_open(id_empresa: int) -> bool:
-    """Verifica si el circuit breaker para contexto está abierto.
-    
-    TTLCache expira automáticamente entradas viejas (ttl=300s),
-    por lo que no necesitamos comparar timestamps manualmente.
-    """
-    failure_count = _contexto_failures.get(id_empresa, 0)
-    return failure_count >= _contexto_failure_threshold
+# CORS - desde env o * como fallback (en producción especificar dominios)
+_cors_origins = os.getenv("CORS_ALLOWED_ORIGINS", "*").split(",")
+_cors_origins = [o.strip() for o in _cors_origins if o.strip()]
 
 
-def _fetch_contexto_negocio_sync(id_empresa: int) -> Optional[str]:
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """
-    Obtiene contexto de negocio con cache TTL + circuit breaker + retry con backoff.
-    Cachea incluso contexto vacío para evitar thrashing.
-    Se ejecuta en un thread separado (via asyncio.to_thread).
-    
-    TTLCache garantiza:
-    - Máximo 500 empresas en memoria (LRU eviction)
-    - Expiración automática a la 1 hora sin limpiezas manuales
+    Ciclo de vida de la app.
+    Arranque: lanza el warm-up en background (el server ya acepta conexiones, pero /health
+    responde 503 hasta que termine) y el refresher de tools MCP. Apagado: cancela ambos y
+    libera el pool HTTP, las sesiones MCP persistentes y las conexiones del backend de memoria.
     """
-    # 1. Verificar cache: TTLCache expira automáticamente, no necesitamos timestamp manual
-    if id_empresa in _contexto_cache:
-        contexto = _contexto_cache[id_empresa]
-        logger.debug(
-            "Contexto desde cache para id_empresa=%s (valor=%s)",
-            id_empresa, "vacío" if not contexto else "presente"
-        )
-        return contexto if contexto else None
-
-    # 2. Verificar circuit breaker
-    if _is_contexto_circuit_open(id_empresa):
-        logger.warning("Circuit abierto para contexto de negocio id_empresa=%s", id_empresa)
-        return None
-
-    # 3. Retry con backoff exponencial (hasta 2 intentos)
-    max_retries = 2
-
-    for attempt in range(max_retries):
-        try:
-            url = app_config.CONTEXTO_NEGOCIO_ENDPOINT
-            body = _json_mod.dumps({"codOpe": "OBTENER_CONTEXTO_NEGOCIO", "id_empresa": id_empresa}).encode("utf-8")
-            req = urllib.request.Request(
-                url,
-                data=body,
-                method="POST",
-                headers={"Content-Type": "application/json", "Accept": "application/json"},
-            )
-            with urllib.request.urlopen(req, timeout=app_config.CONTEXTO_NEGOCIO_TIMEOUT) as resp:
-                data = _json_mod.loads(resp.read().decode())
-                if data.get("success"):
-                    contexto = data.get("contexto_negocio") or ""
-                    # TTLCache almacena y expira automáticamente en 1 hora
-                    _contexto_cache[id_empresa] = contexto
-                    # Reset circuit breaker al tener éxito
-                    _contexto_failures.pop(id_empresa, None)
-                    return contexto if contexto else None
-        except Exception as e:
-            logger.debug(
-                "Error obteniendo contexto intento %d/%d id_empresa=%s: %s",
-                attempt + 1, max_retries, id_empresa, e
-            )
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)  # backoff: 1s, 2s
-
-    # Todos los intentos fallaron: incrementar contador del circuit breaker
-    logger.debug("Todos los intentos fallaron para contexto id_empresa=%s", id_empresa)
-    current_failures = _contexto_failures.get(id_empresa, 0)
-    # TTLCache resetea automáticamente el contador luego de ttl=300s
-    _contexto_failures[id_empresa] = current_failures + 1
+    warmup_task: Optional[asyncio.Task] = None
+    if app_config.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(warmup.run_warmup())
+    else:
+        warmup.mark_ready()
+        # Sin warm-up el tokenizer igual se carga al arrancar, en un thread
+        start_tokenizer_load()
+    start_tools_refresher()
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await stop_tools_refresher()
+    await close_http_client()
+    await close_session_pools()
+    await memory_manager.close()
 
-    return None
-
-
-# CORS - desde env o * como fallback (en producción especificar dominios)
-_cors_origins = os.getenv("CORS_ALLOWED_ORIGINS", "*").split(",")
-_cors_origins = [o.strip() for o in _cors_origins if o.strip()]
 
 app = FastAPI(
     title="MaravIA Orquestador",
     description="Orquestador que enruta conversaciones a agentes especializados MCP (Venta, Cita, Reserva)",
-    version=app_config.VERSION
+    version=app_config.VERSION,
+    lifespan=lifespan,
 )
 
 # CORS
@@ -149,8 +132,143 @@ app.add_middleware(
 )
 
 
-async def _process_chat(request: ChatRequest) -> ChatResponse:
-    """Lógica completa del flujo chat: memoria, contexto, OpenAI, MCP y guardado."""
+def _try_fast_path(
+    request: ChatRequest,
+    memory: list,
+    current_agent: Optional[str],
+    config_dict: dict,
+) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Intenta decidir el turno con el fast path (reglas + memoria, sin red).
+    Devuelve (reply, agent_to_invoke) o None si el turno es ambiguo y debe decidirlo el LLM.
+    """
+    if not app_config.ROUTER_FAST_PATH_ENABLED:
+        return None
+
+    routed = fast_path_router.route(request.message, memory, current_agent, config_dict)
+    if routed is None:
+        app_metrics.fast_path_total.labels(result="miss", rule="none").inc()
+        return None
+
+    decision, rule = routed
+    app_metrics.fast_path_total.labels(result="hit", rule=rule).inc()
+    logger.info(
+        "Decisión por fast path",
+        extra={"extra_fields": {"session_id": request.session_id, "rule": rule, "action": decision.action}}
+    )
+    agent_to_invoke = decision.agent_name if decision.action == "delegate" else None
+    return decision.response, agent_to_invoke
+
+
+async def _decide_with_llm(
+    request: ChatRequest,
+    memory: list,
+    config_dict: dict,
+    on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Obtiene el contexto de negocio, arma los mensajes (prefijo del tenant + historial + mensaje)
+    e invoca al LLM orquestador. Los mensajes cortos repetidos se resuelven desde el cache de
+    decisiones sin llamar al LLM.
+    on_token: si se pasa, la respuesta directa del LLM se reenvía en streaming (en un hit de
+              cache no se llama: la respuesta completa la emite el caller).
+    deadline: instante en que vence el chat; acota la espera de cupo y los reintentos de OpenAI.
+    """
+    # Obtener contexto de negocio (para responder preguntas básicas sin delegar)
+    contexto_negocio = None
+    try:
+        contexto_negocio = await asyncio.wait_for(
+            fetch_contexto_negocio(request.config.id_empresa),
+            timeout=app_config.CONTEXTO_NEGOCIO_TIMEOUT + 2  # +2s para espera de semáforo/backoff
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Timeout obteniendo contexto de negocio id_empresa=%s", request.config.id_empresa)
+    except Exception as e:
+        logger.warning("Error inesperado en contexto de negocio: %s", e)
+
+    if contexto_negocio:
+        logger.debug("Contexto de negocio cargado para id_empresa=%s", request.config.id_empresa)
+
+    # Prefijo estático del tenant (memoizado, cacheable por OpenAI); su hash identifica al tenant
+    prefix = get_orquestador_prefix(config_dict, contexto_negocio)
+
+    cache_key = None
+    if app_config.DECISION_CACHE_ENABLED:
+        cache_key = decision_cache.make_key(
+            prefix.key,
+            request.message,
+            has_memory=bool(memory),
+        )
+        cached = decision_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            logger.info(
+                "Decisión desde cache",
+                extra={"extra_fields": {"session_id": request.session_id, "agent_to_invoke": cached[1]}}
+            )
+            return cached
+
+    messages = build_orquestador_messages(
+        config_dict, memory, request.message, contexto_negocio=contexto_negocio, prefix=prefix
+    )
+    logger.debug("Prompt del orquestador: %s mensajes", len(messages))
+
+    # Agente orquestador (OpenAI): mensajes → decisión (async nativo)
+    decision = await invoke_orquestador_messages(messages, on_token=on_token, deadline=deadline)
+    if cache_key is not None:
+        decision_cache.put(cache_key, decision)
+    return decision
+
+
+def _is_speculative_enabled(id_empresa: int) -> bool:
+    """Modo especulativo por tenant: '*' = todas las empresas, o lista explícita de id_empresa."""
+    empresas = app_config.MCP_SPECULATIVE_EMPRESAS
+    return "*" in empresas or str(id_empresa) in empresas
+
+
+async def _discard_speculation(task: asyncio.Task, agent: str, reason: str) -> None:
+    """
+    Cancela la llamada MCP especulativa y espera a que termine de verdad.
+    Si el especialista ya había respondido, el turno quedó procesado de su lado
+    (p. ej. guardado en su memoria): se cuenta como "completed" para medir ese costo.
+    """
+    task.cancel()
+    # asyncio.wait no propaga la cancelación del task especulativo ni su excepción,
+    # pero sí la de este request si lo cancelan mientras espera.
+    await asyncio.wait({task})
+    if task.cancelled():
+        state = "cancelled"
+    elif task.exception() is not None:
+        state = "failed"
+    else:
+        state = "completed"
+    app_metrics.speculative_mcp_total.labels(outcome="wasted").inc()
+    app_metrics.speculative_mcp_discarded_total.labels(agent=agent, state=state).inc()
+    logger.info(
+        "Especulación MCP descartada",
+        extra={"extra_fields": {"agent": agent, "reason": reason, "state": state}}
+    )
+
+
+def _mcp_context(request: ChatRequest) -> dict:
+    """Contexto que se reenvía al agente MCP (session_id + config del bot)."""
+    return {
+        "session_id": request.session_id,
+        "config": request.config.model_dump(),
+    }
+
+
+async def _process_chat(
+    request: ChatRequest,
+    deadline: float,
+    emit: Optional[ChatEventEmitter] = None,
+) -> ChatResponse:
+    """
+    Lógica completa del flujo chat: memoria, contexto, OpenAI, MCP y guardado.
+    deadline: instante (time.monotonic()) en que vence CHAT_TIMEOUT; acota los reintentos MCP.
+    emit: opcional (endpoint streaming). Recibe "decision" apenas se conoce la acción y
+          "chunk" con el texto para el usuario (tokens del LLM o respuesta del especialista).
+    """
     start_time = time.perf_counter()
     request_dict = request.model_dump()
     logger.info(
@@ -171,34 +289,48 @@ async def _process_chat(request: ChatRequest) -> ChatResponse:
     logger.info("Memoria cargada", extra={"extra_fields": {"session_id": request.session_id, "turnos": len(memory)}})
     current_agent = None
     if memory:
-        current_agent = await memory_manager.get_current_agent(request.session_id)
+        current_agent = memory_manager.current_agent_from_history(memory)
         if current_agent:
             logger.info("Agente activo en sesión", extra={"extra_fields": {"session_id": request.session_id, "agent": current_agent}})
 
-    # 2. Obtener contexto de negocio (para responder preguntas básicas sin delegar)
-    contexto_negocio = None
-    try:
-        contexto_negocio = await asyncio.wait_for(
-            asyncio.to_thread(_fetch_contexto_negocio_sync, request.config.id_empresa),
-            timeout=app_config.CONTEXTO_NEGOCIO_TIMEOUT + 2  # +2s para overhead de thread pool
-        )
-    except asyncio.TimeoutError:
-        logger.warning("Timeout obteniendo contexto de negocio id_empresa=%s", request.config.id_empresa)
-    except Exception as e:
-        logger.warning("Error inesperado en contexto de negocio: %s", e)
-    
-    if contexto_negocio:
-        logger.debug("Contexto de negocio cargado para id_empresa=%s", request.config.id_empresa)
-
-    # 3. System prompt del orquestador CON memoria y contexto de negocio
+    # 2-4. Decisión: fast path determinístico o, si el turno es ambiguo, contexto + OpenAI
     config_dict = request.config.model_dump()
-    system_prompt = build_orquestador_system_prompt_with_memory(
-        config_dict, memory, contexto_negocio=contexto_negocio
-    )
-    logger.debug("System prompt length: %s chars", len(system_prompt))
-
-    # 4. Agente orquestador (OpenAI): system prompt + mensaje → respuesta (async nativo)
-    reply, agent_to_invoke = await invoke_orquestador(system_prompt, request.message)
+    agent_key = modalidad_to_agent(request.config.modalidad or "")
+    speculative_task: Optional[asyncio.Task] = None
+    reply_streamed = False
+
+    async def _on_token(text: str) -> None:
+        # Solo se llama cuando el LLM ya indicó action="respond"
+        nonlocal reply_streamed
+        if not reply_streamed:
+            reply_streamed = True
+            await emit("decision", {"action": "respond", "agent": None})
+        await emit("chunk", {"text": text})
+
+    routed = _try_fast_path(request, memory, current_agent, config_dict)
+    if routed is not None:
+        reply, agent_to_invoke = routed
+    else:
+        if _is_speculative_enabled(request.config.id_empresa):
+            # La modalidad ya fija el agente: se lanza el MCP en paralelo con el LLM
+            # y se descarta si la decisión termina siendo "respond".
+            speculative_task = asyncio.create_task(invoke_mcp_agent(
+                agent_name=agent_key,
+                message=request.message,
+                session_id=request.session_id,
+                context=_mcp_context(request),
+                deadline=deadline,
+            ))
+        try:
+            reply, agent_to_invoke = await _decide_with_llm(
+                request, memory, config_dict,
+                on_token=_on_token if emit is not None else None,
+                deadline=deadline,
+            )
+        except BaseException:
+            if speculative_task is not None:
+                await _discard_speculation(speculative_task, agent_key, "error")
+            raise
 
     logger.info(
         "Orquestador decidió",
@@ -206,7 +338,6 @@ async def _process_chat(request: ChatRequest) -> ChatResponse:
     )
 
     # Validar que agent_to_invoke coincida con la modalidad; corregir si el LLM se desvía
-    agent_key = modalidad_to_agent(request.config.modalidad or "")
     if agent_to_invoke and agent_to_invoke != agent_key:
         logger.warning(
             "LLM devolvió agent distinto a modalidad; corregido",
@@ -223,25 +354,33 @@ async def _process_chat(request: ChatRequest) -> ChatResponse:
         ).inc()
         agent_to_invoke = agent_key
 
+    if emit is not None and not reply_streamed:
+        await emit("decision", {"action": "delegate" if agent_to_invoke else "respond", "agent": agent_to_invoke})
+        if not agent_to_invoke:
+            await emit("chunk", {"text": reply})
+
     # 5. Si el orquestador detectó que debe delegar, llamar al agente MCP
     final_reply = reply
     agent_used = None
     action = "respond"
 
+    if speculative_task is not None and not agent_to_invoke:
+        await _discard_speculation(speculative_task, agent_key, "respond")
+
     if agent_to_invoke:
         logger.info("Delegando a agente MCP", extra={"extra_fields": {"agent": agent_to_invoke}})
 
-        context = {
-            "session_id": request.session_id,
-            "config": request.config.model_dump(),
-        }
-
-        specialist_response = await invoke_mcp_agent(
-            agent_name=agent_to_invoke,
-            message=request.message,
-            session_id=request.session_id,
-            context=context
-        )
+        if speculative_task is not None:
+            app_metrics.speculative_mcp_total.labels(outcome="used").inc()
+            specialist_response = await speculative_task
+        else:
+            specialist_response = await invoke_mcp_agent(
+                agent_name=agent_to_invoke,
+                message=request.message,
+                session_id=request.session_id,
+                context=_mcp_context(request),
+                deadline=deadline,
+            )
 
         if specialist_response:
             logger.info(
@@ -259,6 +398,9 @@ async def _process_chat(request: ChatRequest) -> ChatResponse:
             final_reply = reply
             action = "respond"
 
+        if emit is not None:
+            await emit("chunk", {"text": final_reply})
+
     # 6. GUARDAR EN MEMORIA
     await memory_manager.add(
         session_id=request.session_id,
@@ -278,17 +420,35 @@ async def _process_chat(request: ChatRequest) -> ChatResponse:
     )
 
 
-@app.post("/api/agent/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def _process_chat_serialized(
+    request: ChatRequest,
+    deadline: float,
+    emit: Optional[ChatEventEmitter] = None,
+) -> ChatResponse:
     """
-    Endpoint principal que recibe POST desde n8n.
-    
-    Construye el system prompt (identidad, reglas), invoca el agente orquestador
-    (OpenAI gpt-4o-mini / gpt-4o) y devuelve la respuesta.
+    Pasa el turno por el mailbox de la sesión. Si el mensaje quedó absorbido en el lote de un
+    mensaje posterior, devuelve action="coalesced" con reply vacío: la respuesta combinada
+    la lleva el request del último mensaje.
     """
     start_time = time.perf_counter()
-    
-    # Validación de inputs
+
+    async def process(message: str) -> ChatResponse:
+        batch_request = request if message == request.message else request.model_copy(update={"message": message})
+        return await asyncio.wait_for(
+            _process_chat(batch_request, deadline, emit),
+            timeout=max(deadline - time.monotonic(), 0.0)
+        )
+
+    response, is_last = await _session_mailbox.submit(request.session_id, request.message, process)
+    if is_last:
+        return response
+
+    await app_metrics.record_request(time.perf_counter() - start_time, "coalesced", error=False)
+    return ChatResponse(reply="", session_id=request.session_id, agent_used=None, action="coalesced")
+
+
+async def _validate_chat_request(request: ChatRequest, start_time: float) -> None:
+    """Validación de inputs. Registra la métrica de error y lanza HTTPException 400."""
     if not request.message or not request.message.strip():
         await app_metrics.record_request(time.perf_counter() - start_time, "respond", error=True)
         raise HTTPException(
@@ -310,11 +470,34 @@ async def chat(request: ChatRequest):
             detail="El campo 'config.id_empresa' debe ser un número mayor a 0"
         )
 
+
+async def _admit_chat_request(request: ChatRequest, start_time: float) -> AdmissionTicket:
+    """Control de admisión. Si hay sobrecarga registra la métrica y lanza HTTPException 429/503."""
     try:
-        response = await asyncio.wait_for(
-            _process_chat(request),
-            timeout=app_config.CHAT_TIMEOUT
+        return await admission_controller.admit(request.session_id)
+    except AdmissionRejected as e:
+        await app_metrics.record_request(time.perf_counter() - start_time, "rejected", error=True)
+        logger.warning("Request rechazado por sobrecarga (%s) session_id=%s", e.reason, request.session_id)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail="El servicio está saturado. Intenta de nuevo en unos segundos.",
+            headers={"Retry-After": str(e.retry_after)},
         )
+
+
+async def _run_chat(
+    request: ChatRequest,
+    start_time: float,
+    emit: Optional[ChatEventEmitter] = None,
+) -> ChatResponse:
+    """Ejecuta el flujo con CHAT_TIMEOUT y traduce errores a HTTPException (+ métricas)."""
+    try:
+        deadline = time.monotonic() + app_config.CHAT_TIMEOUT
+        if app_config.CHAT_SESSION_SERIALIZE:
+            pipeline = _process_chat_serialized(request, deadline, emit)
+        else:
+            pipeline = _process_chat(request, deadline, emit)
+        response = await asyncio.wait_for(pipeline, timeout=app_config.CHAT_TIMEOUT)
         # Éxito - las métricas ya se registraron en _process_chat()
         return response
     except asyncio.TimeoutError:
@@ -328,6 +511,13 @@ async def chat(request: ChatRequest):
     except asyncio.CancelledError:
         await app_metrics.record_request(time.perf_counter() - start_time, "cancelled", error=True)
         raise
+    except OpenAIThrottledError as e:
+        await app_metrics.record_request(time.perf_counter() - start_time, "throttled", error=True)
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
     except ValueError as e:
         await app_metrics.record_request(time.perf_counter() - start_time, "respond", error=True)
         logger.error("Config/LLM error: %s", e)
@@ -340,10 +530,89 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/agent/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """
+    Endpoint principal que recibe POST desde n8n.
+    
+    Construye el system prompt (identidad, reglas), invoca el agente orquestador
+    (OpenAI gpt-4o-mini / gpt-4o) y devuelve la respuesta.
+    """
+    start_time = time.perf_counter()
+    await _validate_chat_request(request, start_time)
+    ticket = await _admit_chat_request(request, start_time)
+    try:
+        return await _run_chat(request, start_time)
+    finally:
+        ticket.release()
+
+
+async def _chat_event_stream(
+    request: ChatRequest,
+    start_time: float,
+    ticket: AdmissionTicket,
+) -> AsyncIterator[Dict[str, str]]:
+    """
+    Genera los eventos SSE del flujo chat. El flujo corre en una task aparte que publica en
+    una cola; si el cliente se desconecta, la task se cancela. Libera el lugar de admisión al terminar.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: Dict[str, Any]) -> None:
+        await queue.put((event, data))
+
+    task = asyncio.create_task(_run_chat(request, start_time, emit))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    first_event = True
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            event, data = item
+            if first_event:
+                first_event = False
+                app_metrics.stream_first_event_seconds.observe(time.perf_counter() - start_time)
+            yield {"event": event, "data": _json_mod.dumps(data, ensure_ascii=False)}
+
+        try:
+            response = task.result()
+        except HTTPException as e:
+            yield {"event": "error", "data": _json_mod.dumps({"status_code": e.status_code, "detail": e.detail}, ensure_ascii=False)}
+            return
+        yield {"event": "done", "data": response.model_dump_json()}
+    finally:
+        if not task.done():
+            task.cancel()
+        ticket.release()
+
+
+@app.post("/api/agent/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Igual que /api/agent/chat pero responde con Server-Sent Events para reducir el
+    time-to-first-byte:
+    - decision: {"action", "agent"} apenas se conoce la acción
+    - chunk: {"text"} fragmentos de la respuesta (tokens del LLM o texto del especialista)
+    - done: ChatResponse final (el turno ya quedó guardado en memoria)
+    - error: {"status_code", "detail"}
+    """
+    start_time = time.perf_counter()
+    await _validate_chat_request(request, start_time)
+    ticket = await _admit_chat_request(request, start_time)
+    # El background libera el lugar también si el cliente se desconecta antes de iniciar el stream
+    return EventSourceResponse(
+        _chat_event_stream(request, start_time, ticket),
+        background=BackgroundTask(ticket.release),
+    )
+
+
 @app.get("/health")
 async def health():
-    """Health check endpoint"""
-    return {"status": "ok", "service": "orquestador"}
+    """Health check / readiness: 503 mientras el warm-up de arranque no haya terminado."""
+    if not warmup.is_ready():
+        return JSONResponse(status_code=503, content={"status": "starting", "service": "orquestador"})
+    return {"status": "ok", "service": "orquestador", "warmup": warmup.get_warmup_result()}
 
 
 @app.get("/config")
@@ -375,6 +644,18 @@ async def clear_memory(session_id: str):
     return {"message": f"Memoria limpiada para session_id: {sid}"}
 
 
+@app.post("/admin/mcp/tools/reload")
+async def reload_tools(agent: Optional[str] = None):
+    """
+    Fuerza la recarga de tools MCP (todos los servidores o ?agent=venta|cita|reserva),
+    ignorando TTL y backoff. Útil tras desplegar un agente especializado.
+    """
+    if agent is not None and agent not in get_tools_status():
+        raise HTTPException(status_code=404, detail=f"Agente MCP no habilitado: {agent}")
+    reloaded = await reload_mcp_tools(agent)
+    return {"reloaded": reloaded, "status": get_tools_status()}
+
+
 @app.get("/metrics")
 async def metrics():
     """
@@ -401,11 +682,13 @@ async def root():
         ],
         "endpoints": {
             "chat": "/api/agent/chat",
+            "chat_stream": "/api/agent/chat/stream",
             "config": "/config",
             "health": "/health",
             "metrics": "/metrics",
             "memory_stats": "/memory/stats",
             "clear_memory": "/memory/clear/{session_id}",
+            "reload_mcp_tools": "/admin/mcp/tools/reload",
             "docs": "/docs",
             "redoc": "/redoc"
         },
@@ -41,17 +41,162 @@ CONTEXTO_NEGOCIO_ENDPOINT = os.getenv(
     "https://api.maravia.pe/servicio/ws_informacion_ia.php",
 )
 CONTEXTO_NEGOCIO_TIMEOUT = int(os.getenv("CONTEXTO_NEGOCIO_TIMEOUT", "10"))
+# Máximo de requests simultáneas (y conexiones keep-alive) hacia el endpoint de contexto
+CONTEXTO_NEGOCIO_MAX_CONCURRENCY = int(os.getenv("CONTEXTO_NEGOCIO_MAX_CONCURRENCY", "10"))
+# Cache stale-while-revalidate: TTL blando (refresca en background) y margen extra en el que
+# se sigue sirviendo la entrada vencida antes de bloquear el request con un fetch (TTL duro)
+CONTEXTO_NEGOCIO_CACHE_TTL = int(os.getenv("CONTEXTO_NEGOCIO_CACHE_TTL", "3600"))
+CONTEXTO_NEGOCIO_CACHE_MAX_STALE = int(os.getenv("CONTEXTO_NEGOCIO_CACHE_MAX_STALE", "3600"))
 
 # OpenAI (agente orquestador)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OPENAI_TIMEOUT = int(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "4096"))
+# Deployment alternativo / proxy compatible con OpenAI para OPENAI_MODEL (vacío = api.openai.com)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+# Pool de modelos: OPENAI_MODEL primero; si falla (JSON inválido, timeout, 5xx) se escala en orden
+# a estos. Formato "modelo|timeout|base_url" separados por coma; timeout y base_url opcionales.
+OPENAI_MODEL_FALLBACKS = os.getenv("OPENAI_MODEL_FALLBACKS", "")
+# Circuit breaker por modelo: mientras está abierto se saltea ese modelo del pool
+OPENAI_MODEL_BREAKER_MIN_CALLS = int(os.getenv("OPENAI_MODEL_BREAKER_MIN_CALLS", "5"))
+OPENAI_MODEL_BREAKER_RESET_TIMEOUT = float(os.getenv("OPENAI_MODEL_BREAKER_RESET_TIMEOUT", "60"))
+# Rate limiter del proceso según el tier de OpenAI (requests y tokens por minuto; 0 = sin límite).
+# Desactivado por defecto: cada cuenta tiene su tier, configurarlo con los valores reales.
+# Una llamada espera cupo hasta OPENAI_RATE_LIMIT_MAX_WAIT segundos; si no alcanza, 503 + Retry-After.
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "0"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "0"))
+OPENAI_RATE_LIMIT_MAX_WAIT = float(os.getenv("OPENAI_RATE_LIMIT_MAX_WAIT", "5"))
+# Tokens de completion reservados por llamada en el TPM: una OrquestradorDecision ocupa unos
+# cientos de tokens; reservar OPENAI_MAX_TOKENS subestimaría mucho el cupo real
+OPENAI_RATE_LIMIT_COMPLETION_TOKENS = int(os.getenv("OPENAI_RATE_LIMIT_COMPLETION_TOKENS", "512"))
+# Reintentos de 429/5xx/conexión (backoff exponencial con jitter, base..max segundos, o retry-after)
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_RETRY_BASE = float(os.getenv("OPENAI_RETRY_BASE", "0.5"))
+OPENAI_RETRY_MAX = float(os.getenv("OPENAI_RETRY_MAX", "8"))
+
+# Presupuesto de tokens del system prompt del orquestador
+# Turnos de historial considerados (los más recientes) y tokens máximos que ocupan en total
+PROMPT_HISTORY_MAX_TURNS = int(os.getenv("PROMPT_HISTORY_MAX_TURNS", "5"))
+PROMPT_HISTORY_MAX_TOKENS = int(os.getenv("PROMPT_HISTORY_MAX_TOKENS", "800"))
+# Tope por mensaje dentro de un turno (una respuesta larga de catálogo no se copia entera)
+PROMPT_TURN_MAX_TOKENS = int(os.getenv("PROMPT_TURN_MAX_TOKENS", "200"))
+# Tope del contexto de negocio incluido en el prompt
+PROMPT_CONTEXTO_MAX_TOKENS = int(os.getenv("PROMPT_CONTEXTO_MAX_TOKENS", "400"))
+# Cómo va el historial al LLM: "system" (texto en el bloque de historial) |
+# "messages" (pares usuario/asistente como mensajes del chat)
+PROMPT_HISTORY_MODE = os.getenv("PROMPT_HISTORY_MODE", "system").lower()
+# Cache de decisiones del orquestador para mensajes cortos repetidos ("hola", "gracias").
+# Solo el primer turno de cada sesión (sin historial)
+DECISION_CACHE_ENABLED = os.getenv("DECISION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+DECISION_CACHE_TTL = int(os.getenv("DECISION_CACHE_TTL", "600"))
+DECISION_CACHE_MAX_SIZE = int(os.getenv("DECISION_CACHE_MAX_SIZE", "5000"))
+# Mensajes (ya normalizados) más largos que esto no se cachean
+DECISION_CACHE_MAX_MESSAGE_CHARS = int(os.getenv("DECISION_CACHE_MAX_MESSAGE_CHARS", "40"))
+# Prefijos estáticos renderizados en memoria (uno por combinación config + contexto de tenant)
+PROMPT_PREFIX_CACHE_SIZE = int(os.getenv("PROMPT_PREFIX_CACHE_SIZE", "500"))
 
 # MCP (agentes especializados)
 MCP_TIMEOUT = int(os.getenv("MCP_TIMEOUT", "30"))
+# Circuit breaker por agente, de ventana deslizante: abre si en las últimas WINDOW_SIZE llamadas
+# (de hasta WINDOW_SECONDS de antigüedad) la tasa de fallos o de llamadas lentas supera su umbral.
+# FAILURE_THRESHOLD = mínimo de llamadas en la ventana para evaluar las tasas.
 MCP_CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("MCP_CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
 MCP_CIRCUIT_BREAKER_RESET_TIMEOUT = int(os.getenv("MCP_CIRCUIT_BREAKER_RESET_TIMEOUT", "60"))
+MCP_CIRCUIT_BREAKER_WINDOW_SIZE = int(os.getenv("MCP_CIRCUIT_BREAKER_WINDOW_SIZE", "20"))
+MCP_CIRCUIT_BREAKER_WINDOW_SECONDS = float(os.getenv("MCP_CIRCUIT_BREAKER_WINDOW_SECONDS", "60"))
+MCP_CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv("MCP_CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+# Una llamada que tarda al menos SLOW_CALL_SECONDS cuenta como lenta (aunque termine bien)
+MCP_CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("MCP_CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "15"))
+MCP_CIRCUIT_BREAKER_SLOW_CALL_RATE = float(os.getenv("MCP_CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8"))
+# Llamadas de prueba en HALF_OPEN: deben salir todas bien para cerrar
+MCP_CIRCUIT_BREAKER_HALF_OPEN_CALLS = int(os.getenv("MCP_CIRCUIT_BREAKER_HALF_OPEN_CALLS", "1"))
 MCP_MAX_RETRIES = int(os.getenv("MCP_MAX_RETRIES", "3"))
+# No se lanza un intento (ni se espera un backoff) si quedan menos de estos segundos de
+# presupuesto del chat: se devuelve el fallback del orquestador de inmediato
+MCP_MIN_ATTEMPT_SECONDS = float(os.getenv("MCP_MIN_ATTEMPT_SECONDS", "2"))
+# Bulkhead por agente: máximo de llamadas concurrentes a su servidor MCP (override por agente con
+# MCP_<AGENTE>_MAX_CONCURRENT), cuántas pueden esperar lugar y por cuánto tiempo (segundos).
+# Cola llena o espera vencida → fallback del orquestador sin reintentar.
+MCP_MAX_CONCURRENT = int(os.getenv("MCP_MAX_CONCURRENT", "20"))
+MCP_VENTA_MAX_CONCURRENT = int(os.getenv("MCP_VENTA_MAX_CONCURRENT", str(MCP_MAX_CONCURRENT)))
+MCP_CITA_MAX_CONCURRENT = int(os.getenv("MCP_CITA_MAX_CONCURRENT", str(MCP_MAX_CONCURRENT)))
+MCP_RESERVA_MAX_CONCURRENT = int(os.getenv("MCP_RESERVA_MAX_CONCURRENT", str(MCP_MAX_CONCURRENT)))
+MCP_MAX_QUEUE = int(os.getenv("MCP_MAX_QUEUE", "40"))
+MCP_QUEUE_TIMEOUT = float(os.getenv("MCP_QUEUE_TIMEOUT", "5"))
+# Cache de tools MCP por servidor: se recargan en background pasado el TTL; un servidor que
+# falla se reintenta con backoff exponencial (base .. max segundos)
+MCP_TOOLS_TTL = int(os.getenv("MCP_TOOLS_TTL", "600"))
+MCP_TOOLS_REFRESH_INTERVAL = float(os.getenv("MCP_TOOLS_REFRESH_INTERVAL", "5"))
+MCP_TOOLS_RETRY_BASE = float(os.getenv("MCP_TOOLS_RETRY_BASE", "5"))
+MCP_TOOLS_RETRY_MAX = float(os.getenv("MCP_TOOLS_RETRY_MAX", "300"))
+# Sesiones MCP persistentes por servidor (evita conexión + initialize en cada llamada).
+# MCP_SESSION_POOL_SIZE es el máximo de sesiones abiertas, no de llamadas: las llamadas
+# concurrentes comparten sesiones y la concurrencia la acota MCP_MAX_CONCURRENT (bulkhead)
+MCP_SESSION_POOL_ENABLED = os.getenv("MCP_SESSION_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+MCP_SESSION_POOL_SIZE = int(os.getenv("MCP_SESSION_POOL_SIZE", "4"))
+# Una sesión ociosa más de estos segundos se verifica con ping antes de reutilizarla
+MCP_SESSION_PING_INTERVAL = float(os.getenv("MCP_SESSION_PING_INTERVAL", "30"))
+MCP_SESSION_CONNECT_TIMEOUT = float(os.getenv("MCP_SESSION_CONNECT_TIMEOUT", "10"))
+# Hedging: si la llamada al agente no respondió al percentil MCP_HEDGE_PERCENTILE de su latencia
+# reciente, se lanza una segunda idéntica y gana la primera. Solo para agentes con tools
+# idempotentes: lista de agentes separados por coma (ej. "venta"); vacío = desactivado.
+MCP_HEDGE_AGENTS = frozenset(
+    a.strip() for a in os.getenv("MCP_HEDGE_AGENTS", "").split(",") if a.strip()
+)
+MCP_HEDGE_PERCENTILE = float(os.getenv("MCP_HEDGE_PERCENTILE", "0.95"))
+# Espera mínima antes del hedge, y la usada mientras no hay muestras de latencia suficientes
+MCP_HEDGE_MIN_DELAY = float(os.getenv("MCP_HEDGE_MIN_DELAY", "0.5"))
+MCP_HEDGE_DEFAULT_DELAY = float(os.getenv("MCP_HEDGE_DEFAULT_DELAY", "2"))
+# Fracción máxima de llamadas que pueden hedgearse (0.1 = 10%); acota la carga extra
+MCP_HEDGE_BUDGET_RATIO = float(os.getenv("MCP_HEDGE_BUDGET_RATIO", "0.1"))
+
+# Memoria conversacional: "memory" (local al proceso, default) | "redis" (compartida entre réplicas)
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+MEMORY_KEY_PREFIX = os.getenv("MEMORY_KEY_PREFIX", "orquestador:memory:")
+# La sesión expira si no recibe mensajes en este tiempo (segundos)
+MEMORY_SESSION_TTL = int(os.getenv("MEMORY_SESSION_TTL", "7200"))
+# Máximo de sesiones en el backend in-memory (LRU eviction al superarlo)
+MEMORY_MAX_SESSIONS = int(os.getenv("MEMORY_MAX_SESSIONS", "10000"))
+
+# Fast path: resolver localmente (sin OpenAI) los turnos obvios (continuación, saludo, despedida)
+ROUTER_FAST_PATH_ENABLED = os.getenv("ROUTER_FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Modo especulativo: invoca el agente MCP en paralelo con el LLM (se descarta si decide "respond").
+# "*" = todas las empresas; lista de id_empresa separados por coma; vacío = desactivado.
+# Ojo: el especialista procesa el mensaje aunque la especulación se descarte.
+MCP_SPECULATIVE_EMPRESAS = frozenset(
+    e.strip() for e in os.getenv("MCP_SPECULATIVE_EMPRESAS", "").split(",") if e.strip()
+)
+
+# Warm-up al arrancar: inicializa LLM, cliente/tools MCP y precarga contexto de negocio.
+# /health responde 503 hasta que termina (o vence WARMUP_TIMEOUT).
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_TIMEOUT = int(os.getenv("WARMUP_TIMEOUT", "30"))
+# id_empresa separados por coma cuyo contexto se precarga (ej. "1,5,12")
+WARMUP_EMPRESAS = [
+    int(e) for e in os.getenv("WARMUP_EMPRESAS", "").split(",") if e.strip().isdigit()
+]
+
+# Serializar los turnos de una misma session_id (evita pipelines concurrentes y memoria fuera de orden)
+CHAT_SESSION_SERIALIZE = os.getenv("CHAT_SESSION_SERIALIZE", "true").lower() in ("1", "true", "yes")
+# Ventana de debounce (ms) para agrupar mensajes en ráfaga de la misma sesión en un solo turno.
+# 0 = sin agrupar (solo serializa). Requiere CHAT_SESSION_SERIALIZE=true.
+CHAT_COALESCE_WINDOW_MS = int(os.getenv("CHAT_COALESCE_WINDOW_MS", "0"))
+
+# Control de admisión del chat (load shedding): rechaza con 429/503 + Retry-After en vez de
+# aceptar todo y vencer por CHAT_TIMEOUT. Máximo de requests en curso; fracción de ese máximo
+# que pueden ocupar sesiones nuevas (el resto queda para conversaciones ya empezadas); latencia
+# promedio reciente (segundos) por encima de la cual se rechazan sesiones nuevas (0 = sin límite).
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "200"))
+ADMISSION_NEW_SESSION_RATIO = float(os.getenv("ADMISSION_NEW_SESSION_RATIO", "0.8"))
+ADMISSION_LATENCY_TARGET = float(os.getenv("ADMISSION_LATENCY_TARGET", "30"))
+# Tope del Retry-After (segundos) que se sugiere al rechazar
+ADMISSION_RETRY_AFTER_MAX = int(os.getenv("ADMISSION_RETRY_AFTER_MAX", "30"))
 
 # Timeout total del flujo completo chat (debe ser > OPENAI_TIMEOUT + MCP_TIMEOUT para el caso normal)
 CHAT_TIMEOUT = int(os.getenv("CHAT_TIMEOUT", "120"))
+# Segundos de CHAT_TIMEOUT reservados para cerrar el turno (guardar memoria, responder)
+CHAT_DEADLINE_MARGIN = float(os.getenv("CHAT_DEADLINE_MARGIN", "1"))
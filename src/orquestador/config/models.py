@@ -60,7 +60,9 @@ class ChatResponse(BaseModel):
     reply: str
     session_id: int
     agent_used: Optional[Literal["venta", "cita", "reserva"]] = None
-    action: Optional[Literal["delegate", "respond", "timeout", "cancelled"]] = None
+    # "coalesced": el mensaje se agrupó con otros de la misma ráfaga; la respuesta la lleva
+    # el request del último mensaje (este trae reply vacío y no debe enviarse al usuario)
+    action: Optional[Literal["delegate", "respond", "timeout", "cancelled", "coalesced"]] = None
 
 
 class OrquestradorDecision(BaseModel):
@@ -0,0 +1,90 @@
+"""
+Bulkhead: límite de llamadas concurrentes a un destino (p. ej. un agente MCP) con cola de espera
+acotada y rechazo rápido.
+
+Sin límite, un pico hacia un especialista lo satura y, con los reintentos, amplifica su
+sobrecarga; además sus llamadas colgadas ocupan tasks del event loop que necesitan los demás.
+Con el bulkhead:
+
+- hasta `max_concurrent` llamadas en curso;
+- hasta `max_queue` esperando un lugar, como mucho `queue_timeout` segundos;
+- cola llena o espera vencida → BulkheadFull de inmediato (el caller usa su fallback).
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+try:
+    from . import metrics as app_metrics
+except ImportError:
+    from orquestador.infrastructure import metrics as app_metrics
+
+
+class BulkheadFull(Exception):
+    """El bulkhead rechazó la llamada (cola llena o espera vencida)."""
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(f"Bulkhead {name} lleno ({reason})")
+        self.name = name
+        self.reason = reason
+
+
+class Bulkhead:
+    """
+    Semáforo con cola de espera acotada. Sin lock propio: los contadores se actualizan sin
+    awaits intermedios.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int = 0, queue_timeout: float = 5.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _reject(self, reason: str) -> BulkheadFull:
+        app_metrics.bulkhead_rejected_total.labels(name=self.name, reason=reason).inc()
+        return BulkheadFull(self.name, reason)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """Ocupa un lugar durante el bloque; lanza BulkheadFull si no lo consigue."""
+        start = time.monotonic()
+        if self._semaphore.locked() or self._waiting:
+            if self._waiting >= self.max_queue:
+                raise self._reject("queue_full")
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject("queue_timeout") from None
+            finally:
+                self._waiting -= 1
+        else:
+            # Lugar libre y nadie esperando: acquire no suspende
+            await self._semaphore.acquire()
+        app_metrics.bulkhead_queue_wait_seconds.labels(name=self.name).observe(time.monotonic() - start)
+
+        self._in_flight += 1
+        app_metrics.bulkhead_in_flight.labels(name=self.name).inc()
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            app_metrics.bulkhead_in_flight.labels(name=self.name).dec()
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
+
+
+__all__ = ["Bulkhead", "BulkheadFull"]
@@ -0,0 +1,223 @@
+"""
+Circuit breaker de ventana deslizante (compartido por MCP y contexto de negocio).
+
+Abre por tasa, no por fallos consecutivos: con una degradación parcial (p. ej. 40% de fallos)
+un contador consecutivo se resetea con cada éxito y nunca abre, y se siguen pagando timeouts.
+Sobre las últimas `window_size` llamadas que además tengan menos de `window_seconds`:
+
+- tasa de fallos >= failure_rate_threshold        → OPEN
+- tasa de llamadas lentas >= slow_call_rate_threshold → OPEN (lenta: duración >= slow_call_seconds)
+
+Solo se evalúa con al menos `min_calls` llamadas en la ventana. Tras `reset_timeout` en OPEN pasa
+a HALF_OPEN y deja pasar hasta `half_open_max_calls` llamadas de prueba: si todas salen bien (y no
+son lentas) vuelve a CLOSED con la ventana limpia; la primera que falla lo reabre.
+
+Sin lock: ningún método hace await, así que son atómicos respecto del event loop.
+"""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Optional, Tuple
+
+try:
+    from .logging_config import get_logger
+    from . import metrics as app_metrics
+except ImportError:
+    from orquestador.infrastructure.logging_config import get_logger
+    from orquestador.infrastructure import metrics as app_metrics
+
+logger = get_logger("circuit_breaker")
+
+
+class CircuitState(Enum):
+    """Estados del circuit breaker"""
+    CLOSED = "closed"  # Funcionando normalmente
+    OPEN = "open"  # Fallando, rechazando requests
+    HALF_OPEN = "half_open"  # Probando si se recuperó
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de ventana deslizante.
+
+    Uso:
+        if not breaker.can_attempt(): → fallback
+        ... llamada ...
+        breaker.record_success(duración) / breaker.record_failure(duración)
+
+    name: etiqueta de métricas y logs (p. ej. "mcp_venta", "contexto").
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.8,
+        reset_timeout: float = 60.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitState.CLOSED
+        self.opened_at: Optional[float] = None
+        # (time.monotonic() al terminar, falló, lenta)
+        self._window: Deque[Tuple[float, bool, bool]] = deque(maxlen=window_size)
+        self._half_open_started = 0
+        self._half_open_succeeded = 0
+        self._half_open_at = 0.0
+
+    # ── Ventana ──────────────────────────────────────────────────────────────
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def _rates(self) -> Tuple[int, float, float]:
+        """(llamadas, tasa de fallos, tasa de lentas) de la ventana vigente."""
+        self._prune(time.monotonic())
+        calls = len(self._window)
+        if not calls:
+            return 0, 0.0, 0.0
+        failures = sum(1 for _, failed, _ in self._window if failed)
+        slow = sum(1 for _, _, is_slow in self._window if is_slow)
+        return calls, failures / calls, slow / calls
+
+    @property
+    def failure_count(self) -> int:
+        """Fallos en la ventana vigente."""
+        self._prune(time.monotonic())
+        return sum(1 for _, failed, _ in self._window if failed)
+
+    # ── Transiciones ─────────────────────────────────────────────────────────
+
+    def _transition(self, new_state: CircuitState, reason: str = "") -> None:
+        old_state = self.state
+        if old_state == new_state:
+            return
+        self.state = new_state
+        app_metrics.circuit_breaker_transitions_total.labels(
+            name=self.name, from_state=old_state.value, to_state=new_state.value
+        ).inc()
+        if new_state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+            logger.warning("Circuit %s abierto (%s)", self.name, reason)
+        elif new_state == CircuitState.HALF_OPEN:
+            self._half_open_started = 0
+            self._half_open_succeeded = 0
+            self._half_open_at = time.monotonic()
+            logger.info("Circuit %s en HALF_OPEN, probando recuperación", self.name)
+        else:
+            self.opened_at = None
+            self._window.clear()
+            logger.info("Circuit %s cerrado", self.name)
+
+    def _evaluate(self) -> None:
+        """En CLOSED, abre si la ventana supera algún umbral."""
+        calls, failure_rate, slow_rate = self._rates()
+        if calls < self.min_calls:
+            return
+        if failure_rate >= self.failure_rate_threshold:
+            self._transition(
+                CircuitState.OPEN, f"{failure_rate:.0%} de fallos en {calls} llamadas"
+            )
+        elif self.slow_call_seconds is not None and slow_rate >= self.slow_call_rate_threshold:
+            self._transition(
+                CircuitState.OPEN, f"{slow_rate:.0%} de llamadas lentas en {calls} llamadas"
+            )
+
+    # ── API ──────────────────────────────────────────────────────────────────
+
+    def can_attempt(self, record_rejection: bool = True) -> bool:
+        """
+        CLOSED: siempre permite.
+        OPEN: rechaza hasta que vence reset_timeout; entonces pasa a HALF_OPEN.
+        HALF_OPEN: permite hasta half_open_max_calls llamadas de prueba en total. Si una prueba
+                   no reporta resultado (cancelada) en reset_timeout, se habilitan pruebas nuevas.
+        record_rejection=False no cuenta el rechazo (el llamador invoca igual, p. ej. último recurso).
+        """
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - (self.opened_at or 0.0) < self.reset_timeout:
+                if record_rejection:
+                    app_metrics.circuit_breaker_rejected_total.labels(name=self.name).inc()
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+        elif time.monotonic() - self._half_open_at >= self.reset_timeout:
+            self._half_open_started = self._half_open_succeeded
+            self._half_open_at = time.monotonic()
+        if self._half_open_started < self.half_open_max_calls:
+            self._half_open_started += 1
+            return True
+        if record_rejection:
+            app_metrics.circuit_breaker_rejected_total.labels(name=self.name).inc()
+        return False
+
+    def release(self) -> None:
+        """
+        La llamada permitida terminó sin decir nada de la salud del servicio (cupo agotado,
+        cancelada): en HALF_OPEN devuelve la prueba para que otra llamada la use.
+        """
+        if self.state == CircuitState.HALF_OPEN and self._half_open_started > self._half_open_succeeded:
+            self._half_open_started -= 1
+
+    def _is_slow(self, duration: Optional[float]) -> bool:
+        return (
+            duration is not None
+            and self.slow_call_seconds is not None
+            and duration >= self.slow_call_seconds
+        )
+
+    def record_success(self, duration: Optional[float] = None) -> None:
+        """Registra una llamada exitosa (duration en segundos, para la tasa de lentas)."""
+        slow = self._is_slow(duration)
+        if self.state == CircuitState.HALF_OPEN:
+            if slow:
+                self._transition(CircuitState.OPEN, "llamada de prueba lenta")
+                return
+            self._half_open_succeeded += 1
+            if self._half_open_succeeded >= self.half_open_max_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+        if self.state == CircuitState.CLOSED:
+            self._window.append((time.monotonic(), False, slow))
+            self._evaluate()
+
+    def record_failure(self, duration: Optional[float] = None) -> None:
+        """Registra una llamada fallida (error o timeout)."""
+        if self.state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.OPEN, "falló la llamada de prueba")
+            return
+        if self.state == CircuitState.CLOSED:
+            self._window.append((time.monotonic(), True, self._is_slow(duration)))
+            self._evaluate()
+
+    def get_state(self) -> str:
+        """Retorna el estado actual como string."""
+        return self.state.value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado y tasas de la ventana (debug / endpoints)."""
+        calls, failure_rate, slow_rate = self._rates()
+        return {
+            "state": self.state.value,
+            "calls": calls,
+            "failure_count": self.failure_count,
+            "failure_rate": round(failure_rate, 3),
+            "slow_call_rate": round(slow_rate, 3),
+        }
+
+
+__all__ = ["CircuitBreaker", "CircuitState"]
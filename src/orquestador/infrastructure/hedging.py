@@ -0,0 +1,138 @@
+"""
+Hedged requests: si la llamada no respondió para cuando ya debería (percentil de la latencia
+reciente), se lanza una segunda idéntica y gana la primera que termine bien; la otra se cancela.
+
+Solo es seguro para operaciones idempotentes, por eso quien lo use debe habilitarlo de forma
+explícita. Los hedges se acotan con un presupuesto tipo token bucket: cada llamada primaria
+aporta `budget_ratio` tokens y cada hedge consume uno, así en régimen se hedgea como máximo
+esa fracción de las llamadas (p. ej. 0.1 → 10%) y un servicio lento no recibe el doble de carga.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional, Set
+
+try:
+    from . import metrics as app_metrics
+except ImportError:
+    from orquestador.infrastructure import metrics as app_metrics
+
+# Muestras mínimas antes de confiar en el percentil (antes se usa default_delay)
+_MIN_SAMPLES = 20
+# Tope de tokens acumulables: evita una ráfaga de hedges tras un periodo largo sin ellos
+_MAX_BUDGET_TOKENS = 10.0
+
+
+class LatencyTracker:
+    """Ventana de las últimas N latencias exitosas (segundos) para calcular percentiles."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentil q (0..1) de la ventana, o None si aún no hay muestras suficientes."""
+        if len(self._samples) < _MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(q * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+
+class Hedger:
+    """
+    Ejecuta llamadas con hedging para un destino (p. ej. un agente MCP).
+    Sin lock: el estado (tracker y tokens) se actualiza sin awaits intermedios.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        percentile: float = 0.95,
+        min_delay: float = 0.5,
+        default_delay: float = 2.0,
+        budget_ratio: float = 0.1,
+    ):
+        self.name = name
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.budget_ratio = budget_ratio
+        self.tracker = LatencyTracker()
+        self._tokens = 1.0
+
+    def hedge_delay(self) -> float:
+        """Espera antes de lanzar el hedge: percentil de la latencia reciente (mín. min_delay)."""
+        observed = self.tracker.percentile(self.percentile)
+        if observed is None:
+            return self.default_delay
+        return max(observed, self.min_delay)
+
+    def _try_spend_token(self) -> bool:
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    async def run(self, make_call: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        """
+        Ejecuta make_call() con hedging, acotado por timeout en total.
+
+        Args:
+            make_call: Factory de la coroutine (se llama una vez por intento).
+            timeout: Límite total (primaria + hedge); al vencer lanza asyncio.TimeoutError.
+
+        Returns:
+            Resultado de la primera llamada que termina sin excepción. Si todas fallan,
+            se propaga la excepción de la última.
+        """
+        self._tokens = min(self._tokens + self.budget_ratio, _MAX_BUDGET_TOKENS)
+        start = time.monotonic()
+        deadline = start + timeout
+        primary = asyncio.ensure_future(make_call())
+        pending: Set[asyncio.Future] = {primary}
+        hedge: Optional[asyncio.Future] = None
+        last_error: Optional[BaseException] = None
+
+        try:
+            delay = self.hedge_delay()
+            if delay < timeout:
+                await asyncio.wait(pending, timeout=delay)
+                if not primary.done():
+                    if self._try_spend_token():
+                        hedge = asyncio.ensure_future(make_call())
+                        pending.add(hedge)
+                        app_metrics.hedge_total.labels(name=self.name, outcome="fired").inc()
+                    else:
+                        app_metrics.hedge_total.labels(name=self.name, outcome="budget_exhausted").inc()
+
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError()
+                for future in done:
+                    if future.exception() is not None:
+                        last_error = future.exception()
+                        continue
+                    self.tracker.record(time.monotonic() - start)
+                    if hedge is not None:
+                        outcome = "hedge_won" if future is hedge else "primary_won"
+                        app_metrics.hedge_total.labels(name=self.name, outcome=outcome).inc()
+                    return future.result()
+            raise last_error
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+__all__ = ["Hedger", "LatencyTracker"]
@@ -1,10 +1,10 @@
 """
 Métricas del orquestador exportadas en formato Prometheus.
-Usa prometheus_client para contadores e histogramas.
+Usa prometheus_client para contadores, gauges e histogramas.
 Sin almacenamiento en memoria - Prometheus scrapeea y almacena en su DB.
 """
 
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
 
 # Contadores
 requests_total = Counter(
@@ -26,12 +26,169 @@ request_duration = Histogram(
     buckets=(0.1, 0.5, 1.0, 2.0, 5.0, 10.0)  # p50, p95, p99 calculados automáticamente
 )
 
+stream_first_event_seconds = Histogram(
+    'orquestador_stream_first_event_seconds',
+    'Time-to-first-byte del endpoint streaming: desde el request hasta el primer evento SSE',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+)
+
+prompt_tokens = Histogram(
+    'orquestador_prompt_tokens',
+    'Tokens del prompt del orquestador por parte (prefijo estático, historial, contexto de negocio)',
+    ['part'],
+    buckets=(50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000)
+)
+
+prompt_prefix_cache_total = Counter(
+    'orquestador_prompt_prefix_cache_total',
+    'Prefijo estático del prompt: reutilizado (hit) o renderizado con Jinja (miss)',
+    ['result']
+)
+
+decision_cache_total = Counter(
+    'orquestador_decision_cache_total',
+    'Cache de decisiones del orquestador: hit, miss o skip (mensaje no cacheable)',
+    ['result']
+)
+
 llm_agent_corrections_total = Counter(
     'orquestador_llm_agent_corrections_total',
     'Veces que se corrigió agent_name por desviación de modalidad',
     ['modalidad', 'llm_agent']
 )
 
+fast_path_total = Counter(
+    'orquestador_fast_path_total',
+    'Decisiones de ruteo por fast path (hit) vs LLM (miss). Hit ratio = hit / (hit + miss)',
+    ['result', 'rule']  # result: "hit" | "miss"; rule: regla que resolvió ("none" en miss)
+)
+
+speculative_mcp_total = Counter(
+    'orquestador_speculative_mcp_total',
+    'Invocaciones MCP especulativas (en paralelo al LLM) según su resultado',
+    ['outcome']  # "used" | "wasted"
+)
+
+speculative_mcp_discarded_total = Counter(
+    'orquestador_speculative_mcp_discarded_total',
+    'Especulaciones MCP descartadas; "completed" = el especialista ya procesó el turno (efectos laterales)',
+    ['agent', 'state']  # state: "cancelled" | "completed" | "failed"
+)
+
+singleflight_coalesced_total = Counter(
+    'orquestador_singleflight_coalesced_total',
+    'Llamadas que reutilizaron una ejecución en curso en vez de lanzar otra',
+    ['name']  # grupo single-flight, p. ej. "contexto_negocio"
+)
+
+contexto_cache_total = Counter(
+    'orquestador_contexto_cache_total',
+    'Lecturas del cache de contexto de negocio',
+    ['result']  # "hit" | "stale" (servido y refrescado en background) | "miss"
+)
+
+mcp_budget_exhausted_total = Counter(
+    'orquestador_mcp_budget_exhausted_total',
+    'Invocaciones MCP que cortaron reintentos por falta de presupuesto de CHAT_TIMEOUT',
+    ['agent']
+)
+
+session_mailbox_queued_total = Counter(
+    'orquestador_session_mailbox_queued_total',
+    'Mensajes que esperaron a que terminara otro turno de la misma sesión'
+)
+
+session_mailbox_coalesced_total = Counter(
+    'orquestador_session_mailbox_coalesced_total',
+    'Mensajes absorbidos en el turno de otro mensaje de la misma ráfaga (LLM/MCP ahorrados)'
+)
+
+mcp_session_pool_total = Counter(
+    'orquestador_mcp_session_pool_total',
+    'Eventos del pool de sesiones MCP: reuse, open, error, dead, ping_failed, closed',
+    ['agent', 'event']
+)
+
+mcp_tools_refresh_total = Counter(
+    'orquestador_mcp_tools_refresh_total',
+    'Cargas de tools MCP por servidor (warm-up, refresher, admin o primer uso)',
+    ['agent', 'result']
+)
+
+hedge_total = Counter(
+    'orquestador_hedge_total',
+    'Hedged requests por destino: fired, budget_exhausted, primary_won, hedge_won',
+    ['name', 'outcome']
+)
+
+circuit_breaker_transitions_total = Counter(
+    'orquestador_circuit_breaker_transitions_total',
+    'Transiciones de estado de los circuit breakers (closed, open, half_open)',
+    ['name', 'from_state', 'to_state']
+)
+
+circuit_breaker_rejected_total = Counter(
+    'orquestador_circuit_breaker_rejected_total',
+    'Llamadas rechazadas por un circuit breaker abierto (o sin cupo de prueba en half_open)',
+    ['name']
+)
+
+bulkhead_queue_wait_seconds = Histogram(
+    'orquestador_bulkhead_queue_wait_seconds',
+    'Espera por un lugar en el bulkhead (0 si había lugar libre)',
+    ['name'],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+)
+
+bulkhead_in_flight = Gauge(
+    'orquestador_bulkhead_in_flight',
+    'Llamadas en curso dentro del bulkhead',
+    ['name']
+)
+
+bulkhead_rejected_total = Counter(
+    'orquestador_bulkhead_rejected_total',
+    'Llamadas rechazadas por el bulkhead: queue_full o queue_timeout',
+    ['name', 'reason']
+)
+
+admission_in_flight = Gauge(
+    'orquestador_admission_in_flight',
+    'Requests de chat admitidos y en curso'
+)
+
+admission_rejected_total = Counter(
+    'orquestador_admission_rejected_total',
+    'Requests de chat rechazados por sobrecarga: max_in_flight, new_session (429) o latency (503)',
+    ['reason']
+)
+
+openai_rate_limit_wait_seconds = Histogram(
+    'orquestador_openai_rate_limit_wait_seconds',
+    'Espera en el rate limiter de OpenAI antes de enviar la llamada',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+)
+
+openai_throttled_total = Counter(
+    'orquestador_openai_throttled_total',
+    'Llamadas a OpenAI frenadas: local_queued (esperó cupo), local_rejected (sin cupo a tiempo), http_429',
+    ['reason']
+)
+
+llm_model_duration_seconds = Histogram(
+    'orquestador_llm_model_duration_seconds',
+    'Duración de la llamada a cada modelo del pool (result: success o el motivo del fallo)',
+    ['model', 'result'],
+    buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+)
+
+llm_model_fallback_total = Counter(
+    'orquestador_llm_model_fallback_total',
+    'Escaladas al siguiente modelo del pool, por modelo abandonado y motivo '
+    '(validation, length, refusal, timeout, error, rate_limit, circuit_open)',
+    ['model', 'reason']
+)
+
 
 async def record_request(latency_seconds: float, action: str, error: bool = False) -> None:
     """
@@ -65,5 +222,31 @@ __all__ = [
     "requests_total",
     "requests_by_action",
     "request_duration",
+    "stream_first_event_seconds",
+    "prompt_tokens",
+    "prompt_prefix_cache_total",
+    "decision_cache_total",
     "llm_agent_corrections_total",
+    "fast_path_total",
+    "speculative_mcp_total",
+    "speculative_mcp_discarded_total",
+    "singleflight_coalesced_total",
+    "contexto_cache_total",
+    "mcp_budget_exhausted_total",
+    "session_mailbox_queued_total",
+    "session_mailbox_coalesced_total",
+    "mcp_session_pool_total",
+    "mcp_tools_refresh_total",
+    "hedge_total",
+    "circuit_breaker_transitions_total",
+    "circuit_breaker_rejected_total",
+    "bulkhead_queue_wait_seconds",
+    "bulkhead_in_flight",
+    "bulkhead_rejected_total",
+    "admission_in_flight",
+    "admission_rejected_total",
+    "openai_rate_limit_wait_seconds",
+    "openai_throttled_total",
+    "llm_model_duration_seconds",
+    "llm_model_fallback_total",
 ]
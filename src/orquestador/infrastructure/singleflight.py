@@ -0,0 +1,60 @@
+"""
+Single-flight: deduplica llamadas concurrentes por clave.
+Si ya hay una ejecución en curso para la clave, las demás coroutines esperan su resultado
+en vez de lanzar otra (evita thundering herd al expirar un cache).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+try:
+    from . import metrics as app_metrics
+except ImportError:
+    from orquestador.infrastructure import metrics as app_metrics
+
+
+class SingleFlight:
+    """
+    Grupo single-flight. La ejecución corre en su propia Task: si la coroutine que la inició
+    se cancela (p. ej. por timeout del chat), las que esperan siguen recibiendo el resultado.
+    No necesita lock: el check-and-set sobre _inflight ocurre sin awaits intermedios.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """True si hay una ejecución en curso para la clave."""
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta fn() una sola vez por clave entre llamadas concurrentes.
+
+        Args:
+            key: Clave de deduplicación (p. ej. id_empresa)
+            fn: Factory de la coroutine a ejecutar (solo se llama si no hay una en curso)
+
+        Returns:
+            Resultado (o excepción) de la ejecución compartida.
+        """
+        task: Optional[asyncio.Task] = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            app_metrics.singleflight_coalesced_total.labels(name=self.name).inc()
+        # shield: cancelar a un waiter no cancela la ejecución compartida
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Evita "Task exception was never retrieved" si todos los waiters se cancelaron
+        if not task.cancelled():
+            task.exception()
+
+
+__all__ = ["SingleFlight"]
@@ -0,0 +1,226 @@
+"""
+Cliente del contexto de negocio (ws_informacion_ia.php).
+Cliente HTTP async compartido (httpx, pool keep-alive, HTTP/2 si está disponible),
+concurrencia acotada con semáforo, cache stale-while-revalidate, single-flight por id_empresa,
+circuit breaker y retry con backoff no bloqueante.
+"""
+
+import asyncio
+import time
+from typing import Iterable, Optional, Set, Tuple
+
+import httpx
+from cachetools import LRUCache, TTLCache
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure.logging_config import get_logger
+    from ..infrastructure.singleflight import SingleFlight
+    from ..infrastructure.circuit_breaker import CircuitBreaker
+    from ..infrastructure import metrics as app_metrics
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure.logging_config import get_logger
+    from orquestador.infrastructure.singleflight import SingleFlight
+    from orquestador.infrastructure.circuit_breaker import CircuitBreaker
+    from orquestador.infrastructure import metrics as app_metrics
+
+# HTTP/2 requiere el extra "h2"; si no está instalado se usa HTTP/1.1 con keep-alive.
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = get_logger("contexto_negocio")
+
+# Cliente HTTP compartido por proceso (lazy init). Reutiliza conexiones entre requests.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_lock = asyncio.Lock()
+
+# Máximo de fetches simultáneos al endpoint de contexto (los demás esperan sin ocupar threads)
+_fetch_semaphore = asyncio.Semaphore(app_config.CONTEXTO_NEGOCIO_MAX_CONCURRENCY)
+
+# Cache stale-while-revalidate con límite de tamaño para evitar memory leak en producción multiempresa.
+# maxsize=500 → máximo 500 empresas en memoria simultáneamente (LRU eviction al superar límite)
+# TTL blando (CONTEXTO_NEGOCIO_CACHE_TTL): pasado este tiempo la entrada se sigue sirviendo
+#   de inmediato pero se refresca en background.
+# TTL duro (blando + CONTEXTO_NEGOCIO_CACHE_MAX_STALE): TTLCache expulsa la entrada y el
+#   siguiente request sí espera el fetch.
+_CONTEXTO_SOFT_TTL = app_config.CONTEXTO_NEGOCIO_CACHE_TTL
+_CONTEXTO_HARD_TTL = app_config.CONTEXTO_NEGOCIO_CACHE_TTL + app_config.CONTEXTO_NEGOCIO_CACHE_MAX_STALE
+# id_empresa -> (contexto, time.monotonic() del fetch)
+_contexto_cache: TTLCache = TTLCache(maxsize=500, ttl=_CONTEXTO_HARD_TTL)
+
+# Referencias a refrescos en background (evita que el GC recoja tasks en curso)
+_refresh_tasks: Set[asyncio.Task] = set()
+
+# Circuit breaker por id_empresa (ventana deslizante, ver infrastructure/circuit_breaker.py).
+# Cada fetch (con sus reintentos) es una llamada: abre con >= 50% de fetches fallidos entre los
+# últimos 10 de 5 min, evaluando desde 3. LRU para acotar memoria en producción multiempresa.
+_contexto_breakers: LRUCache = LRUCache(maxsize=500)  # id_empresa -> CircuitBreaker
+_CONTEXTO_BREAKER_MIN_CALLS = 3
+_CONTEXTO_BREAKER_RESET_TIMEOUT = 60
+
+# Un solo fetch en vuelo por id_empresa: los cache miss concurrentes esperan ese resultado
+_contexto_singleflight = SingleFlight("contexto_negocio")
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """
+    Lazy init del cliente HTTP compartido. Double-checked locking para una única instancia.
+    """
+    global _http_client
+
+    if _http_client is not None:
+        return _http_client
+
+    async with _http_client_lock:
+        if _http_client is None:
+            limits = httpx.Limits(
+                max_connections=app_config.CONTEXTO_NEGOCIO_MAX_CONCURRENCY,
+                max_keepalive_connections=app_config.CONTEXTO_NEGOCIO_MAX_CONCURRENCY,
+            )
+            _http_client = httpx.AsyncClient(
+                timeout=app_config.CONTEXTO_NEGOCIO_TIMEOUT,
+                limits=limits,
+                http2=HTTP2_AVAILABLE,
+                headers={"Content-Type": "application/json", "Accept": "application/json"},
+            )
+            logger.info("Cliente HTTP inicializado (http2=%s)", HTTP2_AVAILABLE)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Cierra el cliente HTTP compartido (shutdown de la app)."""
+    global _http_client
+    async with _http_client_lock:
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
+
+
+def _get_contexto_breaker(id_empresa: int) -> CircuitBreaker:
+    """Circuit breaker de la empresa (creado en el primer uso). Las métricas se agregan en "contexto"."""
+    breaker = _contexto_breakers.get(id_empresa)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            "contexto",
+            window_size=10,
+            window_seconds=300,
+            min_calls=_CONTEXTO_BREAKER_MIN_CALLS,
+            failure_rate_threshold=0.5,
+            # Un fetch que tarda más que el timeout de un intento ya tuvo que reintentar
+            slow_call_seconds=app_config.CONTEXTO_NEGOCIO_TIMEOUT,
+            reset_timeout=_CONTEXTO_BREAKER_RESET_TIMEOUT,
+        )
+        _contexto_breakers[id_empresa] = breaker
+    return breaker
+
+
+async def fetch_contexto_negocio(id_empresa: int) -> Optional[str]:
+    """
+    Obtiene contexto de negocio con cache stale-while-revalidate + single-flight + circuit breaker
+    + retry con backoff. Cachea incluso contexto vacío para evitar thrashing.
+    Totalmente async: el backoff usa asyncio.sleep y no ocupa threads del executor.
+    """
+    # 1. Verificar cache: TTLCache expulsa solo al TTL duro; el TTL blando se evalúa aquí
+    entry: Optional[Tuple[str, float]] = _contexto_cache.get(id_empresa)
+    if entry is not None:
+        contexto, fetched_at = entry
+        if time.monotonic() - fetched_at < _CONTEXTO_SOFT_TTL:
+            app_metrics.contexto_cache_total.labels(result="hit").inc()
+        else:
+            # Vencido pero reciente: se sirve ya y se refresca fuera del camino del usuario
+            app_metrics.contexto_cache_total.labels(result="stale").inc()
+            _schedule_refresh(id_empresa)
+        logger.debug(
+            "Contexto desde cache para id_empresa=%s (valor=%s)",
+            id_empresa, "vacío" if not contexto else "presente"
+        )
+        return contexto if contexto else None
+
+    # 2. Cache miss (o pasado el TTL duro): un único fetch por id_empresa aunque haya
+    #    muchos requests concurrentes
+    app_metrics.contexto_cache_total.labels(result="miss").inc()
+    return await _contexto_singleflight.do(id_empresa, lambda: _fetch_contexto_remoto(id_empresa))
+
+
+async def prefetch_contexto_negocio(ids_empresa: Iterable[int]) -> int:
+    """
+    Precarga el contexto de varias empresas en paralelo (warm-up).
+    Abre además el pool de conexiones del cliente HTTP compartido.
+
+    Returns:
+        Cantidad de empresas con contexto no vacío.
+    """
+    await get_http_client()
+    results = await asyncio.gather(
+        *(fetch_contexto_negocio(id_empresa) for id_empresa in ids_empresa),
+        return_exceptions=True,
+    )
+    return sum(1 for r in results if isinstance(r, str) and r)
+
+
+def _schedule_refresh(id_empresa: int) -> None:
+    """Lanza un refresco en background si no hay ya un fetch en curso para la empresa."""
+    if _contexto_singleflight.in_flight(id_empresa):
+        return
+    task = asyncio.ensure_future(
+        _contexto_singleflight.do(id_empresa, lambda: _fetch_contexto_remoto(id_empresa))
+    )
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+async def _fetch_contexto_remoto(id_empresa: int) -> Optional[str]:
+    """Fetch al endpoint con circuit breaker y retry. Ejecutado vía single-flight."""
+    # Verificar circuit breaker
+    breaker = _get_contexto_breaker(id_empresa)
+    if not breaker.can_attempt():
+        logger.warning("Circuit abierto para contexto de negocio id_empresa=%s", id_empresa)
+        return None
+    start = time.monotonic()
+
+    # Retry con backoff exponencial (hasta 2 intentos)
+    max_retries = 2
+    client = await get_http_client()
+    payload = {"codOpe": "OBTENER_CONTEXTO_NEGOCIO", "id_empresa": id_empresa}
+
+    for attempt in range(max_retries):
+        try:
+            async with _fetch_semaphore:
+                resp = await client.post(app_config.CONTEXTO_NEGOCIO_ENDPOINT, json=payload)
+            resp.raise_for_status()
+            data = resp.json()
+            if data.get("success"):
+                contexto = data.get("contexto_negocio") or ""
+                # Re-asignar renueva el TTL duro; el timestamp renueva el blando
+                _contexto_cache[id_empresa] = (contexto, time.monotonic())
+                breaker.record_success(time.monotonic() - start)
+                return contexto if contexto else None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(
+                "Error obteniendo contexto intento %d/%d id_empresa=%s: %s",
+                attempt + 1, max_retries, id_empresa, e
+            )
+        if attempt < max_retries - 1:
+            await asyncio.sleep(2 ** attempt)  # backoff: 1s, 2s
+
+    # Todos los intentos fallaron: cuenta como un fallo para el circuit breaker.
+    # Si había una entrada vencida en cache se sigue sirviendo hasta el TTL duro.
+    logger.debug("Todos los intentos fallaron para contexto id_empresa=%s", id_empresa)
+    breaker.record_failure(time.monotonic() - start)
+
+    return None
+
+
+__all__ = [
+    "fetch_contexto_negocio",
+    "prefetch_contexto_negocio",
+    "get_http_client",
+    "close_http_client",
+    "HTTP2_AVAILABLE",
+]
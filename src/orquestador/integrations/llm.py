@@ -1,85 +1,386 @@
 """
 Cliente LLM del orquestador (OpenAI). Carga y usa el agente orquestador.
 Inicialización lazy protegida con asyncio.Lock para concurrencia segura.
+Pool ordenado de modelos: la decisión la toma el primero (el más barato y rápido) y solo se
+escala al siguiente si falla (structured output inválido, truncado o rechazado, timeout, error
+del servidor, 429 de ese modelo) o si su circuit breaker está abierto.
+Cada llamada pasa por el rate limiter del proceso (rate_limiter.py); los 429, 5xx y cortes de
+conexión se reintentan aquí con backoff + jitter dentro del deadline del chat (el SDK no
+reintenta: max_retries=0, sus reintentos ignorarían el deadline y la pausa por retry-after).
 """
 
 import asyncio
-from typing import Optional, Tuple
+import random
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import openai
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+from langchain_core.utils.json import parse_partial_json
 from langchain_openai import ChatOpenAI
+from langchain_openai.chat_models.base import OpenAIRefusalError
 from pydantic import ValidationError
 
 try:
     from ..config import config as app_config
     from ..config.models import OrquestradorDecision
     from ..infrastructure.logging_config import get_logger
+    from ..infrastructure import metrics as app_metrics
+    from ..infrastructure.circuit_breaker import CircuitBreaker
+    from .rate_limiter import openai_rate_limiter, OpenAIThrottledError, retry_after_seconds
 except ImportError:
     from orquestador.config import config as app_config
     from orquestador.config.models import OrquestradorDecision
     from orquestador.infrastructure.logging_config import get_logger
+    from orquestador.infrastructure import metrics as app_metrics
+    from orquestador.infrastructure.circuit_breaker import CircuitBreaker
+    from orquestador.integrations.rate_limiter import (
+        openai_rate_limiter,
+        OpenAIThrottledError,
+        retry_after_seconds,
+    )
 
 logger = get_logger("llm")
-_llm: Optional[ChatOpenAI] = None
-_structured_llm: Optional[ChatOpenAI] = None
 _llm_lock = asyncio.Lock()
 
+# Callback que recibe fragmentos (deltas) del campo "response" mientras el LLM los genera
+TokenCallback = Callable[[str], Awaitable[None]]
+
+
+class _ModelSlot:
+    """
+    Un modelo del pool: cliente ChatOpenAI (con su timeout y base_url), sus variantes
+    structured/streaming y un circuit breaker que lo saltea mientras falla.
+    """
+
+    __slots__ = ("label", "llm", "structured", "streaming", "breaker")
 
-def _create_llm_if_needed() -> None:
-    """Crea _llm si no existe. Llamar solo desde dentro de _llm_lock."""
-    global _llm
-    if _llm is None:
-        key = app_config.OPENAI_API_KEY
-        if not key:
-            raise ValueError("OPENAI_API_KEY no configurada")
-        _llm = ChatOpenAI(
-            api_key=key,
-            model=app_config.OPENAI_MODEL,
+    def __init__(self, model: str, timeout: float, base_url: Optional[str], api_key: str):
+        host = urlparse(base_url).netloc if base_url else ""
+        # Etiqueta de métricas/logs: el mismo modelo en otro deployment se distingue por host
+        self.label = f"{model}@{host}" if host else model
+        self.llm = ChatOpenAI(
+            api_key=api_key,
+            model=model,
+            base_url=base_url,
             temperature=0.4,
-            max_tokens=4096,
-            timeout=app_config.OPENAI_TIMEOUT,
+            max_tokens=app_config.OPENAI_MAX_TOKENS,
+            timeout=timeout,
+            max_retries=0,
         )
+        self.structured = self.llm.with_structured_output(OrquestradorDecision)
+        # Mismo response_format pero sin el parser final, para leer el JSON crudo token a token
+        self.streaming = self.llm.bind(response_format=OrquestradorDecision)
+        self.breaker = CircuitBreaker(
+            f"llm_{self.label}",
+            min_calls=app_config.OPENAI_MODEL_BREAKER_MIN_CALLS,
+            reset_timeout=app_config.OPENAI_MODEL_BREAKER_RESET_TIMEOUT,
+        )
+
 
+# Pool ordenado: OPENAI_MODEL primero (el más barato/rápido), luego OPENAI_MODEL_FALLBACKS
+_models: Optional[List[_ModelSlot]] = None
 
-async def _get_structured_llm() -> ChatOpenAI:
+
+def _parse_model_fallbacks(raw: str) -> List[Tuple[str, float, Optional[str]]]:
     """
-    Lazy init del LLM con structured output.
-    Usa .with_structured_output() para retornar JSON según el schema OrquestradorDecision.
-    Protegido con lock para evitar race en init concurrente.
+    "modelo|timeout|base_url,..." → [(modelo, timeout, base_url)]. timeout y base_url son
+    opcionales ("gpt-4o", "gpt-4o|45", "gpt-4o-mini||https://otro-deployment/v1").
     """
-    global _structured_llm
+    specs = []
+    for entry in raw.split(","):
+        parts = [p.strip() for p in entry.split("|")]
+        if not parts[0]:
+            continue
+        timeout = float(parts[1]) if len(parts) > 1 and parts[1] else float(app_config.OPENAI_TIMEOUT)
+        base_url = parts[2] if len(parts) > 2 and parts[2] else None
+        specs.append((parts[0], timeout, base_url))
+    return specs
+
+
+async def _get_model_pool() -> List[_ModelSlot]:
+    """Lazy init del pool de modelos. Protegido con lock para evitar race en init concurrente."""
+    global _models
+    if _models is not None:
+        return _models
     async with _llm_lock:
-        if _structured_llm is None:
-            _create_llm_if_needed()
-            _structured_llm = _llm.with_structured_output(OrquestradorDecision)
-    return _structured_llm
+        if _models is None:
+            key = app_config.OPENAI_API_KEY
+            if not key:
+                raise ValueError("OPENAI_API_KEY no configurada")
+            specs = [(app_config.OPENAI_MODEL, float(app_config.OPENAI_TIMEOUT), app_config.OPENAI_BASE_URL or None)]
+            specs += _parse_model_fallbacks(app_config.OPENAI_MODEL_FALLBACKS)
+            _models = [_ModelSlot(model, timeout, base_url, key) for model, timeout, base_url in specs]
+            logger.info("Pool de modelos LLM: %s", [slot.label for slot in _models])
+    return _models
+
+
+class _TokenRelay:
+    """Reenvía los fragmentos a on_token y recuerda si ya se emitió alguno (no se puede reintentar)."""
+
+    __slots__ = ("on_token", "emitted")
+
+    def __init__(self, on_token: TokenCallback):
+        self.on_token = on_token
+        self.emitted = False
 
+    async def __call__(self, delta: str) -> None:
+        self.emitted = True
+        await self.on_token(delta)
 
-async def invoke_orquestador(system_prompt: str, message: str) -> Tuple[str, Optional[str]]:
+
+async def _astream_decision(streaming_llm: Any, messages: List[BaseMessage], on_token: TokenCallback) -> OrquestradorDecision:
+    """
+    Genera la decisión en streaming. Parsea el JSON parcial en cada chunk y, cuando la acción
+    es "respond", reenvía a on_token solo lo nuevo del campo "response".
+    Al delegar no se reenvía nada: el texto transitorio no es la respuesta final.
+    """
+    buffer = ""
+    emitted = 0
+    async for chunk in streaming_llm.astream(messages):
+        if not isinstance(chunk.content, str) or not chunk.content:
+            continue
+        buffer += chunk.content
+        partial = parse_partial_json(buffer)
+        if not isinstance(partial, dict) or partial.get("action") != "respond":
+            continue
+        text = partial.get("response")
+        if isinstance(text, str) and len(text) > emitted:
+            await on_token(text[emitted:])
+            emitted = len(text)
+    return OrquestradorDecision.model_validate_json(buffer)
+
+
+def _remaining_budget(deadline: Optional[float]) -> float:
+    """Segundos disponibles antes del deadline del chat (descontando el margen de cierre)."""
+    if deadline is None:
+        return float("inf")
+    return deadline - time.monotonic() - app_config.CHAT_DEADLINE_MARGIN
+
+
+def _is_retryable(error: Exception, can_escalate: bool = False) -> bool:
+    """
+    429 (salvo cuota agotada), 5xx y cortes de conexión; un timeout no se reintenta.
+    can_escalate=True: nada se reintenta, hay otro modelo del pool al que escalar.
+    """
+    if can_escalate or isinstance(error, openai.APITimeoutError):
+        return False
+    if isinstance(error, openai.RateLimitError):
+        return getattr(error, "code", None) != "insufficient_quota"
+    return isinstance(error, (openai.InternalServerError, openai.APIConnectionError))
+
+
+async def _invoke_with_retries(
+    llm: Any,
+    messages: List[BaseMessage],
+    relay: Optional[_TokenRelay],
+    deadline: Optional[float],
+    scope: str = "",
+    can_escalate: bool = False,
+) -> OrquestradorDecision:
+    """
+    Espera cupo en el rate limiter e invoca al LLM, reintentando los errores transitorios con
+    backoff exponencial + jitter (o el retry-after de OpenAI) mientras quede presupuesto.
+    En streaming no se reintenta si ya se reenviaron fragmentos al cliente.
+    scope: destino (modelo del pool) al que se aplica la pausa de un retry-after.
+    """
+    tokens = openai_rate_limiter.estimate_tokens(messages)
+    attempt = 0
+    while True:
+        max_wait = min(app_config.OPENAI_RATE_LIMIT_MAX_WAIT, _remaining_budget(deadline))
+        await openai_rate_limiter.acquire(tokens, max_wait=max_wait, scope=scope)
+        try:
+            if relay is not None:
+                return await _astream_decision(llm, messages, relay)
+            return await llm.ainvoke(messages)
+        except openai.APIError as e:
+            retry_after = retry_after_seconds(e)
+            if isinstance(e, openai.RateLimitError):
+                app_metrics.openai_throttled_total.labels(reason="http_429").inc()
+                if retry_after is not None:
+                    # Las demás llamadas a este modelo también esperan (los de respaldo no)
+                    openai_rate_limiter.pause_until(time.monotonic() + retry_after, scope=scope)
+            if not _is_retryable(e, can_escalate) or (relay is not None and relay.emitted):
+                raise
+            attempt += 1
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, app_config.OPENAI_RETRY_BASE)
+            else:
+                delay = random.uniform(0, min(app_config.OPENAI_RETRY_MAX, app_config.OPENAI_RETRY_BASE * 2 ** (attempt - 1)))
+            if attempt > app_config.OPENAI_MAX_RETRIES or delay >= _remaining_budget(deadline):
+                raise
+            logger.warning(
+                "Error transitorio de OpenAI (%s), reintento %d/%d en %.2fs",
+                type(e).__name__, attempt, app_config.OPENAI_MAX_RETRIES, delay
+            )
+            await asyncio.sleep(delay)
+
+
+def _fallback_reason(error: BaseException) -> Optional[str]:
+    """Motivo para escalar al siguiente modelo, o None si el error no se resuelve cambiando de modelo."""
+    if isinstance(error, (ValidationError, OutputParserException)):
+        return "validation"
+    if isinstance(error, openai.LengthFinishReasonError):
+        return "length"
+    if isinstance(error, (OpenAIRefusalError, openai.ContentFilterFinishReasonError)):
+        return "refusal"
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError)):
+        return "timeout"
+    if isinstance(error, openai.RateLimitError):
+        # OpenAI limita por modelo y otro deployment tiene su propio límite
+        return "rate_limit"
+    if isinstance(error, (openai.InternalServerError, openai.APIConnectionError)):
+        return "error"
+    # Sin cupo local (el limitador RPM/TPM es de la cuenta) y credenciales inválidas: igual en todos
+    return None
+
+
+async def _invoke_model_pool(
+    messages: List[BaseMessage],
+    on_token: Optional[TokenCallback],
+    deadline: Optional[float],
+) -> OrquestradorDecision:
+    """
+    Prueba los modelos del pool en orden hasta obtener una decisión válida. Saltea los que
+    tienen el circuit breaker abierto o están pausados por un retry-after (salvo que sea el
+    último y no se haya probado ninguno). Con streaming no se escala si ya se reenviaron
+    fragmentos al cliente.
+    """
+    pool = await _get_model_pool()
+    relay = _TokenRelay(on_token) if on_token is not None else None
+    tried = 0
+    last_error: Optional[BaseException] = None
+    for index, slot in enumerate(pool):
+        is_last = index == len(pool) - 1
+        can_skip = not (is_last and tried == 0)
+        if can_skip and openai_rate_limiter.paused_for(slot.label) > 0:
+            logger.warning("Modelo %s pausado por rate limit, se saltea", slot.label)
+            app_metrics.llm_model_fallback_total.labels(model=slot.label, reason="rate_limit").inc()
+            continue
+        # El último recurso se invoca aunque el circuit esté abierto: no es un rechazo.
+        # Sin permiso del breaker no se le reporta resultado (no ocupa ninguna prueba).
+        admitted = slot.breaker.can_attempt(record_rejection=can_skip)
+        if not admitted and can_skip:
+            logger.warning("Modelo %s con circuit abierto, se saltea", slot.label)
+            app_metrics.llm_model_fallback_total.labels(model=slot.label, reason="circuit_open").inc()
+            continue
+        tried += 1
+        llm = slot.streaming if relay is not None else slot.structured
+        start = time.monotonic()
+        try:
+            decision = await _invoke_with_retries(
+                llm, messages, relay, deadline, scope=slot.label, can_escalate=not is_last
+            )
+            if decision is None:
+                # El parser de structured output devuelve None si no hubo decisión parseable
+                raise OpenAIRefusalError("El modelo no devolvió una decisión")
+        except OpenAIThrottledError:
+            # Sin cupo local: el modelo no llegó a responder, se devuelve la prueba
+            if admitted:
+                slot.breaker.release()
+            raise
+        except Exception as e:
+            elapsed = time.monotonic() - start
+            reason = _fallback_reason(e)
+            app_metrics.llm_model_duration_seconds.labels(model=slot.label, result=reason or "error").observe(elapsed)
+            if admitted:
+                if reason == "rate_limit":
+                    # Un 429 es de cupo, no de salud del modelo
+                    slot.breaker.release()
+                else:
+                    slot.breaker.record_failure(elapsed)
+            if reason is None or is_last or (relay is not None and relay.emitted):
+                raise
+            logger.warning(
+                "Modelo %s falló (%s: %s), escalando al siguiente del pool",
+                slot.label, reason, type(e).__name__
+            )
+            app_metrics.llm_model_fallback_total.labels(model=slot.label, reason=reason).inc()
+            last_error = e
+            continue
+        except BaseException:
+            # Cancelada (deadline del request o cliente desconectado)
+            if admitted:
+                slot.breaker.release()
+            raise
+        elapsed = time.monotonic() - start
+        if admitted:
+            slot.breaker.record_success(elapsed)
+        app_metrics.llm_model_duration_seconds.labels(model=slot.label, result="success").observe(elapsed)
+        return decision
+    # Los restantes tenían el circuit abierto: se propaga el error del último modelo probado
+    raise last_error
+
+
+async def warmup_llm() -> bool:
+    """
+    Inicializa el pool de clientes OpenAI (structured output) antes del primer request.
+    Devuelve False si falta configuración; el error real se reporta en el primer chat.
+    """
+    try:
+        await _get_model_pool()
+        return True
+    except ValueError as e:
+        logger.warning("Warm-up LLM omitido: %s", e)
+        return False
+
+
+async def invoke_orquestador(
+    system_prompt: str,
+    message: str,
+    on_token: Optional[TokenCallback] = None,
+) -> Tuple[str, Optional[str]]:
     """
     Invoca el agente orquestador (OpenAI) con system prompt y mensaje del usuario.
-    Usa structured output para obtener decisión estructurada (delegar o responder).
+    Equivale a invoke_orquestador_messages([SystemMessage, HumanMessage]).
 
     Args:
         system_prompt: Prompt del sistema (identidad, reglas, frases).
         message: Mensaje del cliente.
+        on_token: Opcional. Ver invoke_orquestador_messages.
 
     Returns:
-        Tupla (respuesta, agente_a_invocar):
-        - respuesta: Respuesta del orquestador (texto)
-        - agente_a_invocar: "venta", "cita", "reserva" o None si responde directamente
+        Tupla (respuesta, agente_a_invocar), ver invoke_orquestador_messages.
     """
-    structured_llm = await _get_structured_llm()
-    
     messages = [
         SystemMessage(content=system_prompt),
         HumanMessage(content=message),
     ]
-    
+    return await invoke_orquestador_messages(messages, on_token=on_token)
+
+
+async def invoke_orquestador_messages(
+    messages: List[BaseMessage],
+    on_token: Optional[TokenCallback] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Invoca el agente orquestador (OpenAI) con la lista de mensajes ya armada
+    (ver prompts.build_orquestador_messages).
+    Usa structured output para obtener decisión estructurada (delegar o responder), escalando
+    por el pool de modelos si el primero falla.
+
+    Args:
+        messages: Mensajes del chat; el último es el mensaje del cliente.
+        on_token: Opcional. Si se pasa, la decisión se genera en streaming y los fragmentos
+                  de la respuesta directa (action="respond") se reenvían apenas existen.
+        deadline: Opcional. Instante (time.monotonic()) en que vence el chat; acota la espera
+                  en el rate limiter y los reintentos.
+
+    Returns:
+        Tupla (respuesta, agente_a_invocar):
+        - respuesta: Respuesta del orquestador (texto)
+        - agente_a_invocar: "venta", "cita", "reserva" o None si responde directamente
+    """
     # Invocar con structured output: retorna OrquestradorDecision
+    decision: OrquestradorDecision
     try:
-        decision: OrquestradorDecision = await structured_llm.ainvoke(messages)
+        decision = await _invoke_model_pool(messages, on_token, deadline)
+    except OpenAIThrottledError as e:
+        logger.warning("Sin cupo de OpenAI a tiempo (espera estimada %.1fs)", e.retry_after)
+        raise
     except asyncio.TimeoutError:
         logger.error("Timeout invocando OpenAI (>%ss)", app_config.OPENAI_TIMEOUT)
         raise RuntimeError("OpenAI no respondió a tiempo")
@@ -87,17 +388,25 @@ async def invoke_orquestador(system_prompt: str, message: str) -> Tuple[str, Opt
         logger.error("API key inválida o sin permisos: %s", e)
         raise ValueError("OPENAI_API_KEY inválida o expirada")
     except openai.RateLimitError as e:
+        if getattr(e, "code", None) == "insufficient_quota":
+            logger.error("Cuota de OpenAI agotada: %s", e)
+            raise RuntimeError("Cuota de OpenAI agotada")
         logger.warning("Rate limit de OpenAI alcanzado: %s", e)
-        raise RuntimeError("Límite de OpenAI alcanzado, intenta de nuevo")
+        raise OpenAIThrottledError(
+            "Límite de OpenAI alcanzado, intenta de nuevo", retry_after=retry_after_seconds(e) or 1.0
+        )
     except openai.APIConnectionError as e:
         logger.error("Sin conexión a OpenAI: %s", e)
         raise RuntimeError("No se pudo conectar a OpenAI")
     except openai.APIStatusError as e:
         logger.error("Error HTTP de OpenAI status=%s: %s", e.status_code, e)
         raise RuntimeError(f"OpenAI retornó error {e.status_code}")
-    except ValidationError as e:
-        logger.error("Structured output no válido: %s", e)
+    except (ValidationError, OutputParserException, openai.LengthFinishReasonError) as e:
+        logger.error("Structured output no válido (%s): %s", type(e).__name__, e)
         raise RuntimeError("Respuesta de OpenAI no tiene el formato esperado")
+    except (OpenAIRefusalError, openai.ContentFilterFinishReasonError) as e:
+        logger.error("OpenAI rechazó generar la decisión (%s): %s", type(e).__name__, e)
+        raise RuntimeError("OpenAI no devolvió una decisión")
     except asyncio.CancelledError:
         raise
     except Exception as e:
@@ -1,13 +1,17 @@
 """
 Cliente MCP para consumir agentes especializados (Venta, Cita, Reserva).
-Incluye circuit breaker y retry con backoff exponencial.
+Incluye circuit breaker de ventana deslizante y retry con backoff exponencial. Las llamadas a las tools usan
+sesiones persistentes del pool por servidor (ver mcp_session_pool.py).
+
+El descubrimiento de tools queda fuera del camino del request: se cargan en el warm-up y un
+refresher en background las renueva por servidor (MCP_TOOLS_TTL) y reintenta con backoff los
+servidores que fallaron (cache negativo). POST /admin/mcp/tools/reload fuerza la recarga.
 """
 
 import ast
 import asyncio
 import time
-from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Union
 
 try:
     from langchain_mcp_adapters.client import MultiServerMCPClient
@@ -19,114 +23,128 @@ except ImportError:
 try:
     from ..config import config as app_config
     from ..infrastructure.logging_config import get_logger
+    from ..infrastructure import metrics as app_metrics
+    from ..infrastructure.singleflight import SingleFlight
+    from ..infrastructure.hedging import Hedger
+    from ..infrastructure.bulkhead import Bulkhead, BulkheadFull
+    from ..infrastructure.circuit_breaker import CircuitBreaker, CircuitState
+    from .mcp_session_pool import get_session_pool
 except ImportError:
     from orquestador.config import config as app_config
     from orquestador.infrastructure.logging_config import get_logger
+    from orquestador.infrastructure import metrics as app_metrics
+    from orquestador.infrastructure.singleflight import SingleFlight
+    from orquestador.infrastructure.hedging import Hedger
+    from orquestador.infrastructure.bulkhead import Bulkhead, BulkheadFull
+    from orquestador.infrastructure.circuit_breaker import CircuitBreaker, CircuitState
+    from orquestador.integrations.mcp_session_pool import get_session_pool
 
 logger = get_logger("mcp_client")
 _mcp_client: Optional[MultiServerMCPClient] = None
 _mcp_client_lock = asyncio.Lock()
 
-# Cache de tools: se carga una sola vez en el primer uso.
-# Las tools de los agentes MCP no cambian en tiempo de ejecución.
-_tools_cache: Optional[List] = None
-_tools_cache_lock = asyncio.Lock()
-
-
-class CircuitState(Enum):
-    """Estados del circuit breaker"""
-    CLOSED = "closed"  # Funcionando normalmente
-    OPEN = "open"  # Fallando, rechazando requests
-    HALF_OPEN = "half_open"  # Probando si se recuperó
-
-
-class CircuitBreaker:
-    """Circuit breaker para proteger llamadas MCP. Thread-safe para concurrencia async."""
-
-    def __init__(self, failure_threshold: int = 5, reset_timeout: int = 60):
-        self.failure_threshold = failure_threshold
-        self.reset_timeout = reset_timeout
-        self.failure_count = 0
-        self.last_failure_time: Optional[float] = None
-        self.state = CircuitState.CLOSED
-        self._lock = asyncio.Lock()
-
-    async def record_success(self) -> None:
-        """Registra un éxito y resetea el contador. Protegido con lock para evitar race conditions."""
-        async with self._lock:
-            self.failure_count = 0
-            self.state = CircuitState.CLOSED
-            self.last_failure_time = None
-
-    async def record_failure(self) -> None:
-        """Registra un fallo y actualiza el estado. Protegido con lock para evitar race conditions."""
-        async with self._lock:
-            self.failure_count += 1
-            self.last_failure_time = time.time()
-
-            if self.failure_count >= self.failure_threshold:
-                self.state = CircuitState.OPEN
-                logger.warning("Circuit abierto después de %s fallos", self.failure_count)
-
-    async def can_attempt(self) -> bool:
-        """
-        Verifica si se puede intentar una llamada.
-
-        CLOSED: siempre permite.
-        OPEN: permite solo si expiró el reset_timeout, transitando a HALF_OPEN bajo lock
-              para garantizar que una sola coroutine realice esa transición.
-        HALF_OPEN: permite exactamente un intento a la vez; las demás coroutines ven
-                   el estado como OPEN (bloqueado) hasta que el intento confirme éxito
-                   (record_success → CLOSED) o falle (record_failure → OPEN).
-        """
-        if self.state == CircuitState.CLOSED:
-            return True
-
-        if self.state == CircuitState.OPEN:
-            if self.last_failure_time and (time.time() - self.last_failure_time) >= self.reset_timeout:
-                async with self._lock:
-                    # Double-check: otra coroutine pudo haber transitado ya
-                    if self.state == CircuitState.OPEN:
-                        self.state = CircuitState.HALF_OPEN
-                        logger.info("Circuit en estado HALF_OPEN, probando recuperación")
-                return True
-            return False
-
-        # HALF_OPEN: solo 1 intento a la vez; bloqueamos el estado para las demás
-        async with self._lock:
-            if self.state != CircuitState.HALF_OPEN:
-                return self.state == CircuitState.CLOSED
-            self.state = CircuitState.OPEN  # las demás coroutines verán OPEN hasta confirmar éxito
-        return True
+# Agentes soportados. Convención: el servidor MCP de cada agente se registra con el mismo nombre
+# y expone su tool de chat como {agent}_chat (venta_chat, cita_chat, reserva_chat).
+_AGENTS = ("venta", "cita", "reserva")
+
+
+class MCPAgentUnavailable(RuntimeError):
+    """
+    El agente no está disponible: desconocido, deshabilitado o sin tools (servidor caído o en
+    backoff del cache negativo). Es una condición ya conocida: va directo al fallback, sin
+    reintentos ni circuit breaker.
+    """
+
 
-    def get_state(self) -> str:
-        """Retorna el estado actual como string."""
-        return self.state.value
+class _ServerTools:
+    """
+    Estado del cache de tools de un servidor.
+    tools: {nombre de tool en minúsculas -> tool} de la última carga exitosa (se conserva si
+    una recarga posterior falla). retry_at: cache negativo, no se reintenta antes de ese instante.
+    """
+
+    __slots__ = ("tools", "loaded_at", "failures", "retry_at")
+
+    def __init__(self) -> None:
+        self.tools: Optional[Dict[str, Any]] = None
+        self.loaded_at = 0.0
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+# Índice de tools por servidor: un servidor caído no bloquea ni vacía el de los demás.
+_tools_index: Dict[str, _ServerTools] = {agent: _ServerTools() for agent in _AGENTS}
+# Una sola carga en vuelo por servidor (request, refresher y admin comparten el resultado)
+_tools_singleflight = SingleFlight("mcp_tools")
+_tools_refresher_task: Optional[asyncio.Task] = None
+_tools_background_loads: Set[asyncio.Task] = set()
+
+# Bulkhead por agente: un especialista lento o saturado no acapara llamadas ni tasks del proceso
+_bulkheads: Dict[str, Bulkhead] = {
+    agent: Bulkhead(
+        f"mcp_{agent}",
+        max_concurrent=max_concurrent,
+        max_queue=app_config.MCP_MAX_QUEUE,
+        queue_timeout=app_config.MCP_QUEUE_TIMEOUT,
+    )
+    for agent, max_concurrent in (
+        ("venta", app_config.MCP_VENTA_MAX_CONCURRENT),
+        ("cita", app_config.MCP_CITA_MAX_CONCURRENT),
+        ("reserva", app_config.MCP_RESERVA_MAX_CONCURRENT),
+    )
+}
+
+# Hedging solo para los agentes de MCP_HEDGE_AGENTS (tools idempotentes); latencia y
+# presupuesto de hedges por agente
+_hedgers: Dict[str, Hedger] = {
+    agent: Hedger(
+        f"mcp_{agent}",
+        percentile=app_config.MCP_HEDGE_PERCENTILE,
+        min_delay=app_config.MCP_HEDGE_MIN_DELAY,
+        default_delay=app_config.MCP_HEDGE_DEFAULT_DELAY,
+        budget_ratio=app_config.MCP_HEDGE_BUDGET_RATIO,
+    )
+    for agent in _AGENTS
+    if agent in app_config.MCP_HEDGE_AGENTS
+}
 
 
-# Circuit breakers por agente (protegidos con lock para concurrencia async)
+# Circuit breakers por agente (ventana deslizante, ver infrastructure/circuit_breaker.py)
 _circuit_breakers: Dict[str, CircuitBreaker] = {}
-_circuit_breakers_lock = asyncio.Lock()
 
 
-async def _get_circuit_breaker(agent_name: str) -> CircuitBreaker:
-    """Obtiene o crea el circuit breaker para un agente. Thread-safe para concurrencia async."""
-    async with _circuit_breakers_lock:
-        if agent_name not in _circuit_breakers:
-            _circuit_breakers[agent_name] = CircuitBreaker(
-                failure_threshold=app_config.MCP_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
-                reset_timeout=app_config.MCP_CIRCUIT_BREAKER_RESET_TIMEOUT
-            )
-        return _circuit_breakers[agent_name]
+def _get_circuit_breaker(agent_name: str) -> CircuitBreaker:
+    """Obtiene o crea el circuit breaker de un agente. Sin awaits: no necesita lock."""
+    breaker = _circuit_breakers.get(agent_name)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            f"mcp_{agent_name}",
+            window_size=app_config.MCP_CIRCUIT_BREAKER_WINDOW_SIZE,
+            window_seconds=app_config.MCP_CIRCUIT_BREAKER_WINDOW_SECONDS,
+            min_calls=app_config.MCP_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+            failure_rate_threshold=app_config.MCP_CIRCUIT_BREAKER_FAILURE_RATE,
+            slow_call_seconds=app_config.MCP_CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=app_config.MCP_CIRCUIT_BREAKER_SLOW_CALL_RATE,
+            reset_timeout=app_config.MCP_CIRCUIT_BREAKER_RESET_TIMEOUT,
+            half_open_max_calls=app_config.MCP_CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+        )
+        _circuit_breakers[agent_name] = breaker
+    return breaker
 
 
 async def get_circuit_breaker_states() -> Dict[str, Dict[str, Any]]:
-    """Devuelve el estado de todos los circuit breakers (para /metrics). Lectura bajo lock."""
-    async with _circuit_breakers_lock:
-        return {
-            name: {"state": cb.get_state(), "failure_count": cb.failure_count}
-            for name, cb in _circuit_breakers.items()
-        }
+    """Devuelve el estado de todos los circuit breakers (state, failure_count y tasas de la ventana)."""
+    return {name: cb.snapshot() for name, cb in _circuit_breakers.items()}
+
+
+def _enabled_servers() -> Dict[str, str]:
+    """Agentes habilitados y con URL configurada -> URL del servidor MCP."""
+    servers = {
+        "reserva": (app_config.MCP_RESERVA_ENABLED, app_config.MCP_RESERVA_URL),
+        "cita": (app_config.MCP_CITA_ENABLED, app_config.MCP_CITA_URL),
+        "venta": (app_config.MCP_VENTA_ENABLED, app_config.MCP_VENTA_URL),
+    }
+    return {agent: url for agent, (enabled, url) in servers.items() if enabled and url}
 
 
 async def _get_mcp_client() -> Optional[MultiServerMCPClient]:
@@ -149,25 +167,10 @@ async def _get_mcp_client() -> Optional[MultiServerMCPClient]:
         if _mcp_client is not None:
             return _mcp_client
 
-        servers: Dict[str, Dict[str, str]] = {}
-
-        if app_config.MCP_RESERVA_ENABLED and app_config.MCP_RESERVA_URL:
-            servers["reserva"] = {
-                "transport": "http",
-                "url": app_config.MCP_RESERVA_URL
-            }
-
-        if app_config.MCP_CITA_ENABLED and app_config.MCP_CITA_URL:
-            servers["cita"] = {
-                "transport": "http",
-                "url": app_config.MCP_CITA_URL
-            }
-
-        if app_config.MCP_VENTA_ENABLED and app_config.MCP_VENTA_URL:
-            servers["venta"] = {
-                "transport": "http",
-                "url": app_config.MCP_VENTA_URL
-            }
+        servers: Dict[str, Dict[str, str]] = {
+            agent: {"transport": "http", "url": url}
+            for agent, url in _enabled_servers().items()
+        }
 
         if not servers:
             logger.warning("No hay servidores MCP configurados")
@@ -183,47 +186,186 @@ async def _get_mcp_client() -> Optional[MultiServerMCPClient]:
     return _mcp_client
 
 
-async def _get_cached_tools() -> Optional[List]:
+async def _load_server_tools(agent_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Carga las tools de un solo servidor y las indexa por nombre normalizado.
+    Devuelve None si el servidor no respondió o no expone tools (no se cachea: se reintenta
+    en el próximo uso).
     """
-    Retorna la lista de tools MCP, cargándola una sola vez y cacheándola para
-    todas las invocaciones siguientes. Las tools no cambian en tiempo de ejecución.
+    client = await _get_mcp_client()
+    if client is None:
+        return None
+
+    try:
+        tools = await asyncio.wait_for(
+            client.get_tools(server_name=agent_name),
+            timeout=app_config.MCP_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.error("Timeout cargando tools MCP de %s (>%ss)", agent_name, app_config.MCP_TIMEOUT)
+        return None
+    except Exception as e:
+        logger.exception("Error cargando tools MCP de %s: %s", agent_name, e)
+        return None
+
+    if not tools:
+        logger.warning("El servidor MCP %s no expone tools", agent_name)
+        return None
 
-    Usa double-checked locking para evitar múltiples llamadas concurrentes al
-    primer uso y garantizar que el cache se inicialice exactamente una vez.
+    index = {tool.name.lower(): tool for tool in tools}
+    logger.info("Tools MCP cacheadas para %s (%d tools): %s", agent_name, len(index), list(index))
+    return index
+
+
+async def _refresh_server_tools(agent_name: str) -> bool:
+    """
+    Recarga las tools de un servidor y actualiza su estado. Si falla, conserva las tools
+    anteriores y programa el próximo intento con backoff exponencial (cache negativo).
     """
-    global _tools_cache
+    state = _tools_index[agent_name]
+    tools = await _load_server_tools(agent_name)
+    now = time.monotonic()
+    if tools is not None:
+        state.tools = tools
+        state.loaded_at = now
+        state.failures = 0
+        state.retry_at = 0.0
+        app_metrics.mcp_tools_refresh_total.labels(agent=agent_name, result="success").inc()
+        return True
 
-    # Fast path: ya cacheadas (caso habitual tras la primera carga)
-    if _tools_cache is not None:
-        return _tools_cache
+    state.failures += 1
+    backoff = min(
+        app_config.MCP_TOOLS_RETRY_BASE * 2 ** (state.failures - 1),
+        app_config.MCP_TOOLS_RETRY_MAX,
+    )
+    state.retry_at = now + backoff
+    app_metrics.mcp_tools_refresh_total.labels(agent=agent_name, result="failure").inc()
+    logger.warning(
+        "Carga de tools MCP de %s falló (%d seguidas); próximo intento en %.0fs",
+        agent_name, state.failures, backoff
+    )
+    return False
 
-    async with _tools_cache_lock:
-        # Double-check: otra coroutine pudo haberlas cargado mientras esperábamos
-        if _tools_cache is not None:
-            return _tools_cache
 
-        client = await _get_mcp_client()
-        if client is None:
-            return None
+def _refresh_in_flight(agent_name: str):
+    """Recarga del servidor vía single-flight (si ya hay una en curso, se espera esa)."""
+    return _tools_singleflight.do(agent_name, lambda: _refresh_server_tools(agent_name))
 
-        try:
-            tools = await asyncio.wait_for(
-                client.get_tools(),
-                timeout=app_config.MCP_TIMEOUT
-            )
-            if tools:
-                _tools_cache = tools
-                logger.info(
-                    "Tools MCP cacheadas (%d tools): %s",
-                    len(tools), [t.name for t in tools]
-                )
-            return tools
-        except asyncio.TimeoutError:
-            logger.error("Timeout cargando tools MCP (>%ss)", app_config.MCP_TIMEOUT)
+
+def _schedule_tools_load(agent_name: str) -> None:
+    """Lanza la carga en background (sin bloquear el request) si no hay una en curso."""
+    if _tools_singleflight.in_flight(agent_name):
+        return
+    task = asyncio.ensure_future(_refresh_in_flight(agent_name))
+    _tools_background_loads.add(task)
+    task.add_done_callback(_tools_background_loads.discard)
+
+
+async def _get_agent_tools(agent_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Tools del servidor del agente, indexadas por nombre en minúsculas (lookup O(1)).
+
+    - Ya cargadas: se devuelven aunque estén por vencer (el refresher las renueva).
+    - Nunca intentadas (warm-up deshabilitado o aún en curso): carga síncrona vía single-flight,
+      como antes del refresher; solo la paga el primer request.
+    - Servidor en backoff (cache negativo): None de inmediato, sin tocar la red.
+    - Backoff vencido con el refresher activo: se agenda la carga en background y se devuelve
+      None (el caller usa su fallback); el request no espera el descubrimiento.
+    """
+    state = _tools_index[agent_name]
+    if state.tools is not None:
+        return state.tools
+    never_loaded = state.loaded_at == 0.0 and state.failures == 0
+    if not never_loaded:
+        if time.monotonic() < state.retry_at:
             return None
-        except Exception as e:
-            logger.exception("Error cargando tools MCP: %s", e)
+        if _tools_refresher_task is not None and not _tools_refresher_task.done():
+            _schedule_tools_load(agent_name)
             return None
+    await _refresh_in_flight(agent_name)
+    return state.tools
+
+
+async def _tools_refresher_loop() -> None:
+    """
+    Cada MCP_TOOLS_REFRESH_INTERVAL revisa los servidores habilitados: recarga los que superaron
+    MCP_TOOLS_TTL y reintenta los fallidos cuyo backoff ya venció.
+    """
+    while True:
+        await asyncio.sleep(app_config.MCP_TOOLS_REFRESH_INTERVAL)
+        now = time.monotonic()
+        due = []
+        for agent_name in _enabled_servers():
+            state = _tools_index[agent_name]
+            if state.tools is None:
+                if now >= state.retry_at:
+                    due.append(agent_name)
+            elif now - state.loaded_at >= app_config.MCP_TOOLS_TTL:
+                due.append(agent_name)
+        if due:
+            await asyncio.gather(*(_refresh_in_flight(agent) for agent in due), return_exceptions=True)
+
+
+def start_tools_refresher() -> None:
+    """Arranca el refresher de tools en background (una sola instancia por proceso)."""
+    global _tools_refresher_task
+    if not MCP_AVAILABLE or not _enabled_servers():
+        return
+    if _tools_refresher_task is None or _tools_refresher_task.done():
+        _tools_refresher_task = asyncio.create_task(_tools_refresher_loop())
+
+
+async def stop_tools_refresher() -> None:
+    """Detiene el refresher (shutdown de la app)."""
+    global _tools_refresher_task
+    task, _tools_refresher_task = _tools_refresher_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def reload_mcp_tools(agent_name: Optional[str] = None) -> Dict[str, bool]:
+    """
+    Fuerza la recarga de tools (ignora TTL y backoff). Para el endpoint de administración.
+
+    Args:
+        agent_name: Servidor a recargar, o None para todos los habilitados.
+
+    Returns:
+        {agente: True si cargó tools}
+    """
+    agents = [agent_name] if agent_name else list(_enabled_servers())
+    results = await asyncio.gather(*(_refresh_in_flight(agent) for agent in agents))
+    return dict(zip(agents, results))
+
+
+def get_tools_status() -> Dict[str, Dict[str, Any]]:
+    """Estado del cache de tools por servidor habilitado (debug / admin)."""
+    now = time.monotonic()
+    return {
+        agent_name: {
+            "tools": sorted(state.tools) if state.tools is not None else [],
+            "age_seconds": round(now - state.loaded_at, 1) if state.tools is not None else None,
+            "failures": state.failures,
+            "retry_in_seconds": round(max(state.retry_at - now, 0.0), 1),
+        }
+        for agent_name, state in ((a, _tools_index[a]) for a in _enabled_servers())
+    }
+
+
+async def warmup_mcp() -> bool:
+    """
+    Inicializa el cliente MCP y precarga en paralelo las tools de cada servidor habilitado
+    antes del primer request. Devuelve True si algún servidor quedó con tools disponibles.
+    Los que fallen quedan en backoff y los reintenta el refresher.
+    """
+    if not _enabled_servers():
+        return False
+    results = await reload_mcp_tools()
+    return any(results.values())
 
 
 def _extract_plain_text_from_agent_result(result: Any) -> str:
@@ -273,116 +415,199 @@ def _extract_plain_text_from_agent_result(result: Any) -> str:
     return str(result).strip()
 
 
-async def _invoke_mcp_agent_internal(agent_name: str, message: str, session_id: int, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+async def _call_tool_pooled(agent_name: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
     """
-    Invocación interna del agente MCP sin circuit breaker ni retry.
+    Llama la tool en una sesión persistente del pool del servidor del agente.
+    Devuelve el contenido del resultado (lista de bloques) o lanza RuntimeError si la tool
+    reportó error.
     """
-    if agent_name not in ["venta", "cita", "reserva"]:
-        logger.warning("Agente desconocido: %s", agent_name)
+    client = await _get_mcp_client()
+    if client is None:
         return None
+    pool = get_session_pool(client, agent_name)
+    async with pool.session() as session:
+        result = await session.call_tool(tool_name, arguments)
+    if result.isError:
+        raise RuntimeError(_extract_plain_text_from_agent_result(result.content) or "Error de la tool MCP")
+    return result.content
+
+
+async def _invoke_mcp_agent_internal(
+    agent_name: str,
+    message: str,
+    session_id: int,
+    context: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    """
+    Invocación interna del agente MCP sin circuit breaker ni retry.
+    timeout: límite de la llamada a la tool (default MCP_TIMEOUT).
+    Devuelve None solo si el agente respondió vacío; lanza MCPAgentUnavailable si no se lo
+    puede llamar.
+    """
+    if agent_name not in _AGENTS:
+        raise MCPAgentUnavailable(f"Agente desconocido: {agent_name}")
 
     # Verificar que el agente esté habilitado antes de cargar tools
-    if agent_name == "reserva" and not (app_config.MCP_RESERVA_ENABLED and app_config.MCP_RESERVA_URL):
-        logger.info("Agente reserva no configurado o deshabilitado.")
-        return None
-    if agent_name == "cita" and not (app_config.MCP_CITA_ENABLED and app_config.MCP_CITA_URL):
-        logger.info("Agente cita no configurado o deshabilitado.")
-        return None
-    if agent_name == "venta" and not (app_config.MCP_VENTA_ENABLED and app_config.MCP_VENTA_URL):
-        logger.info("Agente venta no configurado o deshabilitado.")
-        return None
+    if agent_name not in _enabled_servers():
+        raise MCPAgentUnavailable(f"Agente {agent_name} no configurado o deshabilitado")
 
-    # Tools cacheadas: se cargan una sola vez y se reutilizan en cada invocación
-    tools = await _get_cached_tools()
+    # Tools del servidor del agente: se cargan una sola vez y se reutilizan en cada invocación
+    tools = await _get_agent_tools(agent_name)
 
     if not tools:
-        logger.warning("No se encontraron tools para el agente %s", agent_name)
-        return None
-
-    logger.debug("Tools disponibles (desde cache): %s", [tool.name for tool in tools])
+        # Servidor caído o en backoff: el refresher ya lo está reintentando
+        raise MCPAgentUnavailable(f"No hay tools disponibles para el agente {agent_name}")
 
     # Convención: cada agente expone su tool como {agent}_chat (venta_chat, cita_chat, reserva_chat)
     target_tool_name = f"{agent_name}_chat"
-    chat_tool = None
-    for tool in tools:
-        if tool.name.lower() == target_tool_name:
-            chat_tool = tool
-            break
+    chat_tool = tools.get(target_tool_name)
 
     if chat_tool:
         logger.debug("Usando tool: %s", chat_tool.name)
-        result = await asyncio.wait_for(
-            chat_tool.ainvoke({
-                "message": message,
-                "session_id": session_id,
-                "context": context or {}
-            }),
-            timeout=app_config.MCP_TIMEOUT
-        )
+        arguments = {
+            "message": message,
+            "session_id": session_id,
+            "context": context or {}
+        }
+        bulkhead = _bulkheads[agent_name]
+
+        async def make_call():
+            # Cada llamada (también la de hedge) ocupa un lugar del bulkhead del agente
+            async with bulkhead.acquire():
+                if app_config.MCP_SESSION_POOL_ENABLED:
+                    # Sesión persistente: solo se paga el call_tool (incluye la espera por una sesión libre)
+                    return await _call_tool_pooled(agent_name, chat_tool.name, arguments)
+                # La tool del adaptador abre y cierra una sesión en cada llamada
+                return await chat_tool.ainvoke(arguments)
+        call_timeout = timeout if timeout is not None else app_config.MCP_TIMEOUT
+        hedger = _hedgers.get(agent_name)
+        if hedger is not None:
+            # Segunda llamada idéntica si la primera tarda más que el percentil; gana la primera
+            result = await hedger.run(make_call, timeout=call_timeout)
+        else:
+            result = await asyncio.wait_for(make_call(), timeout=call_timeout)
         text = _extract_plain_text_from_agent_result(result)
         return text if text else None
     
-    tools_info = ", ".join([tool.name for tool in tools[:5]])
+    tools_info = ", ".join(list(tools)[:5])
     logger.warning("No se encontró tool '%s'. Tools disponibles: %s", target_tool_name, tools_info)
     return f"[MCP {agent_name}] Agente disponible pero sin tool '{target_tool_name}'. Tools: {tools_info}"
 
 
-async def invoke_mcp_agent(agent_name: str, message: str, session_id: int, context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+def _remaining_budget(deadline: Optional[float]) -> float:
+    """Segundos disponibles para MCP antes del deadline del chat (descontando el margen de cierre)."""
+    if deadline is None:
+        return float("inf")
+    return deadline - time.monotonic() - app_config.CHAT_DEADLINE_MARGIN
+
+
+async def invoke_mcp_agent(
+    agent_name: str,
+    message: str,
+    session_id: int,
+    context: Optional[Dict[str, Any]] = None,
+    deadline: Optional[float] = None,
+) -> Optional[str]:
     """
     Invoca un agente MCP especializado con circuit breaker y retry con backoff exponencial.
-    
+    Si se pasa deadline, cada intento y cada backoff se acotan al presupuesto restante del
+    chat: cuando no entra otro intento útil (MCP_MIN_ATTEMPT_SECONDS) se devuelve None de
+    inmediato para que el caller use su fallback en vez de agotar CHAT_TIMEOUT.
+
     Args:
         agent_name: Nombre del agente ("venta", "cita", "reserva")
         message: Mensaje del cliente
         session_id: ID de sesión para contexto (int, unificado con n8n)
         context: Contexto adicional (config del bot, etc.)
-    
+        deadline: Instante límite (time.monotonic()) del request completo, o None sin límite
+
     Returns:
         Respuesta del agente MCP o None si hay error
     """
-    circuit_breaker = await _get_circuit_breaker(agent_name)
-    
+    circuit_breaker = _get_circuit_breaker(agent_name)
+
     # Verificar circuit breaker
-    if not await circuit_breaker.can_attempt():
+    if not circuit_breaker.can_attempt():
         logger.warning("Circuit abierto para %s, rechazando request", agent_name)
         return None
-    
-    # Retry con backoff exponencial
+
+    # Retry con backoff exponencial, acotado por el presupuesto del chat
     max_retries = app_config.MCP_MAX_RETRIES
+    min_attempt = app_config.MCP_MIN_ATTEMPT_SECONDS
     last_error = None
-    
+
     for attempt in range(max_retries):
+        remaining = _remaining_budget(deadline)
+        if remaining < min_attempt:
+            last_error = last_error or "Sin presupuesto para intentar"
+            app_metrics.mcp_budget_exhausted_total.labels(agent=agent_name).inc()
+            logger.warning(
+                "Presupuesto agotado para %s (%.1fs restantes), sin más intentos",
+                agent_name, max(remaining, 0.0)
+            )
+            break
+        attempt_timeout = min(app_config.MCP_TIMEOUT, remaining)
+        attempt_start = time.monotonic()
+
         try:
-            result = await _invoke_mcp_agent_internal(agent_name, message, session_id, context)
-            
-            if result is not None:
-                await circuit_breaker.record_success()
+            result = await _invoke_mcp_agent_internal(
+                agent_name, message, session_id, context, timeout=attempt_timeout
+            )
+
+            if result is None:
+                # Una respuesta vacía no sirve: cuenta como fallo (en HALF_OPEN reabre el circuit
+                # en vez de cerrarlo con un servidor que no responde nada útil) y se reintenta
+                last_error = "Respuesta vacía del agente"
+                circuit_breaker.record_failure(time.monotonic() - attempt_start)
+                logger.warning("Respuesta vacía en intento %s/%s", attempt + 1, max_retries)
+            else:
+                circuit_breaker.record_success(time.monotonic() - attempt_start)
                 if attempt > 0:
                     logger.info("Éxito después de %s intentos", attempt + 1)
                 return result
-            else:
-                # Resultado None se considera fallo
-                last_error = "Respuesta None del agente"
-                await circuit_breaker.record_failure()
+
+        except BulkheadFull as e:
+            # Rechazo local por saturación: no es un fallo del servidor y reintentar solo suma carga
+            last_error = str(e)
+            logger.warning("%s, usando fallback para %s", e, agent_name)
+            break
+
+        except MCPAgentUnavailable as e:
+            # Tools no disponibles (cache negativo): reintentar no cambia nada hasta el próximo
+            # refresh y el circuit breaker no debe abrirse por una condición ya conocida
+            last_error = str(e)
+            logger.warning("%s, usando fallback", e)
+            break
 
         except asyncio.TimeoutError:
-            last_error = f"Timeout (>{app_config.MCP_TIMEOUT}s)"
-            await circuit_breaker.record_failure()
+            last_error = f"Timeout (>{attempt_timeout:.1f}s)"
+            circuit_breaker.record_failure(time.monotonic() - attempt_start)
             logger.warning("Timeout en intento %s/%s", attempt + 1, max_retries)
 
         except Exception as e:
             last_error = str(e)
-            await circuit_breaker.record_failure()
+            circuit_breaker.record_failure(time.monotonic() - attempt_start)
             logger.warning("Error en intento %s/%s: %s", attempt + 1, max_retries, e)
-        
+
+        if circuit_breaker.state == CircuitState.OPEN:
+            # El fallo abrió el circuit (o reabrió tras la prueba en HALF_OPEN): no insistir
+            break
+
         if attempt < max_retries - 1:
             backoff_time = 2 ** attempt
+            if _remaining_budget(deadline) - backoff_time < min_attempt:
+                app_metrics.mcp_budget_exhausted_total.labels(agent=agent_name).inc()
+                logger.warning(
+                    "Backoff de %ss no entra en el presupuesto restante para %s; usando fallback",
+                    backoff_time, agent_name
+                )
+                break
             logger.info("Esperando %ss antes de reintentar...", backoff_time)
             await asyncio.sleep(backoff_time)
-    
+
     logger.error(
         "Todos los intentos fallaron para %s. Último error: %s. Circuit: %s, Fallos: %s",
         agent_name, last_error, circuit_breaker.get_state(), circuit_breaker.failure_count
     )
     return None
-
@@ -0,0 +1,254 @@
+"""
+Pool de sesiones MCP persistentes por servidor (venta, cita, reserva).
+
+Con langchain-mcp-adapters, una tool obtenida con client.get_tools() abre una sesión nueva en
+cada llamada: conexión HTTP + handshake initialize + cierre. El pool mantiene sesiones ya
+inicializadas y las reutiliza, así cada turno delegado paga solo el call_tool.
+Las llamadas concurrentes comparten sesiones (MCP multiplexa requests): el pool no acota la
+concurrencia, eso lo hace el bulkhead de cada agente.
+
+- Cada sesión vive en su propia Task dueña: los context managers de transporte (anyio) deben
+  abrirse y cerrarse en la misma task, no en la del request que la usa.
+- Máximo de sesiones por servidor (MCP_SESSION_POOL_SIZE); se abren a demanda, cuando todas
+  las abiertas tienen llamadas en curso.
+- Health check: una sesión ociosa más de MCP_SESSION_PING_INTERVAL se verifica con ping antes
+  de reutilizarla; si falla (servidor reiniciado, conexión cortada) se descarta y se abre otra.
+- Una sesión que falla o se cancela a mitad de una llamada se retira del pool y se cierra
+  cuando terminan las demás llamadas que la comparten.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure.logging_config import get_logger
+    from ..infrastructure import metrics as app_metrics
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure.logging_config import get_logger
+    from orquestador.infrastructure import metrics as app_metrics
+
+logger = get_logger("mcp_session_pool")
+
+
+class PooledSession:
+    """Sesión MCP inicializada, mantenida abierta por una task dueña hasta close()."""
+
+    __slots__ = (
+        "server_name", "session", "last_used", "in_use", "retired", "retire_reason",
+        "_task", "_ready", "_closing", "_error",
+    )
+
+    def __init__(self, server_name: str):
+        self.server_name = server_name
+        self.session: Optional[Any] = None
+        self.last_used = time.monotonic()
+        # Llamadas en curso sobre la sesión; retired: fuera del pool, se cierra al quedar en 0
+        self.in_use = 0
+        self.retired = False
+        self.retire_reason = "error"
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def open(self, client: Any, timeout: float) -> None:
+        """Abre la sesión (conexión + initialize) en una task dueña y espera a que esté lista."""
+        self._task = asyncio.create_task(self._run(client))
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except BaseException:
+            self._task.cancel()
+            raise
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self, client: Any) -> None:
+        try:
+            async with client.session(self.server_name) as session:
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Error al abrir (se reporta en open) o la conexión se cayó con la sesión en el pool
+            self._error = e
+            if self._ready.is_set():
+                logger.debug("Sesión MCP %s terminada: %s", self.server_name, e)
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def ping(self, timeout: float) -> bool:
+        """Health check: True si el servidor responde el ping a tiempo."""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False
+
+    def close(self) -> Optional[asyncio.Task]:
+        """Pide el cierre de la sesión; devuelve la task dueña para quien quiera esperarla."""
+        self._closing.set()
+        return self._task
+
+
+class MCPSessionPool:
+    """
+    Pool de sesiones de un servidor MCP. Sin lock propio: la lista de sesiones y los contadores
+    se modifican sin awaits intermedios.
+
+    Las sesiones se comparten: MCP multiplexa requests (JSON-RPC con id) sobre una misma sesión,
+    así que el pool no limita la concurrencia (eso lo hace el bulkhead del agente). `size` es el
+    máximo de sesiones abiertas; cada llamada usa la sesión con menos llamadas en curso y se
+    abre otra solo si todas están ocupadas y no se llegó a `size`.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        server_name: str,
+        size: int = 4,
+        ping_interval: float = 30.0,
+        connect_timeout: float = 10.0,
+    ):
+        self.client = client
+        self.server_name = server_name
+        self.size = size
+        self.ping_interval = ping_interval
+        self.connect_timeout = connect_timeout
+        self._sessions: List[PooledSession] = []
+        # Aperturas en curso: cuentan para `size` y los demás callers pueden esperarlas
+        self._opening: Set[asyncio.Task] = set()
+        # Referencias a tasks dueñas en cierre (evita que el GC las recoja a mitad de camino)
+        self._closing_tasks: Set[asyncio.Task] = set()
+
+    def _close(self, pooled: PooledSession, reason: str) -> None:
+        app_metrics.mcp_session_pool_total.labels(agent=self.server_name, event=reason).inc()
+        task = pooled.close()
+        if task is not None and not task.done():
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+
+    def _discard(self, pooled: PooledSession, reason: str) -> None:
+        """Saca la sesión del pool; se cierra cuando terminan las llamadas que la usan."""
+        if pooled in self._sessions:
+            self._sessions.remove(pooled)
+        pooled.retired = True
+        if pooled.in_use == 0:
+            self._close(pooled, reason)
+        else:
+            pooled.retire_reason = reason
+
+    async def _open_session(self) -> PooledSession:
+        pooled = PooledSession(self.server_name)
+        await pooled.open(self.client, timeout=self.connect_timeout)
+        self._sessions.append(pooled)
+        app_metrics.mcp_session_pool_total.labels(agent=self.server_name, event="open").inc()
+        logger.info("Sesión MCP abierta para %s (%d abiertas)", self.server_name, len(self._sessions))
+        return pooled
+
+    async def _checkout(self) -> PooledSession:
+        """La sesión sana menos ocupada (verificada con ping si lleva tiempo ociosa) o una nueva."""
+        while True:
+            for pooled in [p for p in self._sessions if not p.alive]:
+                self._discard(pooled, "dead")
+            pooled = min(self._sessions, key=lambda p: p.in_use, default=None)
+            has_room = len(self._sessions) + len(self._opening) < self.size
+            if pooled is not None and (pooled.in_use == 0 or not has_room):
+                if pooled.in_use == 0 and time.monotonic() - pooled.last_used >= self.ping_interval:
+                    if not await pooled.ping(timeout=self.connect_timeout):
+                        self._discard(pooled, "ping_failed")
+                        continue
+                app_metrics.mcp_session_pool_total.labels(agent=self.server_name, event="reuse").inc()
+                return pooled
+            if has_room:
+                task = asyncio.ensure_future(self._open_session())
+                self._opening.add(task)
+                task.add_done_callback(self._opening.discard)
+                # shield: si este caller se cancela, la sesión igual queda en el pool
+                return await asyncio.shield(task)
+            # Todas las sesiones posibles se están abriendo: esperar a la primera
+            await asyncio.wait(set(self._opening), return_when=asyncio.FIRST_COMPLETED)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Any]:
+        """
+        Presta una ClientSession inicializada (compartida con otras llamadas en curso).
+        Ante error o cancelación la sesión se retira del pool (puede estar caída) y se cierra
+        cuando terminan las demás llamadas que la usan.
+        """
+        pooled = await self._checkout()
+        pooled.in_use += 1
+        ok = False
+        try:
+            yield pooled.session
+            ok = True
+        finally:
+            pooled.in_use -= 1
+            pooled.last_used = time.monotonic()
+            if not pooled.retired and not (ok and pooled.alive):
+                self._discard(pooled, "error")
+            elif pooled.retired and pooled.in_use == 0:
+                self._close(pooled, pooled.retire_reason)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "open": len(self._sessions),
+            "in_use": sum(p.in_use for p in self._sessions),
+            "size": self.size,
+        }
+
+    async def aclose(self) -> None:
+        """Cierra todas las sesiones y espera a sus tasks dueñas (shutdown)."""
+        for pooled in list(self._sessions):
+            self._sessions.remove(pooled)
+            self._close(pooled, "closed")
+        if self._closing_tasks:
+            await asyncio.wait(set(self._closing_tasks), timeout=self.connect_timeout)
+
+
+_pools: Dict[str, MCPSessionPool] = {}
+
+
+def get_session_pool(client: Any, server_name: str) -> MCPSessionPool:
+    """Pool del servidor (creado en el primer uso). Sin awaits: no necesita lock."""
+    pool = _pools.get(server_name)
+    if pool is None or pool.client is not client:
+        pool = MCPSessionPool(
+            client,
+            server_name,
+            size=app_config.MCP_SESSION_POOL_SIZE,
+            ping_interval=app_config.MCP_SESSION_PING_INTERVAL,
+            connect_timeout=app_config.MCP_SESSION_CONNECT_TIMEOUT,
+        )
+        _pools[server_name] = pool
+    return pool
+
+
+async def close_session_pools() -> None:
+    """Cierra las sesiones de todos los pools (shutdown de la app)."""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.aclose()
+
+
+__all__ = [
+    "MCPSessionPool",
+    "PooledSession",
+    "get_session_pool",
+    "close_session_pools",
+]
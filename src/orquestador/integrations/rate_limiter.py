@@ -0,0 +1,143 @@
+"""
+Rate limiter del lado cliente para OpenAI (requests y tokens por minuto del tier).
+
+Sin él, un pico de tráfico supera el RPM/TPM de la cuenta, OpenAI responde 429 y cada
+request falla. Con él, las llamadas esperan su turno un momento en el proceso:
+
+- Dos token buckets (RPM y TPM) que se rellenan continuamente; ráfaga máxima de
+  _BURST_SECONDS de cupo. Cada llamada reserva su cupo al entrar (puede dejar el bucket en
+  negativo) y duerme lo necesario: las llamadas quedan en orden de llegada.
+- Si la espera supera max_wait (o el deadline del chat), se rechaza con OpenAIThrottledError.
+- Un 429 real con retry-after pausa hasta ese instante las llamadas del mismo destino
+  (pause_until con scope = modelo + base_url): un modelo de respaldo en otro deployment o con
+  otro límite sigue pudiendo absorber el tráfico.
+
+Los tokens de cada llamada se estiman como OpenAI estima el TPM al admitir un request:
+caracteres/4 del prompt + los tokens de completion reservados.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.messages import BaseMessage
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure import metrics as app_metrics
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure import metrics as app_metrics
+
+# Ráfaga máxima: segundos de cupo acumulable (un bucket de un minuto entero dejaría pasar
+# todo el RPM de golpe, y OpenAI también limita en ventanas más cortas)
+_BURST_SECONDS = 10.0
+
+
+class OpenAIThrottledError(RuntimeError):
+    """No hay cupo de OpenAI a tiempo (límite local o 429). retry_after en segundos."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _TokenBucket:
+    """Bucket de `per_minute` unidades por minuto. Sin lock: no hace awaits."""
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, per_minute * _BURST_SECONDS / 60.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Segundos hasta que haya cupo para `amount` (0 si ya hay)."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        deficit = min(amount, self.capacity) - self.level
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class OpenAIRateLimiter:
+    """Limitador RPM + TPM por proceso. rpm/tpm <= 0 desactiva ese límite."""
+
+    def __init__(self, rpm: int, tpm: int, completion_tokens: int = 512):
+        self._rpm = _TokenBucket(rpm) if rpm > 0 else None
+        self._tpm = _TokenBucket(tpm) if tpm > 0 else None
+        self.completion_tokens = completion_tokens
+        # scope -> time.monotonic() hasta el que ese destino está pausado por un retry-after
+        self._paused_until: Dict[str, float] = {}
+
+    def estimate_tokens(self, messages: List[BaseMessage]) -> int:
+        chars = sum(len(m.content) if isinstance(m.content, str) else len(str(m.content)) for m in messages)
+        return chars // 4 + self.completion_tokens
+
+    def pause_until(self, instant: float, scope: str = "") -> None:
+        """Pausa las llamadas de `scope` hasta `instant` (time.monotonic()), p. ej. por un retry-after."""
+        self._paused_until[scope] = max(self._paused_until.get(scope, 0.0), instant)
+
+    def paused_for(self, scope: str = "") -> float:
+        """Segundos que le quedan a la pausa de `scope` (0 si no está pausado)."""
+        return max(self._paused_until.get(scope, 0.0) - time.monotonic(), 0.0)
+
+    async def acquire(self, tokens: int, max_wait: float, scope: str = "") -> float:
+        """
+        Espera cupo para una llamada de `tokens` tokens hacia `scope`. Devuelve los segundos
+        esperados. Lanza OpenAIThrottledError (sin reservar cupo) si la espera superaría max_wait.
+        """
+        now = time.monotonic()
+        wait = max(
+            self._paused_until.get(scope, 0.0) - now,
+            self._rpm.wait_time(1, now) if self._rpm else 0.0,
+            self._tpm.wait_time(tokens, now) if self._tpm else 0.0,
+        )
+        if wait > max_wait:
+            app_metrics.openai_throttled_total.labels(reason="local_rejected").inc()
+            raise OpenAIThrottledError("Límite de OpenAI alcanzado, intenta de nuevo", retry_after=wait)
+        if self._rpm:
+            self._rpm.take(1)
+        if self._tpm:
+            self._tpm.take(tokens)
+        app_metrics.openai_rate_limit_wait_seconds.observe(max(wait, 0.0))
+        if wait > 0:
+            app_metrics.openai_throttled_total.labels(reason="local_queued").inc()
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Segundos de retry-after / retry-after-ms de la respuesta de un error de OpenAI, si vienen."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+# Singleton global
+openai_rate_limiter = OpenAIRateLimiter(
+    rpm=app_config.OPENAI_RPM_LIMIT,
+    tpm=app_config.OPENAI_TPM_LIMIT,
+    completion_tokens=app_config.OPENAI_RATE_LIMIT_COMPLETION_TOKENS,
+)
+
+
+__all__ = [
+    "openai_rate_limiter",
+    "OpenAIRateLimiter",
+    "OpenAIThrottledError",
+    "retry_after_seconds",
+]
@@ -1,11 +1,44 @@
 """
-Prompts del orquestador. Builder del system prompt.
+Prompts del orquestador.
+
+El prompt se arma en dos partes:
+- Prefijo estático por tenant (orquestador_system.j2): identidad, modalidad, reglas, formato,
+  ejemplos y contexto de negocio. Solo depende de los campos de ChatConfig que usa el template
+  + contexto_negocio, así que se renderiza una vez y se memoiza por hash. Al ser byte-estable
+  entre requests, OpenAI aplica su prompt caching automático sobre él (prefijos >= 1024 tokens).
+- Sufijo volátil (orquestador_history.j2): historial de la sesión, en un mensaje aparte que va
+  después del prefijo.
+
+PROMPT_HISTORY_MODE elige cómo va el historial:
+- "system" (default): los turnos se aplanan como texto dentro del bloque de historial.
+- "messages": cada turno va como par HumanMessage/AIMessage entre el prefijo y el mensaje
+  actual; el bloque de historial solo lleva el estado (agente activo).
+
+El historial y el contexto de negocio se incluyen dentro de un presupuesto de tokens
+(PROMPT_HISTORY_MAX_TOKENS, PROMPT_CONTEXTO_MAX_TOKENS): los turnos más recientes entran
+primero y los más antiguos que no caben se omiten.
 """
 
+import hashlib
+import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
+from cachetools import LRUCache
 from jinja2 import Environment, FileSystemLoader, select_autoescape
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure import metrics as app_metrics
+    from .tokens import count_tokens, truncate_to_tokens
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure import metrics as app_metrics
+    from orquestador.prompts.tokens import count_tokens, truncate_to_tokens
+
+if TYPE_CHECKING:
+    from ..services.memory import Turn
 
 _TEMPLATES_DIR = Path(__file__).resolve().parent
 
@@ -15,6 +48,13 @@ _jinja_env = Environment(
     autoescape=select_autoescape(disabled_extensions=()),
 )
 _orquestador_template = _jinja_env.get_template("orquestador_system.j2")
+_history_template = _jinja_env.get_template("orquestador_history.j2")
+
+HISTORY_MODE_SYSTEM = "system"
+HISTORY_MODE_MESSAGES = "messages"
+
+# Tokens de formato por turno (comillas, rol, etiquetas) sumados al texto al medir el presupuesto
+_TURN_OVERHEAD_TOKENS = 12
 
 _DEFAULTS: Dict[str, Any] = {
     "nombre_bot": "Asistente",
@@ -28,6 +68,23 @@ _DEFAULTS: Dict[str, Any] = {
 }
 
 
+class PromptPrefix:
+    """Prefijo estático ya renderizado de un tenant (inmutable; se comparte entre requests)."""
+
+    __slots__ = ("text", "key", "agent_key", "tokens", "contexto_tokens")
+
+    def __init__(self, text: str, key: str, agent_key: str, tokens: int, contexto_tokens: int):
+        self.text = text
+        self.key = key
+        self.agent_key = agent_key
+        self.tokens = tokens
+        self.contexto_tokens = contexto_tokens
+
+
+# hash(campos del prefijo + contexto) -> PromptPrefix. LRU: un tenant inactivo sale al llegar otros.
+_prefix_cache: LRUCache = LRUCache(maxsize=app_config.PROMPT_PREFIX_CACHE_SIZE)
+
+
 def _apply_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
     out = dict(_DEFAULTS)
     for k, v in config.items():
@@ -50,6 +107,188 @@ def _modalidad_to_agent(modalidad: str) -> str:
 
 
 modalidad_to_agent = _modalidad_to_agent
+apply_prompt_defaults = _apply_defaults
+
+
+# Campos de la config que renderiza orquestador_system.j2 (además de agent_key y el contexto).
+# Mantener sincronizado con el template: el resto (fecha, usuario_id, correo...) varía por
+# request y no debe cambiar la clave del prefijo.
+_PREFIX_FIELDS = ("nombre_bot", "modalidad", "frase_saludo", "frase_des", "frase_esc")
+
+
+def _prefix_key(variables: Dict[str, Any], agent_key: str, contexto_negocio: str) -> str:
+    """Hash estable de lo que renderiza el prefijo (campos con defaults, agent_key y contexto)."""
+    fields = {name: variables.get(name) for name in _PREFIX_FIELDS}
+    payload = json.dumps([fields, agent_key, contexto_negocio], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_orquestador_prefix(config: Dict[str, Any], contexto_negocio: Optional[str] = None) -> PromptPrefix:
+    """
+    Prefijo estático del tenant, renderizado solo la primera vez por combinación de los campos
+    de config que usa el template (_PREFIX_FIELDS) + contexto_negocio.
+
+    Args:
+        config: Diccionario con nombre_bot, modalidad, frases, etc.
+        contexto_negocio: Información breve del negocio; se recorta a PROMPT_CONTEXTO_MAX_TOKENS.
+
+    Returns:
+        PromptPrefix con el texto, su clave (hash) y conteos de tokens.
+    """
+    variables = _apply_defaults(config)
+    contexto = (contexto_negocio or "").strip()
+    agent_key = _modalidad_to_agent(variables.get("modalidad", ""))
+    key = _prefix_key(variables, agent_key, contexto)
+
+    prefix: Optional[PromptPrefix] = _prefix_cache.get(key)
+    if prefix is not None:
+        app_metrics.prompt_prefix_cache_total.labels(result="hit").inc()
+        return prefix
+
+    app_metrics.prompt_prefix_cache_total.labels(result="miss").inc()
+    contexto = truncate_to_tokens(contexto, app_config.PROMPT_CONTEXTO_MAX_TOKENS)
+    text = _orquestador_template.render(**variables, agent_key=agent_key, contexto_negocio=contexto or None)
+    prefix = PromptPrefix(text, key, agent_key, count_tokens(text), count_tokens(contexto))
+    # Sin await entre get y set: dos requests del mismo tenant no pueden intercalarse aquí
+    _prefix_cache[key] = prefix
+    return prefix
+
+
+def _fit_history(memory: List["Turn"]) -> Tuple[List[Tuple["Turn", str, str]], int]:
+    """
+    Turnos que entran en el presupuesto de tokens, con user y response recortados a
+    PROMPT_TURN_MAX_TOKENS cada uno.
+    Recorre del turno más reciente al más antiguo (el último siempre entra) y deja de agregar
+    cuando el siguiente ya no cabe.
+
+    Returns:
+        ([(turno, user, response)] del más antiguo al más reciente, cantidad de turnos omitidos)
+    """
+    max_turns = app_config.PROMPT_HISTORY_MAX_TURNS
+    # memory[-0:] sería todo el historial: 0 (o menos) significa sin historial
+    candidates = memory[-max_turns:] if max_turns > 0 else []
+    budget = app_config.PROMPT_HISTORY_MAX_TOKENS
+    max_tokens = app_config.PROMPT_TURN_MAX_TOKENS
+    kept: List[Tuple["Turn", str, str]] = []
+    used = 0
+    for turn in reversed(candidates):
+        user = truncate_to_tokens(turn.user, max_tokens)
+        response = truncate_to_tokens(turn.response, max_tokens)
+        cost = count_tokens(user) + count_tokens(response) + _TURN_OVERHEAD_TOKENS
+        if kept and used + cost > budget:
+            break
+        kept.append((turn, user, response))
+        used += cost
+
+    kept.reverse()
+    return kept, len(candidates) - len(kept)
+
+
+def _build_history_text(memory: List["Turn"]) -> str:
+    """Historial aplanado como texto (modo "system"); los turnos omitidos se resumen en una línea."""
+    kept, omitted = _fit_history(memory)
+    lines: List[str] = []
+    if omitted:
+        lines.append(f"- ({omitted} turnos anteriores omitidos por longitud)")
+    for turn, user, response in kept:
+        agent_info = f" (derivaste a: {turn.agent})" if turn.agent else " (respondiste directo)"
+        lines.append(f"- Usuario: \"{user}\"")
+        lines.append(f"  Respondiste: \"{response}\"{agent_info}")
+    return "\n".join(lines)
+
+
+def _build_history_messages(memory: List["Turn"]) -> List[BaseMessage]:
+    """
+    Historial como pares HumanMessage/AIMessage (modo "messages").
+    El AIMessage repite el formato de salida del orquestador (JSON de la decisión) para que el
+    modelo vea sus turnos previos igual que los genera; response es lo que vio el usuario.
+    """
+    kept, _ = _fit_history(memory)
+    messages: List[BaseMessage] = []
+    for turn, user, response in kept:
+        decision = {
+            "action": "delegate" if turn.agent else "respond",
+            "agent_name": turn.agent,
+            "response": response,
+        }
+        messages.append(HumanMessage(content=user))
+        messages.append(AIMessage(content=json.dumps(decision, ensure_ascii=False)))
+    return messages
+
+
+def build_orquestador_history(memory: List["Turn"], agent_key: str, include_turns: bool = True) -> str:
+    """
+    Sufijo volátil: bloque de historial de la sesión ("" si no hay memoria).
+
+    Args:
+        memory: Lista de turnos previos (Turn con user, agent, response)
+        agent_key: Agente de la modalidad ("venta" | "cita"), ver PromptPrefix.agent_key
+        include_turns: False en modo "messages" (los turnos van como mensajes; aquí solo el estado)
+    """
+    if not memory:
+        return ""
+
+    # Detectar agente activo
+    current_agent = None
+    for turn in reversed(memory):
+        if turn.agent:
+            current_agent = turn.agent
+            break
+
+    return _history_template.render(
+        agent_key=agent_key,
+        current_agent=current_agent,
+        history_text=_build_history_text(memory) if include_turns else None,
+    )
+
+
+def _observe_prompt_tokens(prefix: PromptPrefix, history_tokens: int) -> None:
+    app_metrics.prompt_tokens.labels(part="prefix").observe(prefix.tokens)
+    app_metrics.prompt_tokens.labels(part="history").observe(history_tokens)
+    app_metrics.prompt_tokens.labels(part="contexto").observe(prefix.contexto_tokens)
+
+
+def build_orquestador_messages(
+    config: Dict[str, Any],
+    memory: List["Turn"],
+    message: str,
+    contexto_negocio: Optional[str] = None,
+    history_mode: Optional[str] = None,
+    prefix: Optional[PromptPrefix] = None,
+) -> List[BaseMessage]:
+    """
+    Mensajes para el LLM orquestador. El prefijo va siempre primero y sin cambios para que el
+    proveedor pueda cachearlo.
+    - modo "system":   [prefijo, historial (texto), mensaje del usuario]
+    - modo "messages": [prefijo, (Human, AI) por turno..., estado (agente activo), mensaje del usuario]
+
+    Args:
+        config: Diccionario con nombre_bot, modalidad, frases, etc.
+        memory: Lista de turnos previos (Turn con user, agent, response)
+        message: Mensaje actual del usuario
+        contexto_negocio: Información breve del negocio para responder preguntas básicas sin delegar.
+        history_mode: "system" | "messages". Por defecto PROMPT_HISTORY_MODE.
+        prefix: Prefijo ya obtenido con get_orquestador_prefix (evita buscarlo de nuevo).
+    """
+    mode = history_mode or app_config.PROMPT_HISTORY_MODE
+    if prefix is None:
+        prefix = get_orquestador_prefix(config, contexto_negocio)
+    messages: List[BaseMessage] = [SystemMessage(content=prefix.text)]
+
+    if mode == HISTORY_MODE_MESSAGES:
+        turns = _build_history_messages(memory)
+        messages.extend(turns)
+        history = build_orquestador_history(memory, prefix.agent_key, include_turns=False)
+        history_tokens = sum(count_tokens(m.content) for m in turns) + count_tokens(history)
+    else:
+        history = build_orquestador_history(memory, prefix.agent_key)
+        history_tokens = count_tokens(history)
+    _observe_prompt_tokens(prefix, history_tokens)
+
+    if history:
+        messages.append(SystemMessage(content=history))
+    messages.append(HumanMessage(content=message))
+    return messages
 
 
 def build_orquestador_system_prompt(config: Dict[str, Any]) -> str:
@@ -63,60 +302,45 @@ def build_orquestador_system_prompt(config: Dict[str, Any]) -> str:
     Returns:
         System prompt formateado.
     """
-    variables = _apply_defaults(config)
-    variables["agent_key"] = _modalidad_to_agent(variables.get("modalidad", ""))
-    return _orquestador_template.render(**variables)
+    return get_orquestador_prefix(config).text
 
 
 def build_orquestador_system_prompt_with_memory(
     config: Dict[str, Any],
-    memory: List[Dict],
+    memory: List["Turn"],
     contexto_negocio: Optional[str] = None,
 ) -> str:
     """
-    Construye el system prompt del orquestador incluyendo historial de conversación.
+    Construye el system prompt del orquestador incluyendo historial de conversación,
+    como un único texto (prefijo + historial al final).
 
     Args:
         config: Diccionario con nombre_bot, modalidad, frases, etc.
-        memory: Lista de turnos previos [{"user": "...", "agent": "...", "response": "..."}]
+        memory: Lista de turnos previos (Turn con user, agent, response)
         contexto_negocio: Información breve del negocio (~100 palabras) para responder preguntas básicas sin delegar.
 
     Returns:
         System prompt formateado con contexto de memoria.
     """
-    # Variables base del template
-    variables = _apply_defaults(config)
-    variables["agent_key"] = _modalidad_to_agent(variables.get("modalidad", ""))
-    variables["contexto_negocio"] = (contexto_negocio or "").strip() or None
-
-    # Detectar agente activo
-    current_agent = None
-    if memory:
-        for turn in reversed(memory):
-            if turn.get("agent"):
-                current_agent = turn["agent"]
-                break
-    
-    # Construir texto del historial
-    history_text = ""
-    if memory:
-        history_lines = []
-        for turn in memory[-5:]:  # Últimos 5 turnos
-            agent_info = f" (derivaste a: {turn['agent']})" if turn['agent'] else " (respondiste directo)"
-            history_lines.append(f"- Usuario: \"{turn['user']}\"")
-            history_lines.append(f"  Respondiste: \"{turn['response']}\"{agent_info}")
-        history_text = "\n".join(history_lines)
-    
-    # Agregar contexto de memoria
-    variables["has_memory"] = bool(memory)
-    variables["current_agent"] = current_agent
-    variables["history_text"] = history_text
-
-    return _orquestador_template.render(**variables)
+    prefix = get_orquestador_prefix(config, contexto_negocio)
+    history = build_orquestador_history(memory, prefix.agent_key)
+    _observe_prompt_tokens(prefix, count_tokens(history))
+    if not history:
+        return prefix.text
+    return f"{prefix.text}\n\n---\n\n{history}"
 
 
 __all__ = [
+    "build_orquestador_messages",
     "build_orquestador_system_prompt",
     "build_orquestador_system_prompt_with_memory",
+    "build_orquestador_history",
+    "get_orquestador_prefix",
+    "PromptPrefix",
+    "HISTORY_MODE_SYSTEM",
+    "HISTORY_MODE_MESSAGES",
     "modalidad_to_agent",
+    "apply_prompt_defaults",
+    "count_tokens",
+    "truncate_to_tokens",
 ]
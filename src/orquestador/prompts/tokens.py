@@ -0,0 +1,128 @@
+"""
+Conteo y recorte de tokens para armar el prompt del orquestador dentro de un presupuesto.
+
+Usa tiktoken con el encoding del modelo (OPENAI_MODEL). La primera carga del encoding puede
+descargar el BPE (se cachea en disco, ver TIKTOKEN_CACHE_DIR): por eso se carga en un thread
+al arrancar (warm-up o lifespan) y nunca en el event loop. Mientras no terminó, o si tiktoken no
+está instalado o el encoding no se puede cargar (sin red), se usa una estimación de ~4
+caracteres por token, suficiente para acotar el tamaño del prompt.
+"""
+
+import threading
+from typing import Any, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure.logging_config import get_logger
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure.logging_config import get_logger
+
+logger = get_logger("prompt_tokens")
+
+# Estimación cuando no hay tokenizer (texto en español ≈ 4 caracteres por token)
+_CHARS_PER_TOKEN = 4
+# Encoding de los modelos actuales de OpenAI si tiktoken no conoce OPENAI_MODEL
+_DEFAULT_ENCODING = "o200k_base"
+# Marca de texto recortado
+_ELLIPSIS = "…"
+
+_encoder: Optional[Any] = None
+# Carga terminada (con o sin tokenizer). Hasta entonces se usa la estimación por caracteres:
+# la carga lee/descarga el BPE y nunca debe bloquear el event loop
+_encoder_ready = threading.Event()
+_load_started = False
+_load_lock = threading.Lock()
+
+
+def _load_encoder() -> None:
+    """Carga bloqueante del encoding (corre en un thread)."""
+    global _encoder
+    encoder = None
+    if TIKTOKEN_AVAILABLE:
+        try:
+            try:
+                encoder = tiktoken.encoding_for_model(app_config.OPENAI_MODEL)
+            except KeyError:
+                encoder = tiktoken.get_encoding(_DEFAULT_ENCODING)
+            logger.info("Tokenizer cargado: %s", encoder.name)
+        except Exception as e:
+            logger.warning("No se pudo cargar tiktoken (%s); se estiman tokens por caracteres", e)
+    _encoder = encoder
+    _encoder_ready.set()
+
+
+def start_tokenizer_load() -> None:
+    """Lanza la carga del encoding en un thread daemon si aún no empezó. No bloquea."""
+    global _load_started
+    with _load_lock:
+        if _load_started:
+            return
+        _load_started = True
+    threading.Thread(target=_load_encoder, name="tiktoken-load", daemon=True).start()
+
+
+def get_encoder() -> Optional[Any]:
+    """
+    Encoding de tiktoken si ya está cargado. No bloquea: mientras carga (o si no está
+    disponible) devuelve None y los callers usan la estimación por caracteres.
+    """
+    if _encoder_ready.is_set():
+        return _encoder
+    start_tokenizer_load()
+    return None
+
+
+def warmup_tokenizer() -> bool:
+    """Carga el encoding y espera (bloqueante: llamar vía asyncio.to_thread). True si tiktoken quedó activo."""
+    start_tokenizer_load()
+    _encoder_ready.wait()
+    return _encoder is not None
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Cantidad de tokens del texto (exacta con tiktoken, estimada sin él)."""
+    if not text:
+        return 0
+    encoder = get_encoder()
+    if encoder is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int) -> str:
+    """
+    Recorta el texto a max_tokens (conservando el inicio) y marca el corte con "…".
+    Devuelve el texto sin cambios si ya entra en el presupuesto.
+    """
+    if not text:
+        return ""
+    if max_tokens <= 0:
+        return _ELLIPSIS
+    encoder = get_encoder()
+    if encoder is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        if len(text) <= max_chars:
+            return text
+        return text[:max_chars].rstrip() + _ELLIPSIS
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoder.decode(tokens[:max_tokens]).rstrip() + _ELLIPSIS
+
+
+__all__ = [
+    "count_tokens",
+    "truncate_to_tokens",
+    "get_encoder",
+    "start_tokenizer_load",
+    "warmup_tokenizer",
+    "TIKTOKEN_AVAILABLE",
+]
@@ -0,0 +1,153 @@
+"""
+Control de admisión (load shedding) del endpoint chat.
+
+Sin él, bajo sobrecarga se aceptan todos los requests y cada uno espera hasta CHAT_TIMEOUT
+ocupando socket, memoria y cuota de OpenAI: la latencia colapsa para todos. Con admisión se
+rechaza temprano, con Retry-After, y los que entran se atienden a tiempo:
+
+- 429 si hay ADMISSION_MAX_IN_FLIGHT requests en curso.
+- Sesiones nuevas (sin memoria) solo hasta ADMISSION_NEW_SESSION_RATIO de ese máximo: el resto
+  queda reservado para conversaciones ya empezadas (429 para la sesión nueva).
+- 503 para sesiones nuevas si la latencia reciente (EWMA) supera ADMISSION_LATENCY_TARGET.
+
+Retry-After se estima con la latencia reciente (lo que tarda en liberarse un lugar).
+"""
+
+import math
+import time
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure import metrics as app_metrics
+    from .memory import memory_manager
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure import metrics as app_metrics
+    from orquestador.services.memory import memory_manager
+
+# Peso de cada muestra nueva en la EWMA de latencia
+_EWMA_ALPHA = 0.2
+# La EWMA decae a la mitad cada tantos segundos sin muestras nuevas: si se dejó de admitir por
+# latencia, el estimado no queda congelado en un valor alto
+_EWMA_HALF_LIFE = 30.0
+
+
+class AdmissionRejected(Exception):
+    """Request rechazado por sobrecarga. status_code: 429 | 503; retry_after en segundos."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(f"Admisión rechazada ({reason})")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """Lugar ocupado por un request admitido. release() es idempotente."""
+
+    __slots__ = ("_controller", "_start", "_released")
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._start = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._start)
+
+
+class AdmissionController:
+    """
+    Cuenta requests en curso y mantiene una EWMA de su latencia. Sin lock: los contadores se
+    actualizan sin awaits intermedios (el único await, la consulta de memoria, va seguido de
+    un re-chequeo del cupo).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_in_flight: int = 200,
+        new_session_ratio: float = 0.8,
+        latency_target: float = 30.0,
+        retry_after_max: int = 30,
+    ):
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight
+        self.new_session_limit = max(1, int(max_in_flight * new_session_ratio))
+        self.latency_target = latency_target
+        self.retry_after_max = retry_after_max
+        self._in_flight = 0
+        self._ewma = 0.0
+        self._ewma_at = time.monotonic()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def latency(self) -> float:
+        """EWMA de latencia (segundos), con decaimiento por tiempo sin muestras."""
+        idle = time.monotonic() - self._ewma_at
+        return self._ewma * 0.5 ** (idle / _EWMA_HALF_LIFE)
+
+    def _retry_after(self) -> int:
+        return min(max(1, math.ceil(self.latency())), self.retry_after_max)
+
+    def _reject(self, status_code: int, reason: str) -> AdmissionRejected:
+        app_metrics.admission_rejected_total.labels(reason=reason).inc()
+        return AdmissionRejected(status_code, reason, self._retry_after())
+
+    async def _has_history(self, session_id: int) -> bool:
+        try:
+            return bool(await memory_manager.get(session_id, limit=1))
+        except Exception:
+            # Backend de memoria caído: se trata como sesión nueva (se rechaza antes)
+            return False
+
+    async def admit(self, session_id: int) -> AdmissionTicket:
+        """
+        Admite el request o lanza AdmissionRejected. El caller debe llamar ticket.release()
+        al terminar (también si falla o se cancela).
+        """
+        if self.enabled:
+            if self._in_flight >= self.max_in_flight:
+                raise self._reject(429, "max_in_flight")
+            latency_exceeded = self.latency_target > 0 and self.latency() > self.latency_target
+            if latency_exceeded or self._in_flight >= self.new_session_limit:
+                # Bajo presión solo entran conversaciones ya empezadas (se consulta la memoria
+                # solo en este caso)
+                if not await self._has_history(session_id):
+                    if latency_exceeded:
+                        raise self._reject(503, "latency")
+                    raise self._reject(429, "new_session")
+                if self._in_flight >= self.max_in_flight:
+                    raise self._reject(429, "max_in_flight")
+
+        self._in_flight += 1
+        app_metrics.admission_in_flight.set(self._in_flight)
+        return AdmissionTicket(self)
+
+    def _release(self, latency_seconds: float) -> None:
+        self._in_flight -= 1
+        app_metrics.admission_in_flight.set(self._in_flight)
+        self._ewma = _EWMA_ALPHA * latency_seconds + (1 - _EWMA_ALPHA) * self.latency()
+        self._ewma_at = time.monotonic()
+
+
+# Singleton global
+admission_controller = AdmissionController(
+    enabled=app_config.ADMISSION_ENABLED,
+    max_in_flight=app_config.ADMISSION_MAX_IN_FLIGHT,
+    new_session_ratio=app_config.ADMISSION_NEW_SESSION_RATIO,
+    latency_target=app_config.ADMISSION_LATENCY_TARGET,
+    retry_after_max=app_config.ADMISSION_RETRY_AFTER_MAX,
+)
+
+
+__all__ = [
+    "admission_controller",
+    "AdmissionController",
+    "AdmissionRejected",
+    "AdmissionTicket",
+]
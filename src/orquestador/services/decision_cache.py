@@ -0,0 +1,91 @@
+"""
+Cache de decisiones del orquestador.
+
+Muchos turnos se repiten tal cual para un mismo tenant ("hola", "buenos días", "gracias") y el
+LLM devuelve la misma decisión. Se cachea (respuesta, agente) por:
+    (hash del prefijo del tenant, mensaje normalizado)
+Solo turnos sin historial (primer mensaje de la sesión): con historial, un mensaje corto ("sí",
+"2", "mañana") significa algo distinto en cada conversación y la decisión no es reutilizable.
+El hash del prefijo (ver prompts.get_orquestador_prefix) cambia si cambia la config del bot o
+el contexto de negocio, así que una edición del tenant no sirve decisiones viejas.
+
+Solo se cachean mensajes cortos: son los que se repiten entre sesiones; un mensaje largo casi
+nunca vuelve a aparecer y solo ocuparía espacio.
+"""
+
+import re
+from typing import Hashable, Optional, Tuple
+
+from cachetools import TTLCache
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure import metrics as app_metrics
+    from .router import normalize_message
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure import metrics as app_metrics
+    from orquestador.services.router import normalize_message
+
+# (respuesta, agente_a_invocar) tal como lo devuelve invoke_orquestador_messages
+CachedDecision = Tuple[str, Optional[str]]
+
+# Letras repetidas 3+ veces ("holaaa", "graciasss") → una sola. Solo letras: los dígitos
+# ("1000" vs "10") cambian el significado del mensaje
+_REPEATED_CHARS_RE = re.compile(r"([^\W\d_])\1{2,}", re.UNICODE)
+
+
+def fuzzy_normalize(message: str) -> str:
+    """normalize_message (minúsculas, sin tildes ni puntuación) + colapso de letras alargadas."""
+    return _REPEATED_CHARS_RE.sub(r"\1", normalize_message(message))
+
+
+class DecisionCache:
+    """
+    TTL + LRU (TTLCache). Sin lock: get/put no hacen await, son atómicos respecto del event loop.
+    """
+
+    def __init__(self, maxsize: int = 5000, ttl: int = 600, max_message_chars: int = 40):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._max_message_chars = max_message_chars
+
+    def make_key(
+        self,
+        prefix_key: str,
+        message: str,
+        has_memory: bool,
+    ) -> Optional[Hashable]:
+        """
+        Clave de cache del turno, o None si no es cacheable (sesión con historial, mensaje
+        vacío o largo).
+        """
+        normalized = fuzzy_normalize(message)
+        if has_memory or not normalized or len(normalized) > self._max_message_chars:
+            app_metrics.decision_cache_total.labels(result="skip").inc()
+            return None
+        return (prefix_key, normalized)
+
+    def get(self, key: Hashable) -> Optional[CachedDecision]:
+        decision: Optional[CachedDecision] = self._cache.get(key)
+        app_metrics.decision_cache_total.labels(result="hit" if decision is not None else "miss").inc()
+        return decision
+
+    def put(self, key: Hashable, decision: CachedDecision) -> None:
+        self._cache[key] = decision
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# Singleton global
+decision_cache = DecisionCache(
+    maxsize=app_config.DECISION_CACHE_MAX_SIZE,
+    ttl=app_config.DECISION_CACHE_TTL,
+    max_message_chars=app_config.DECISION_CACHE_MAX_MESSAGE_CHARS,
+)
+
+
+__all__ = ["decision_cache", "DecisionCache", "CachedDecision", "fuzzy_normalize"]
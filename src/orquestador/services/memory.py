@@ -1,33 +1,267 @@
 """
 Sistema de memoria del orquestador.
-Guarda historial de conversación por session_id.
-Protegido con asyncio.Lock para evitar race conditions en entorno async.
+Guarda historial de conversación por session_id detrás de un backend intercambiable:
+
+- InMemoryBackend (default): ring buffer (deque) por sesión en un TTLCache del proceso.
+  Sin lock global: asyncio ejecuta una sola coroutine a la vez y ninguna operación del store
+  hace await a mitad de camino, así que cada método es atómico respecto del event loop.
+- RedisMemoryBackend: lista por sesión en Redis (RPUSH + LTRIM + EXPIRE en pipeline), para
+  compartir la conversación entre workers/réplicas.
+
+Se elige con MEMORY_BACKEND ("memory" | "redis").
+
+Cada turno es un Turn (__slots__, agente como IntEnum, timestamp float) en vez de un dict
+con timestamp ISO: ~1.7x menos overhead por turno sin contar el texto de los mensajes
+(ver benchmarks/memory_footprint.py).
 """
 
-import asyncio
-from typing import Dict, List, Optional
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
 from datetime import datetime
+from enum import IntEnum
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Union
 
 from cachetools import TTLCache
 
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_asyncio = None
+    REDIS_AVAILABLE = False
+
+try:
+    from ..config import config as app_config
+    from ..infrastructure.logging_config import get_logger
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.infrastructure.logging_config import get_logger
+
+logger = get_logger("memory")
+
+# Turnos por sesión: se descarta el más antiguo al superar el límite
+_MAX_TURNS = 10
+
+
+class AgentCode(IntEnum):
+    """Agente especializado que manejó un turno (singletons: no se duplica el string por turno)."""
+    VENTA = 1
+    CITA = 2
+    RESERVA = 3
+
+    @property
+    def label(self) -> str:
+        """Nombre usado en el resto del orquestador ("venta" | "cita" | "reserva")."""
+        return self.name.lower()
+
+
+_AGENT_BY_LABEL: Dict[str, AgentCode] = {code.label: code for code in AgentCode}
+
+
+class Turn:
+    """
+    Turno de conversación compacto.
+    timestamp: epoch en segundos (float). Se usa reloj de pared y no monotónico porque los
+    turnos se comparten entre réplicas vía Redis, donde los relojes monotónicos no son comparables.
+    """
+
+    __slots__ = ("user", "response", "timestamp", "_agent")
+
+    def __init__(
+        self,
+        user: str,
+        agent: Optional[str],
+        response: str,
+        timestamp: Optional[float] = None,
+    ):
+        self.user = user
+        self.response = response
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._agent: Optional[AgentCode] = _AGENT_BY_LABEL.get(agent) if agent else None
+
+    @property
+    def agent(self) -> Optional[str]:
+        """Agente que manejó el turno ("venta" | "cita" | "reserva") o None si respondió el orquestador."""
+        return self._agent.label if self._agent is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representación serializable (Redis, debug)."""
+        return {"user": self.user, "agent": self.agent, "response": self.response, "timestamp": self.timestamp}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Turn":
+        """Inverso de to_dict. Acepta timestamps ISO de turnos guardados por versiones anteriores."""
+        ts: Union[float, str, None] = data.get("timestamp")
+        if isinstance(ts, str):
+            try:
+                ts = datetime.fromisoformat(ts).timestamp()
+            except ValueError:
+                ts = None
+        return cls(data.get("user", ""), data.get("agent"), data.get("response", ""), ts)
+
+    def __repr__(self) -> str:
+        return f"Turn(user={self.user!r}, agent={self.agent!r}, response={self.response!r})"
+
+
+class MemoryBackend(ABC):
+    """Interfaz de almacenamiento de turnos por sesión."""
+
+    @abstractmethod
+    async def append(self, session_id: int, turn: Turn) -> None:
+        """Agrega un turno al final del historial y renueva el TTL de la sesión."""
+
+    @abstractmethod
+    async def get(self, session_id: int, limit: int) -> List[Turn]:
+        """Devuelve (copia de) los últimos `limit` turnos, del más antiguo al más reciente."""
+
+    @abstractmethod
+    async def clear(self, session_id: int) -> None:
+        """Elimina el historial de la sesión."""
+
+    @abstractmethod
+    async def get_stats(self) -> Dict:
+        """Estadísticas de uso (debug)."""
+
+    async def close(self) -> None:
+        """Libera recursos (conexiones). Por defecto no hace nada."""
+
+
+class InMemoryBackend(MemoryBackend):
+    """
+    Store local del proceso.
+    TTLCache con límite de tamaño para evitar memory leak en producción multiempresa:
+    maxsize → máximo de sesiones activas simultáneamente (LRU eviction al superar límite)
+    ttl     → la sesión expira si no recibe mensajes en ese tiempo
+    El TTL se renueva en cada append() al re-asignar la clave, manteniendo vivas
+    conversaciones activas.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: int = 7200):
+        self._store: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)  # session_id -> deque de turnos
+
+    async def append(self, session_id: int, turn: Turn) -> None:
+        history: Optional[Deque[Turn]] = self._store.get(session_id)
+        if history is None:
+            history = deque(maxlen=_MAX_TURNS)
+        history.append(turn)
+        # Re-asignar el mismo deque (sin copiarlo) renueva el TTL de la sesión en TTLCache.
+        self._store[session_id] = history
+
+    async def get(self, session_id: int, limit: int) -> List[Turn]:
+        history = self._store.get(session_id)
+        if not history:
+            return []
+        return list(islice(history, max(len(history) - limit, 0), None))
+
+    async def clear(self, session_id: int) -> None:
+        self._store.pop(session_id, None)
 
-# TTLCache con límite de tamaño para evitar memory leak en producción multiempresa.
-# maxsize=10000 → máximo 10.000 sesiones activas simultáneamente (LRU eviction al superar límite)
-# ttl=7200      → sesión expira si no recibe mensajes en 2 horas
-# El TTL se renueva en cada add() al re-asignar la clave, manteniendo vivas conversaciones activas.
-_MEMORY_STORE: TTLCache = TTLCache(maxsize=10000, ttl=7200)
-_memory_lock = asyncio.Lock()
+    async def get_stats(self) -> Dict:
+        return {
+            "backend": "memory",
+            "total_sessions": len(self._store),
+            "max_sessions": self._store.maxsize,
+            "session_ttl_seconds": self._store.ttl,
+            "sessions": {
+                sid: len(turns)
+                for sid, turns in self._store.items()
+            }
+        }
+
+
+class RedisMemoryBackend(MemoryBackend):
+    """
+    Store compartido en Redis. Una lista por sesión con los turnos serializados en JSON.
+    Escrituras en una sola ida y vuelta (pipeline MULTI): RPUSH + LTRIM (cap a _MAX_TURNS)
+    + EXPIRE (renueva TTL por sesión). Lecturas con un único LRANGE.
+    """
+
+    def __init__(self, client: Any, key_prefix: str = "orquestador:memory:", ttl: int = 7200):
+        self._redis = client
+        self._prefix = key_prefix
+        self._ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, key_prefix: str = "orquestador:memory:", ttl: int = 7200) -> "RedisMemoryBackend":
+        """Crea el backend con un cliente redis.asyncio (pool de conexiones interno)."""
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis no está instalado. Instala con: pip install redis")
+        return cls(redis_asyncio.from_url(url, decode_responses=True), key_prefix=key_prefix, ttl=ttl)
+
+    def _key(self, session_id: int) -> str:
+        return f"{self._prefix}{session_id}"
+
+    async def append(self, session_id: int, turn: Turn) -> None:
+        key = self._key(session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps(turn.to_dict(), ensure_ascii=False))
+            pipe.ltrim(key, -_MAX_TURNS, -1)
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
+
+    async def get(self, session_id: int, limit: int) -> List[Turn]:
+        if limit <= 0:
+            return []
+        raw = await self._redis.lrange(self._key(session_id), -limit, -1)
+        return [Turn.from_dict(json.loads(item)) for item in raw]
+
+    async def clear(self, session_id: int) -> None:
+        await self._redis.delete(self._key(session_id))
+
+    async def get_stats(self) -> Dict:
+        keys = [key async for key in self._redis.scan_iter(match=f"{self._prefix}*", count=500)]
+        lengths: List[int] = []
+        if keys:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.llen(key)
+                lengths = await pipe.execute()
+        return {
+            "backend": "redis",
+            "total_sessions": len(keys),
+            "session_ttl_seconds": self._ttl,
+            "sessions": {
+                key[len(self._prefix):]: length
+                for key, length in zip(keys, lengths)
+            }
+        }
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def _create_backend() -> MemoryBackend:
+    """Construye el backend según MEMORY_BACKEND. Si Redis no está disponible, cae al in-memory."""
+    if app_config.MEMORY_BACKEND == "redis":
+        if REDIS_AVAILABLE:
+            logger.info("Memoria conversacional en Redis (%s)", app_config.MEMORY_KEY_PREFIX)
+            return RedisMemoryBackend.from_url(
+                app_config.REDIS_URL,
+                key_prefix=app_config.MEMORY_KEY_PREFIX,
+                ttl=app_config.MEMORY_SESSION_TTL,
+            )
+        logger.warning("MEMORY_BACKEND=redis pero redis no está instalado; usando memoria local")
+    return InMemoryBackend(maxsize=app_config.MEMORY_MAX_SESSIONS, ttl=app_config.MEMORY_SESSION_TTL)
 
 
 class MemoryManager:
     """
     Gestiona la memoria del orquestador.
-    Guarda últimos N turnos por session_id.
-    Todos los métodos son async y usan un lock para acceso thread-safe.
+    Guarda últimos N turnos por session_id delegando el almacenamiento en un MemoryBackend.
     """
-    
-    @staticmethod
+
+    def __init__(self, backend: Optional[MemoryBackend] = None):
+        self._backend = backend if backend is not None else _create_backend()
+
+    @property
+    def backend(self) -> MemoryBackend:
+        return self._backend
+
     async def add(
+        self,
         session_id: int,
         user_message: str,
         agent_used: Optional[str],
@@ -35,91 +269,78 @@ class MemoryManager:
     ) -> None:
         """
         Agrega un turno a la memoria.
-        
+
         Args:
             session_id: ID de la sesión/usuario (int, unificado con n8n)
             user_message: Mensaje del usuario
             agent_used: Agente que manejó el mensaje ("reserva" | "venta" | "cita" | None)
             response: Respuesta final al usuario (ya mejorada)
         """
-        async with _memory_lock:
-            history = list(_MEMORY_STORE.get(session_id, []))
-            history.append({
-                "user": user_message,
-                "agent": agent_used,
-                "response": response,
-                "timestamp": datetime.now().isoformat()
-            })
-            # Re-asignar (no append in-place) para renovar el TTL de la sesión en TTLCache.
-            # Así la sesión se mantiene viva mientras el usuario siga enviando mensajes.
-            _MEMORY_STORE[session_id] = history[-10:]
-    
-    @staticmethod
-    async def get(session_id: int, limit: int = 10) -> List[Dict]:
+        await self._backend.append(session_id, Turn(user_message, agent_used, response))
+
+    async def get(self, session_id: int, limit: int = 10) -> List[Turn]:
         """
         Obtiene los últimos N turnos de una sesión.
-        
+
         Args:
             session_id: ID de la sesión/usuario (int)
             limit: Cantidad máxima de turnos a retornar
-        
+
         Returns:
-            Lista de turnos (dict con user, agent, response)
+            Lista de turnos (Turn con user, agent, response, timestamp). Es una copia: el caller puede
+            usarla tras otros awaits aunque la sesión reciba turnos nuevos.
         """
-        async with _memory_lock:
-            history = _MEMORY_STORE.get(session_id, [])
-            return history[-limit:]
-    
+        return await self._backend.get(session_id, limit)
+
     @staticmethod
-    async def get_current_agent(session_id: int) -> Optional[str]:
+    def current_agent_from_history(history: List[Turn]) -> Optional[str]:
+        """Agente del último turno delegado en un historial ya cargado (sin I/O)."""
+        for turn in reversed(history):
+            if turn.agent:
+                return turn.agent
+        return None
+
+    async def get_current_agent(self, session_id: int) -> Optional[str]:
         """
         Obtiene el agente actualmente activo en la conversación.
-        
+
         Args:
             session_id: ID de la sesión/usuario (int)
-        
+
         Returns:
             Nombre del agente activo o None
         """
-        async with _memory_lock:
-            history = _MEMORY_STORE.get(session_id, [])
-            if not history:
-                return None
-            
-            for turn in reversed(history):
-                if turn.get("agent"):
-                    return turn["agent"]
-            
-            return None
-    
-    @staticmethod
-    async def clear(session_id: int) -> None:
+        history = await self._backend.get(session_id, _MAX_TURNS)
+        return self.current_agent_from_history(history)
+
+    async def clear(self, session_id: int) -> None:
         """
         Limpia la memoria de una sesión.
-        
+
         Args:
             session_id: ID de la sesión/usuario (int)
         """
-        async with _memory_lock:
-            _MEMORY_STORE.pop(session_id, None)
-    
-    @staticmethod
-    async def get_stats() -> Dict:
+        await self._backend.clear(session_id)
+
+    async def get_stats(self) -> Dict:
         """Retorna estadísticas de uso de memoria (debug)"""
-        async with _memory_lock:
-            return {
-                "total_sessions": len(_MEMORY_STORE),
-                "max_sessions": _MEMORY_STORE.maxsize,
-                "session_ttl_seconds": _MEMORY_STORE.ttl,
-                "sessions": {
-                    sid: len(turns)
-                    for sid, turns in _MEMORY_STORE.items()
-                }
-            }
+        return await self._backend.get_stats()
+
+    async def close(self) -> None:
+        """Cierra conexiones del backend (shutdown de la app)."""
+        await self._backend.close()
 
 
 # Singleton global
 memory_manager = MemoryManager()
 
 
-__all__ = ["memory_manager", "MemoryManager"]
+__all__ = [
+    "memory_manager",
+    "MemoryManager",
+    "MemoryBackend",
+    "Turn",
+    "AgentCode",
+    "InMemoryBackend",
+    "RedisMemoryBackend",
+]
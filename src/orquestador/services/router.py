@@ -0,0 +1,169 @@
+"""
+Router determinístico (fast path) previo al LLM del orquestador.
+
+Resuelve localmente los turnos obvios (continuación de un flujo con el especialista,
+saludo inicial, despedida) usando reglas + el estado de memoria de la sesión.
+Si ninguna regla tiene confianza suficiente devuelve None y el flujo cae al LLM.
+
+Las reglas son funciones puras (RoutingContext -> OrquestradorDecision | None) que se
+evalúan en orden; se pueden agregar nuevas con FastPathRouter.register_rule().
+"""
+
+import re
+import unicodedata
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from ..config.models import OrquestradorDecision
+    from ..prompts import apply_prompt_defaults, modalidad_to_agent
+except ImportError:
+    from orquestador.config.models import OrquestradorDecision
+    from orquestador.prompts import apply_prompt_defaults, modalidad_to_agent
+
+if TYPE_CHECKING:
+    from .memory import Turn
+
+# Respuesta transitoria al delegar por fast path (igual al ejemplo del template).
+# Solo la ve el usuario si el agente MCP falla y se usa como fallback.
+FAST_PATH_DELEGATE_REPLY = "Un momento..."
+
+# Mensajes completos (ya normalizados) que son solo saludo / despedida.
+# Se compara el mensaje entero: "hola, cuánto cuesta" NO es solo saludo.
+_GREETINGS = frozenset({
+    "hola", "holi", "holaa", "buenas", "buen dia", "buenos dias", "buenas tardes",
+    "buenas noches", "hola buenos dias", "hola buenas tardes", "hola buenas noches",
+    "hola buenas", "hey", "hi", "hello", "saludos",
+})
+_GOODBYES = frozenset({
+    "gracias", "muchas gracias", "mil gracias", "ok gracias", "gracias bye",
+    "chau", "chao", "adios", "hasta luego", "nos vemos", "bye",
+    "gracias hasta luego", "gracias chau", "gracias adios",
+})
+
+# Palabras que vuelven ambiguo un turno de continuación (escalamiento o cambio de tema):
+# el template le pide al LLM dejar de delegar en esos casos, así que no los resolvemos aquí.
+_AMBIGUOUS_KEYWORDS = (
+    "humano", "persona", "asesor", "agente", "encargado", "reclamo", "queja",
+    "olvidalo", "cancela", "no importa", "otro tema",
+)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """
+    Normaliza un mensaje para comparaciones exactas: minúsculas, sin tildes,
+    sin signos de puntuación/emojis y con espacios colapsados.
+    """
+    text = unicodedata.normalize("NFKD", (message or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class RoutingContext:
+    """Datos disponibles para las reglas del fast path (sin I/O)."""
+
+    __slots__ = ("message", "normalized", "memory", "current_agent", "agent_key", "prompt_vars")
+
+    def __init__(
+        self,
+        message: str,
+        memory: List["Turn"],
+        current_agent: Optional[str],
+        config: Dict[str, Any],
+    ):
+        self.message = message
+        self.normalized = normalize_message(message)
+        self.memory = memory
+        self.current_agent = current_agent
+        self.prompt_vars = apply_prompt_defaults(config)
+        self.agent_key = modalidad_to_agent(self.prompt_vars.get("modalidad", ""))
+
+
+RoutingRule = Callable[[RoutingContext], Optional[OrquestradorDecision]]
+
+
+def rule_goodbye(ctx: RoutingContext) -> Optional[OrquestradorDecision]:
+    """Despedida explícita (mensaje completo) → responde el orquestador con frase_des."""
+    if ctx.normalized in _GOODBYES:
+        return OrquestradorDecision(action="respond", agent_name=None, response=ctx.prompt_vars["frase_des"])
+    return None
+
+
+def rule_first_greeting(ctx: RoutingContext) -> Optional[OrquestradorDecision]:
+    """Primer mensaje y solo saludo → responde el orquestador con frase_saludo."""
+    if not ctx.memory and ctx.normalized in _GREETINGS:
+        return OrquestradorDecision(action="respond", agent_name=None, response=ctx.prompt_vars["frase_saludo"])
+    return None
+
+
+def rule_continuation(ctx: RoutingContext) -> Optional[OrquestradorDecision]:
+    """
+    La sesión ya está en flujo con el especialista → sigue delegando al agente de la modalidad.
+    Se descarta si el mensaje sugiere escalamiento o cambio de tema (lo decide el LLM).
+    """
+    if not ctx.current_agent:
+        return None
+    if any(keyword in ctx.normalized for keyword in _AMBIGUOUS_KEYWORDS):
+        return None
+    return OrquestradorDecision(action="delegate", agent_name=ctx.agent_key, response=FAST_PATH_DELEGATE_REPLY)
+
+
+_DEFAULT_RULES: Tuple[RoutingRule, ...] = (rule_goodbye, rule_first_greeting, rule_continuation)
+
+
+class FastPathRouter:
+    """
+    Evalúa las reglas en orden y devuelve la primera decisión encontrada.
+    Sin estado compartido mutable por request: seguro para concurrencia async.
+    """
+
+    def __init__(self, rules: Optional[List[RoutingRule]] = None):
+        self._rules: List[RoutingRule] = list(rules if rules is not None else _DEFAULT_RULES)
+
+    def register_rule(self, rule: RoutingRule, first: bool = False) -> None:
+        """Agrega una regla al final (o al inicio si first=True)."""
+        if first:
+            self._rules.insert(0, rule)
+        else:
+            self._rules.append(rule)
+
+    def route(
+        self,
+        message: str,
+        memory: List["Turn"],
+        current_agent: Optional[str],
+        config: Dict[str, Any],
+    ) -> Optional[Tuple[OrquestradorDecision, str]]:
+        """
+        Intenta resolver el turno sin LLM.
+
+        Returns:
+            (decisión, nombre_de_regla) si alguna regla aplica con confianza alta, o None
+            si el turno es ambiguo y debe decidirlo el LLM.
+        """
+        ctx = RoutingContext(message, memory, current_agent, config)
+        for rule in self._rules:
+            decision = rule(ctx)
+            if decision is not None:
+                return decision, getattr(rule, "__name__", "custom")
+        return None
+
+
+# Singleton global
+fast_path_router = FastPathRouter()
+
+
+__all__ = [
+    "fast_path_router",
+    "FastPathRouter",
+    "RoutingContext",
+    "RoutingRule",
+    "normalize_message",
+    "rule_goodbye",
+    "rule_first_greeting",
+    "rule_continuation",
+    "FAST_PATH_DELEGATE_REPLY",
+]
@@ -0,0 +1,194 @@
+"""
+Mailbox por session_id: serializa los turnos de una misma conversación y, opcionalmente,
+agrupa (coalesce) los mensajes que llegan en ráfaga dentro de una ventana de debounce.
+
+Cada sesión con mensajes pendientes tiene un único worker (asyncio.Task) que procesa lotes
+en orden de llegada; así dos requests de la misma sesión nunca corren el pipeline en paralelo
+ni escriben memoria fuera de orden.
+
+El resultado de un lote lo lleva su dueño: el último caller que sigue esperando. Si el dueño se
+va (cliente desconectado, SSE cancelado, timeout) el paso en curso se cancela y se repite con el
+siguiente caller vivo (su emit y su deadline); si no queda ninguno el turno se abandona, para no
+gastar tokens ni escribir memoria por un turno que nadie va a ver.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+try:
+    from ..infrastructure.logging_config import get_logger
+    from ..infrastructure import metrics as app_metrics
+except ImportError:
+    from orquestador.infrastructure.logging_config import get_logger
+    from orquestador.infrastructure import metrics as app_metrics
+
+logger = get_logger("session_mailbox")
+
+T = TypeVar("T")
+
+# Procesa el mensaje (o los mensajes ya unidos) de un lote
+BatchProcessor = Callable[[str], Awaitable[T]]
+
+
+class _Pending(Generic[T]):
+    """Mensaje encolado: texto, cómo procesarlo y dónde entregar el resultado."""
+
+    __slots__ = ("message", "process", "future")
+
+    def __init__(self, message: str, process: BatchProcessor, future: "asyncio.Future[Tuple[T, bool]]"):
+        self.message = message
+        self.process = process
+        self.future = future
+
+
+class _Mailbox:
+    __slots__ = ("pending", "worker", "running")
+
+    def __init__(self) -> None:
+        self.pending: List[_Pending] = []
+        self.worker: Optional[asyncio.Task] = None
+        # Lote en proceso, su dueño y la task del paso (para cancelarlo si se va el dueño)
+        self.running: Optional[Tuple[List[_Pending], _Pending, asyncio.Task]] = None
+
+
+class SessionMailbox:
+    """
+    Serialización + coalescing por sesión.
+
+    Con window_seconds=0 cada mensaje se procesa solo, en orden. Con window_seconds>0 el worker
+    espera esa ventana antes de cada lote y une con saltos de línea todos los mensajes
+    pendientes en una sola invocación; el resultado se entrega a todos los callers del lote,
+    indicando cuál era el último mensaje (el que debe llevar la respuesta al usuario).
+    """
+
+    def __init__(self, window_seconds: float = 0.0):
+        self.window_seconds = window_seconds
+        self._mailboxes: Dict[Any, _Mailbox] = {}
+
+    async def submit(self, session_id: Any, message: str, process: BatchProcessor) -> Tuple[T, bool]:
+        """
+        Encola un mensaje y espera el resultado de su lote.
+
+        Args:
+            session_id: Clave de serialización
+            message: Texto del usuario
+            process: Coroutine factory que procesa el texto del lote. Se usa la del último
+                     mensaje vigente del lote (config y deadline más recientes).
+
+        Returns:
+            (resultado, es_ultimo): es_ultimo=False si el mensaje fue absorbido por un lote
+            cuya respuesta la lleva un mensaje posterior.
+        """
+        mailbox = self._mailboxes.get(session_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[session_id] = _Mailbox()
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda _: self._cancel_orphaned_step(mailbox))
+        mailbox.pending.append(_Pending(message, process, future))
+        if mailbox.worker is None:
+            mailbox.worker = asyncio.create_task(self._drain(session_id, mailbox))
+        else:
+            app_metrics.session_mailbox_queued_total.inc()
+
+        # Si este caller se cancela (timeout, desconexión), su future queda cancelado: el worker
+        # lo omite si aún no empezó, o cancela el paso en curso si era su dueño
+        return await future
+
+    @staticmethod
+    def _cancel_orphaned_step(mailbox: _Mailbox) -> None:
+        """
+        Cancela el paso en curso si se fue su dueño: el worker lo repite con el siguiente
+        caller vivo del lote, o abandona el turno si no queda ninguno.
+        """
+        running = mailbox.running
+        if running is None:
+            return
+        _, owner, step = running
+        if not step.done() and owner.future.cancelled():
+            step.cancel()
+
+    async def _drain(self, session_id: Any, mailbox: _Mailbox) -> None:
+        """Worker de la sesión: procesa lotes hasta vaciar la cola y luego se retira."""
+        try:
+            while mailbox.pending:
+                if self.window_seconds > 0:
+                    await asyncio.sleep(self.window_seconds)
+                batch = self._take_batch(mailbox)
+                if not batch:
+                    continue
+                await self._run_batch(session_id, mailbox, batch)
+        finally:
+            mailbox.worker = None
+            if mailbox.pending:
+                # Cancelado con mensajes pendientes (shutdown): no dejarlos colgados
+                for item in mailbox.pending:
+                    if not item.future.done():
+                        item.future.cancel()
+                mailbox.pending.clear()
+            if self._mailboxes.get(session_id) is mailbox:
+                del self._mailboxes[session_id]
+
+    def _take_batch(self, mailbox: _Mailbox) -> List[_Pending]:
+        """Sin ventana: un mensaje por lote. Con ventana: todo lo pendiente."""
+        if self.window_seconds > 0:
+            batch, mailbox.pending = mailbox.pending, []
+        else:
+            batch = [mailbox.pending.pop(0)]
+        # Los callers que ya abandonaron (timeout/cancel) no se procesan
+        return [item for item in batch if not item.future.done()]
+
+    async def _run_batch(self, session_id: Any, mailbox: _Mailbox, batch: List[_Pending]) -> None:
+        if len(batch) > 1:
+            app_metrics.session_mailbox_coalesced_total.inc(len(batch) - 1)
+            logger.info(
+                "Mensajes agrupados en un solo turno",
+                extra={"extra_fields": {"session_id": session_id, "mensajes": len(batch)}}
+            )
+        combined = "\n".join(item.message for item in batch)
+        while True:
+            live = [item for item in batch if not item.future.done()]
+            if not live:
+                # Todos los callers del lote se fueron: turno abandonado
+                logger.info(
+                    "Turno cancelado: sin callers esperando",
+                    extra={"extra_fields": {"session_id": session_id}}
+                )
+                return
+            # El dueño (quien lleva la respuesta) es el último caller que sigue esperando; el
+            # paso usa su process (emit y deadline de un request vivo)
+            owner = live[-1]
+            # El paso corre en su propia task: se puede cancelar sin cancelar al worker
+            step = asyncio.ensure_future(owner.process(combined))
+            mailbox.running = (batch, owner, step)
+            try:
+                await asyncio.wait((step,))
+            except asyncio.CancelledError:
+                # Worker cancelado (shutdown)
+                step.cancel()
+                for item in batch:
+                    if not item.future.done():
+                        item.future.cancel()
+                raise
+            finally:
+                mailbox.running = None
+            if not step.cancelled():
+                break
+            # Se fue el dueño (o todos): se repite el paso con el siguiente caller vivo
+
+        if step.exception() is not None:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(step.exception())
+            return
+        result = step.result()
+        live = [item for item in batch if not item.future.done()]
+        for item in live:
+            item.future.set_result((result, item is live[-1]))
+
+    def active_sessions(self) -> int:
+        """Sesiones con mensajes en curso o pendientes."""
+        return len(self._mailboxes)
+
+
+__all__ = ["SessionMailbox"]
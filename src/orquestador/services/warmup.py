@@ -0,0 +1,102 @@
+"""
+Warm-up del orquestador al arrancar.
+Inicializa los singletons lazy (LLM, cliente/tools MCP, cliente HTTP, tokenizer) y precarga el contexto
+de negocio de las empresas configuradas, para que el primer request real no pague ese costo.
+Mientras no termina, la app se reporta como no lista en /health.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict
+
+try:
+    from ..config import config as app_config
+    from ..integrations.llm import warmup_llm
+    from ..integrations.mcp_client import warmup_mcp
+    from ..integrations.contexto_negocio import prefetch_contexto_negocio
+    from ..prompts.tokens import warmup_tokenizer
+    from ..infrastructure.logging_config import get_logger
+except ImportError:
+    from orquestador.config import config as app_config
+    from orquestador.integrations.llm import warmup_llm
+    from orquestador.integrations.mcp_client import warmup_mcp
+    from orquestador.integrations.contexto_negocio import prefetch_contexto_negocio
+    from orquestador.prompts.tokens import warmup_tokenizer
+    from orquestador.infrastructure.logging_config import get_logger
+
+logger = get_logger("warmup")
+
+# Estado de readiness (lo consulta /health). Se escribe solo desde run_warmup/mark_ready.
+_ready = False
+_warmup_result: Dict[str, Any] = {}
+
+
+def is_ready() -> bool:
+    """True cuando el warm-up terminó (con o sin errores) o está desactivado."""
+    return _ready
+
+
+def get_warmup_result() -> Dict[str, Any]:
+    """Resultado del último warm-up (debug / /health)."""
+    return dict(_warmup_result)
+
+
+def mark_ready() -> None:
+    """Marca la app como lista sin warm-up (WARMUP_ENABLED=false)."""
+    global _ready
+    _ready = True
+
+
+async def _step(name: str, coro) -> Any:
+    """Ejecuta un paso del warm-up sin propagar errores (un paso fallido no bloquea el resto)."""
+    try:
+        return await coro
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("Warm-up '%s' falló: %s", name, e)
+        return False
+
+
+async def run_warmup() -> Dict[str, Any]:
+    """
+    Ejecuta los pasos de warm-up en paralelo, acotados por WARMUP_TIMEOUT.
+    Al terminar (incluso por timeout o error) marca la app como lista: un servicio externo
+    caído no debe dejar la réplica fuera de rotación, solo degradada como antes.
+    """
+    global _ready, _warmup_result
+    start = time.perf_counter()
+    result: Dict[str, Any] = {
+        "llm": False, "mcp_tools": False, "tokenizer": False, "contexto_empresas": 0, "timeout": False
+    }
+
+    try:
+        llm_ok, mcp_ok, tokenizer_ok, contextos = await asyncio.wait_for(
+            asyncio.gather(
+                _step("llm", warmup_llm()),
+                _step("mcp_tools", warmup_mcp()),
+                # La carga del encoding es bloqueante (lee/descarga el BPE): fuera del event loop
+                _step("tokenizer", asyncio.to_thread(warmup_tokenizer)),
+                _step("contexto_negocio", prefetch_contexto_negocio(app_config.WARMUP_EMPRESAS)),
+            ),
+            timeout=app_config.WARMUP_TIMEOUT,
+        )
+        result.update(
+            llm=bool(llm_ok),
+            mcp_tools=bool(mcp_ok),
+            tokenizer=bool(tokenizer_ok),
+            contexto_empresas=int(contextos or 0),
+        )
+    except asyncio.TimeoutError:
+        result["timeout"] = True
+        logger.warning("Warm-up excedió %ss; la app queda lista igualmente", app_config.WARMUP_TIMEOUT)
+    finally:
+        result["duration_seconds"] = round(time.perf_counter() - start, 3)
+        _warmup_result = result
+        _ready = True
+
+    logger.info("Warm-up completado", extra={"extra_fields": {"warmup": result}})
+    return result
+
+
+__all__ = ["run_warmup", "is_ready", "mark_ready", "get_warmup_result"]
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from orquestador.services import admission as A
+from orquestador.services.admission import AdmissionController, AdmissionRejected
+
+
+class _Memory:
+    """Fake de memory_manager: sesiones con historial."""
+
+    def __init__(self, *with_history):
+        self.with_history = set(with_history)
+
+    async def get(self, session_id, limit):
+        return ["turno"] if session_id in self.with_history else []
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    memory = _Memory(1)
+    monkeypatch.setattr(A, "memory_manager", memory)
+    return memory
+
+
+def _admit(controller, *session_ids):
+    async def scenario():
+        return [await controller.admit(session_id) for session_id in session_ids]
+    return asyncio.run(scenario())
+
+
+def test_rejects_everything_above_max_in_flight(memory):
+    controller = AdmissionController(max_in_flight=2, new_session_ratio=1.0)
+    tickets = _admit(controller, 2, 3)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        _admit(controller, 1)
+    assert (excinfo.value.status_code, excinfo.value.reason) == (429, "max_in_flight")
+
+    tickets[0].release()
+    tickets[0].release()  # idempotente
+    assert controller.in_flight == 1
+    _admit(controller, 1)
+
+
+def test_reserves_headroom_for_ongoing_conversations(memory):
+    controller = AdmissionController(max_in_flight=4, new_session_ratio=0.5)
+    _admit(controller, 2, 3)
+    with pytest.raises(AdmissionRejected) as excinfo:
+        _admit(controller, 4)
+    assert (excinfo.value.status_code, excinfo.value.reason) == (429, "new_session")
+    _admit(controller, 1)  # sesión con historial: usa el cupo reservado
+    assert controller.in_flight == 3
+
+
+def test_sheds_new_sessions_when_latency_exceeds_target(memory):
+    controller = AdmissionController(max_in_flight=10, latency_target=1.0, retry_after_max=5)
+    controller._ewma = 12.0
+    with pytest.raises(AdmissionRejected) as excinfo:
+        _admit(controller, 2)
+    assert (excinfo.value.status_code, excinfo.value.reason) == (503, "latency")
+    assert excinfo.value.retry_after == 5
+    _admit(controller, 1)
+
+
+def test_latency_estimate_decays_while_idle(memory, monkeypatch):
+    controller = AdmissionController()
+    controller._ewma = 8.0
+    now = A.time.monotonic()
+    monkeypatch.setattr(A.time, "monotonic", lambda: now + A._EWMA_HALF_LIFE)
+    controller._ewma_at = now
+    assert controller.latency() == pytest.approx(4.0)
+
+
+def test_disabled_controller_admits_everything(memory):
+    controller = AdmissionController(enabled=False, max_in_flight=1)
+    assert len(_admit(controller, 2, 3, 4)) == 3
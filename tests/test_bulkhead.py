@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from orquestador.infrastructure.bulkhead import Bulkhead, BulkheadFull
+
+
+async def _hold(bulkhead, entered, release):
+    async with bulkhead.acquire():
+        entered.set()
+        await release.wait()
+
+
+def test_queued_call_runs_when_a_slot_frees_up():
+    async def scenario():
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=1, queue_timeout=1.0)
+        entered, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(bulkhead, entered, release))
+        await entered.wait()
+
+        async def queued():
+            async with bulkhead.acquire():
+                return bulkhead.stats()
+
+        waiter = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+        assert bulkhead.stats()["waiting"] == 1
+        release.set()
+        stats = await waiter
+        await holder
+        return stats, bulkhead.stats()
+
+    during, after = asyncio.run(scenario())
+    assert during["in_flight"] == 1 and during["waiting"] == 0
+    assert after["in_flight"] == 0
+
+
+def test_rejects_immediately_when_queue_is_full():
+    async def scenario():
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=0)
+        entered, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(bulkhead, entered, release))
+        await entered.wait()
+        try:
+            with pytest.raises(BulkheadFull) as excinfo:
+                async with bulkhead.acquire():
+                    pass
+            return excinfo.value.reason
+        finally:
+            release.set()
+            await holder
+
+    assert asyncio.run(scenario()) == "queue_full"
+
+
+def test_rejects_when_queue_wait_times_out():
+    async def scenario():
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        entered, release = asyncio.Event(), asyncio.Event()
+        holder = asyncio.create_task(_hold(bulkhead, entered, release))
+        await entered.wait()
+        try:
+            with pytest.raises(BulkheadFull) as excinfo:
+                async with bulkhead.acquire():
+                    pass
+            return excinfo.value.reason, bulkhead.stats()["waiting"]
+        finally:
+            release.set()
+            await holder
+
+    assert asyncio.run(scenario()) == ("queue_timeout", 0)
+
+
+def test_slot_is_released_when_the_call_fails():
+    async def scenario():
+        bulkhead = Bulkhead("test", max_concurrent=1)
+        with pytest.raises(RuntimeError):
+            async with bulkhead.acquire():
+                raise RuntimeError("boom")
+        async with bulkhead.acquire():
+            return bulkhead.stats()["in_flight"]
+
+    assert asyncio.run(scenario()) == 1
@@ -0,0 +1,93 @@
+import pytest
+
+from orquestador.infrastructure import circuit_breaker as CB
+from orquestador.infrastructure.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(CB, "time", clock)
+    return clock
+
+
+def _breaker(**kwargs):
+    options = dict(window_size=10, window_seconds=60, min_calls=4, failure_rate_threshold=0.5, reset_timeout=30)
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_on_failure_rate_despite_interleaved_successes(clock):
+    breaker = _breaker()
+    for ok in (True, False, True, False):
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.can_attempt()
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_opens_on_slow_call_rate(clock):
+    breaker = _breaker(slow_call_seconds=2.0, slow_call_rate_threshold=0.75)
+    for duration in (3.0, 3.0, 0.1, 3.0):
+        breaker.record_success(duration)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 61
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failure_count == 1
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = _breaker(half_open_max_calls=1)
+    breaker._transition(CircuitState.OPEN, "test")
+    clock.now += 31
+    assert breaker.can_attempt()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert not breaker.can_attempt()  # una sola prueba a la vez
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now += 31
+    assert breaker.can_attempt()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.snapshot()["calls"] == 0
+
+
+def test_stuck_probe_is_rearmed_after_reset_timeout(clock):
+    breaker = _breaker(half_open_max_calls=1)
+    breaker._transition(CircuitState.OPEN, "test")
+    clock.now += 31
+    assert breaker.can_attempt()
+    clock.now += 31
+    assert breaker.can_attempt()
+
+
+def test_release_returns_the_probe(clock):
+    breaker = _breaker(half_open_max_calls=1)
+    breaker._transition(CircuitState.OPEN, "test")
+    clock.now += 31
+    assert breaker.can_attempt()
+    breaker.release()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.can_attempt()
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from cachetools import LRUCache, TTLCache
+
+from orquestador.integrations import contexto_negocio as CN
+
+_real_sleep = asyncio.sleep
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """Endpoint fake: responses[id_empresa] es el contexto (None = error 500); calls registra los fetch."""
+    responses = {}
+    calls = []
+
+    async def handler(request):
+        id_empresa = json.loads(request.content)["id_empresa"]
+        calls.append(id_empresa)
+        await _real_sleep(0.01)
+        contexto = responses.get(id_empresa, "contexto")
+        if contexto is None:
+            return httpx.Response(500)
+        return httpx.Response(200, json={"success": True, "contexto_negocio": contexto})
+
+    async def get_http_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def no_backoff(seconds):
+        pass
+
+    monkeypatch.setattr(CN, "get_http_client", get_http_client)
+    monkeypatch.setattr(CN, "_fetch_semaphore", asyncio.Semaphore(10))
+    monkeypatch.setattr(CN, "_contexto_cache", TTLCache(maxsize=10, ttl=3600))
+    monkeypatch.setattr(CN, "_contexto_breakers", LRUCache(maxsize=10))
+    monkeypatch.setattr(CN.asyncio, "sleep", no_backoff)
+    return responses, calls
+
+
+def test_concurrent_misses_fetch_once_per_empresa(endpoint):
+    _, calls = endpoint
+
+    async def scenario():
+        return await asyncio.gather(*(CN.fetch_contexto_negocio(i) for i in (1, 1, 1, 2, 2)))
+
+    assert asyncio.run(scenario()) == ["contexto"] * 5
+    assert sorted(calls) == [1, 2]
+
+
+def _seed(id_empresa, contexto, age):
+    CN._contexto_cache[id_empresa] = (contexto, CN.time.monotonic() - age)
+
+
+def test_fresh_entry_is_served_without_fetching(endpoint):
+    _, calls = endpoint
+    _seed(1, "cacheado", age=0)
+    assert asyncio.run(CN.fetch_contexto_negocio(1)) == "cacheado"
+    assert calls == []
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(endpoint):
+    responses, calls = endpoint
+    responses[1] = "nuevo"
+    _seed(1, "viejo", age=CN._CONTEXTO_SOFT_TTL + 1)
+
+    async def scenario():
+        stale = await CN.fetch_contexto_negocio(1)
+        # Mientras el refresco está en vuelo no se lanza otro
+        again = await CN.fetch_contexto_negocio(1)
+        await asyncio.gather(*CN._refresh_tasks)
+        return stale, again, await CN.fetch_contexto_negocio(1)
+
+    assert asyncio.run(scenario()) == ("viejo", "viejo", "nuevo")
+    assert calls == [1]
+
+
+def test_failed_refresh_keeps_serving_the_stale_entry(endpoint):
+    responses, calls = endpoint
+    responses[1] = None
+    _seed(1, "viejo", age=CN._CONTEXTO_SOFT_TTL + 1)
+
+    async def scenario():
+        await CN.fetch_contexto_negocio(1)
+        await asyncio.gather(*CN._refresh_tasks)
+        return await CN.fetch_contexto_negocio(1)
+
+    assert asyncio.run(scenario()) == "viejo"
+    assert calls  # se intentó refrescar
@@ -0,0 +1,25 @@
+from orquestador.services.decision_cache import DecisionCache, fuzzy_normalize
+
+
+def test_fuzzy_normalize_collapses_elongated_letters():
+    assert fuzzy_normalize("Holaaa!!") == "hola"
+    assert fuzzy_normalize("graciasss") == "gracias"
+
+
+def test_fuzzy_normalize_keeps_repeated_digits():
+    assert fuzzy_normalize("quiero 1000 soles") == "quiero 1000 soles"
+    assert fuzzy_normalize("quiero 1000 soles") != fuzzy_normalize("quiero 10 soles")
+
+
+def test_messages_differing_only_in_digits_get_different_keys():
+    cache = DecisionCache()
+    key_1000 = cache.make_key("prefix", "quiero 1000 soles", has_memory=False)
+    key_10 = cache.make_key("prefix", "quiero 10 soles", has_memory=False)
+    assert key_1000 is not None and key_10 is not None
+    assert key_1000 != key_10
+
+
+def test_turns_with_history_are_not_cached():
+    cache = DecisionCache()
+    assert cache.make_key("prefix", "sí", has_memory=True) is None
+    assert cache.make_key("prefix", "sí", has_memory=False) is not None
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from orquestador.infrastructure.hedging import Hedger, LatencyTracker
+
+
+def _calls(*delays):
+    """Factory de llamadas: la i-ésima tarda delays[i] y devuelve i; registra las canceladas."""
+    started, cancelled = [], []
+
+    async def call(index):
+        try:
+            await asyncio.sleep(delays[index])
+            return index
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+
+    def make_call():
+        started.append(len(started))
+        return call(started[-1])
+
+    return make_call, started, cancelled
+
+
+def test_fast_primary_does_not_hedge():
+    make_call, started, _ = _calls(0.0)
+    hedger = Hedger("test", default_delay=0.05)
+    assert asyncio.run(hedger.run(make_call, timeout=1.0)) == 0
+    assert started == [0]
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    make_call, started, cancelled = _calls(1.0, 0.0)
+    hedger = Hedger("test", default_delay=0.05)
+    assert asyncio.run(hedger.run(make_call, timeout=2.0)) == 1
+    assert started == [0, 1]
+    assert cancelled == [0]
+
+
+def test_budget_limits_hedges():
+    hedger = Hedger("test", default_delay=0.01, budget_ratio=0.1)
+
+    async def scenario():
+        hedged = 0
+        for _ in range(3):
+            make_call, started, _ = _calls(0.05, 0.0)
+            await hedger.run(make_call, timeout=1.0)
+            hedged += len(started) - 1
+        return hedged
+
+    # El token inicial alcanza para un hedge; 0.1 por llamada no junta otro en 3 llamadas
+    assert asyncio.run(scenario()) == 1
+
+
+def test_timeout_covers_primary_and_hedge():
+    make_call, started, cancelled = _calls(1.0, 1.0)
+    hedger = Hedger("test", default_delay=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(hedger.run(make_call, timeout=0.05))
+    assert sorted(cancelled) == [0, 1]
+
+
+def test_failing_primary_falls_back_to_the_hedge():
+    started = []
+
+    async def call(index):
+        if index == 0:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primaria falló")
+        await asyncio.sleep(0.1)
+        return "hedge"
+
+    def make_call():
+        started.append(len(started))
+        return call(started[-1])
+
+    hedger = Hedger("test", default_delay=0.01)
+    assert asyncio.run(hedger.run(make_call, timeout=1.0)) == "hedge"
+
+
+def test_latency_tracker_needs_enough_samples():
+    tracker = LatencyTracker()
+    for i in range(19):
+        tracker.record(float(i))
+    assert tracker.percentile(0.95) is None
+    for i in range(19, 100):
+        tracker.record(float(i))
+    assert tracker.percentile(0.95) == 95.0
+    assert tracker.percentile(1.0) == 99.0
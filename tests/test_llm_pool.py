@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import HumanMessage
+
+from orquestador.infrastructure import metrics as app_metrics
+from orquestador.infrastructure.circuit_breaker import CircuitState
+from orquestador.integrations import llm as L
+from orquestador.integrations.rate_limiter import OpenAIRateLimiter, OpenAIThrottledError
+
+_DECISION = {"action": "respond", "agent_name": None, "response": "hola"}
+
+
+def _completion(message, finish_reason="stop"):
+    return httpx.Response(200, json={
+        "id": "x", "object": "chat.completion", "created": 0, "model": "m",
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    })
+
+
+_RESPONSES = {
+    "ok": lambda: _completion({"role": "assistant", "content": json.dumps(_DECISION)}),
+    "length": lambda: _completion({"role": "assistant", "content": '{"action": "resp'}, "length"),
+    "refusal": lambda: _completion({"role": "assistant", "content": None, "refusal": "no"}),
+    "429": lambda: httpx.Response(429, headers={"retry-after": "30"}, json={"error": {"message": "slow down"}}),
+    "401": lambda: httpx.Response(401, json={"error": {"message": "invalid api key"}}),
+}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Pool "primary" → "fallback" (otro base_url); behaviour[modelo] elige la respuesta fake."""
+    behaviour = {}
+    calls = []
+
+    def handler(request):
+        model = json.loads(request.content)["model"]
+        calls.append(model)
+        return _RESPONSES[behaviour.get(model, "ok")]()
+
+    real_chat_openai = L.ChatOpenAI
+
+    def chat_openai(**kwargs):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return real_chat_openai(http_async_client=client, **kwargs)
+
+    monkeypatch.setattr(L, "ChatOpenAI", chat_openai)
+    monkeypatch.setattr(L, "_models", None)
+    monkeypatch.setattr(L, "openai_rate_limiter", OpenAIRateLimiter(rpm=0, tpm=0))
+    monkeypatch.setattr(L.app_config, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(L.app_config, "OPENAI_MODEL", "primary")
+    monkeypatch.setattr(L.app_config, "OPENAI_BASE_URL", "")
+    monkeypatch.setattr(L.app_config, "OPENAI_MODEL_FALLBACKS", "fallback||https://alt.example.com/v1")
+    return behaviour, calls
+
+
+def _invoke():
+    return asyncio.run(L.invoke_orquestador_messages([HumanMessage(content="hola")]))
+
+
+@pytest.mark.parametrize("failure", ["length", "refusal"])
+def test_structured_output_failures_escalate(pool, failure):
+    behaviour, calls = pool
+    behaviour["primary"] = failure
+    assert _invoke() == ("hola", None)
+    assert calls == ["primary", "fallback"]
+
+
+def test_output_parser_exception_escalates(pool):
+    _, calls = pool
+
+    class BrokenParser:
+        async def ainvoke(self, messages):
+            raise OutputParserException("JSON inválido")
+
+    primary = asyncio.run(L._get_model_pool())[0]
+    primary.structured = BrokenParser()
+    assert _invoke() == ("hola", None)
+    assert calls == ["fallback"]
+
+
+def test_missing_parsed_decision_escalates(pool):
+    _, calls = pool
+
+    class NoDecision:
+        async def ainvoke(self, messages):
+            return None
+
+    primary = asyncio.run(L._get_model_pool())[0]
+    primary.structured = NoDecision()
+    assert _invoke() == ("hola", None)
+    assert calls == ["fallback"]
+
+
+def test_rate_limit_pause_is_scoped_to_the_throttled_model(pool):
+    behaviour, calls = pool
+    behaviour["primary"] = "429"
+    assert _invoke() == ("hola", None)
+    assert calls == ["primary", "fallback"]
+    assert L.openai_rate_limiter.paused_for("primary") > 0
+    assert L.openai_rate_limiter.paused_for("fallback@alt.example.com") == 0
+
+    # Mientras dura la pausa, el primario se saltea sin llamarlo
+    calls.clear()
+    assert _invoke() == ("hola", None)
+    assert calls == ["fallback"]
+
+
+def _slots():
+    return asyncio.run(L._get_model_pool())
+
+
+def _half_open(breaker):
+    breaker._transition(CircuitState.OPEN, "test")
+    breaker.opened_at = 0.0
+
+
+def test_non_escalating_error_records_probe_failure(pool):
+    behaviour, calls = pool
+    behaviour["primary"] = "401"
+    primary = _slots()[0]
+    _half_open(primary.breaker)
+    with pytest.raises(Exception):
+        _invoke()
+    assert calls == ["primary"]
+    assert primary.breaker.state == CircuitState.OPEN
+
+
+def test_local_throttle_returns_the_probe(pool, monkeypatch):
+    _, calls = pool
+    primary = _slots()[0]
+    _half_open(primary.breaker)
+
+    async def throttled(*args, **kwargs):
+        raise OpenAIThrottledError("sin cupo", retry_after=1.0)
+
+    monkeypatch.setattr(L.openai_rate_limiter, "acquire", throttled)
+    with pytest.raises(OpenAIThrottledError):
+        _invoke()
+    assert calls == []
+    assert primary.breaker.state == CircuitState.HALF_OPEN
+    assert primary.breaker.can_attempt()
+
+
+def test_last_resort_call_is_not_counted_as_rejected(pool):
+    _, calls = pool
+    slots = _slots()
+    for slot in slots:
+        slot.breaker._transition(CircuitState.OPEN, "test")
+    rejected = app_metrics.circuit_breaker_rejected_total.labels(name=slots[-1].breaker.name)
+    before = rejected._value.get()
+    assert _invoke() == ("hola", None)
+    assert calls == ["fallback"]
+    assert rejected._value.get() == before
+    assert slots[-1].breaker.state == CircuitState.OPEN
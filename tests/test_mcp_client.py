@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+from orquestador.integrations import mcp_client
+
+
+def _fresh_agent(monkeypatch, agent="venta"):
+    monkeypatch.setattr(mcp_client.app_config, "MCP_VENTA_ENABLED", True)
+    monkeypatch.setattr(mcp_client.app_config, "MCP_VENTA_URL", "http://localhost:1/mcp")
+    monkeypatch.setitem(mcp_client._tools_index, agent, mcp_client._ServerTools())
+    mcp_client._circuit_breakers.pop(agent, None)
+    return mcp_client._tools_index[agent]
+
+
+def test_tools_in_backoff_go_to_fallback_without_retries_or_breaker(monkeypatch):
+    state = _fresh_agent(monkeypatch)
+    state.failures = 3
+    state.retry_at = time.monotonic() + 60
+
+    start = time.monotonic()
+    result = asyncio.run(mcp_client.invoke_mcp_agent("venta", "hola", 1))
+
+    assert result is None
+    assert time.monotonic() - start < 0.5
+    assert mcp_client._get_circuit_breaker("venta").snapshot()["calls"] == 0
+
+
+def test_empty_reply_in_half_open_reopens_the_circuit(monkeypatch):
+    _fresh_agent(monkeypatch)
+    breaker = mcp_client._get_circuit_breaker("venta")
+    breaker._transition(mcp_client.CircuitState.OPEN, "test")
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    calls = []
+
+    async def empty_reply(*args, **kwargs):
+        calls.append(args)
+        return None
+
+    monkeypatch.setattr(mcp_client, "_invoke_mcp_agent_internal", empty_reply)
+    result = asyncio.run(mcp_client.invoke_mcp_agent("venta", "hola", 1))
+
+    assert result is None
+    assert len(calls) == 1
+    assert breaker.state == mcp_client.CircuitState.OPEN
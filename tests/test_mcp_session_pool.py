@@ -0,0 +1,93 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from orquestador.integrations.mcp_session_pool import MCPSessionPool
+
+
+class FakeSession:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def call_tool(self, release):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await release.wait()
+        finally:
+            self.in_flight -= 1
+
+    async def send_ping(self):
+        return None
+
+
+class FakeClient:
+    def __init__(self):
+        self.sessions = []
+
+    @asynccontextmanager
+    async def session(self, server_name):
+        session = FakeSession()
+        self.sessions.append(session)
+        yield session
+
+
+def test_concurrent_calls_share_sessions_beyond_pool_size():
+    async def scenario():
+        client = FakeClient()
+        pool = MCPSessionPool(client, "venta", size=2)
+        release = asyncio.Event()
+
+        async def call():
+            async with pool.session() as session:
+                await session.call_tool(release)
+
+        calls = [asyncio.create_task(call()) for _ in range(10)]
+        await asyncio.sleep(0.05)
+        # Las 10 llamadas están en curso a la vez sobre solo 2 sesiones
+        in_flight = sum(s.in_flight for s in client.sessions)
+        opened = len(client.sessions)
+        release.set()
+        await asyncio.gather(*calls)
+        stats = pool.stats()
+        await pool.aclose()
+        return in_flight, opened, stats
+
+    in_flight, opened, stats = asyncio.run(scenario())
+    assert in_flight == 10
+    assert opened == 2
+    assert stats == {"open": 2, "in_use": 0, "size": 2}
+
+
+def test_failed_call_retires_session_after_concurrent_calls_finish():
+    async def scenario():
+        client = FakeClient()
+        pool = MCPSessionPool(client, "venta", size=1)
+        release = asyncio.Event()
+
+        async def ok_call():
+            async with pool.session() as session:
+                await session.call_tool(release)
+
+        async def failing_call():
+            async with pool.session():
+                raise RuntimeError("transporte caído")
+
+        survivor = asyncio.create_task(ok_call())
+        await asyncio.sleep(0.01)
+        try:
+            await failing_call()
+        except RuntimeError:
+            pass
+        # La sesión salió del pool pero la llamada en curso sigue usándola
+        open_after_failure = pool.stats()["open"]
+        release.set()
+        await survivor
+        async with pool.session():
+            pass
+        await pool.aclose()
+        return open_after_failure, len(client.sessions)
+
+    open_after_failure, opened = asyncio.run(scenario())
+    assert open_after_failure == 0
+    assert opened == 2
@@ -0,0 +1,71 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from orquestador.services import memory as M
+from orquestador.services.memory import RedisMemoryBackend, Turn
+
+
+@pytest.fixture
+def backend():
+    return RedisMemoryBackend(fakeredis.aioredis.FakeRedis(decode_responses=True), key_prefix="test:", ttl=60)
+
+
+def test_append_and_get_round_trip(backend):
+    async def scenario():
+        await backend.append(1, Turn("hola", None, "¿en qué te ayudo?", timestamp=1.0))
+        await backend.append(1, Turn("quiero comprar", "venta", "claro", timestamp=2.0))
+        return await backend.get(1, limit=10)
+
+    turns = asyncio.run(scenario())
+    assert [(t.user, t.agent, t.response, t.timestamp) for t in turns] == [
+        ("hola", None, "¿en qué te ayudo?", 1.0),
+        ("quiero comprar", "venta", "claro", 2.0),
+    ]
+
+
+def test_get_returns_latest_turns_oldest_first(backend):
+    async def scenario():
+        for i in range(5):
+            await backend.append(1, Turn(f"m{i}", None, f"r{i}"))
+        return await backend.get(1, limit=2), await backend.get(1, limit=0)
+
+    latest, none = asyncio.run(scenario())
+    assert [t.user for t in latest] == ["m3", "m4"]
+    assert none == []
+
+
+def test_append_trims_to_max_turns(backend):
+    async def scenario():
+        for i in range(M._MAX_TURNS + 3):
+            await backend.append(1, Turn(f"m{i}", None, ""))
+        return await backend._redis.llen("test:1"), await backend.get(1, limit=100)
+
+    length, turns = asyncio.run(scenario())
+    assert length == M._MAX_TURNS
+    assert turns[0].user == "m3"
+
+
+def test_append_renews_session_ttl(backend):
+    async def scenario():
+        await backend.append(1, Turn("hola", None, ""))
+        await backend._redis.expire("test:1", 5)
+        await backend.append(1, Turn("sigo acá", None, ""))
+        return await backend._redis.ttl("test:1")
+
+    assert 55 < asyncio.run(scenario()) <= 60
+
+
+def test_clear_only_removes_that_session(backend):
+    async def scenario():
+        await backend.append(1, Turn("a", None, ""))
+        await backend.append(2, Turn("b", None, ""))
+        await backend.clear(1)
+        return await backend.get(1, limit=10), await backend.get(2, limit=10), await backend.get_stats()
+
+    first, second, stats = asyncio.run(scenario())
+    assert first == []
+    assert [t.user for t in second] == ["b"]
+    assert stats["total_sessions"] == 1
+    assert stats["sessions"] == {"2": 1}
@@ -0,0 +1,39 @@
+from orquestador.config import config as app_config
+from orquestador.prompts import _fit_history, get_orquestador_prefix
+from orquestador.services.memory import Turn
+
+_EMPRESA = {
+    "nombre_bot": "Ana",
+    "id_empresa": 1,
+    "rol_bot": "asistente",
+    "tipo_bot": "ventas",
+    "objetivo_principal": "vender",
+    "modalidad": "Ventas",
+}
+
+
+def test_users_of_the_same_empresa_share_the_prefix_key():
+    first = get_orquestador_prefix(
+        {**_EMPRESA, "usuario_id": 10, "correo_usuario": "a@x.com", "fecha_iso": "2026-01-01"},
+        "Tienda de ropa",
+    )
+    second = get_orquestador_prefix(
+        {**_EMPRESA, "usuario_id": 20, "correo_usuario": "b@x.com", "fecha_iso": "2026-01-02"},
+        "Tienda de ropa",
+    )
+    assert first.key == second.key
+    assert first is second
+
+
+def test_rendered_fields_change_the_prefix_key():
+    base = get_orquestador_prefix(_EMPRESA, "Tienda de ropa")
+    assert get_orquestador_prefix({**_EMPRESA, "frase_saludo": "Buenas"}, "Tienda de ropa").key != base.key
+    assert get_orquestador_prefix({**_EMPRESA, "modalidad": "Citas"}, "Tienda de ropa").key != base.key
+    assert get_orquestador_prefix(_EMPRESA, "Otra tienda").key != base.key
+
+
+def test_history_max_turns_zero_means_no_history(monkeypatch):
+    monkeypatch.setattr(app_config, "PROMPT_HISTORY_MAX_TURNS", 0)
+    kept, omitted = _fit_history([Turn("hola", None, "buenas"), Turn("precio?", "venta", "10")])
+    assert kept == []
+    assert omitted == 0
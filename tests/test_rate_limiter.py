@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from orquestador.integrations import rate_limiter as RL
+from orquestador.integrations.rate_limiter import OpenAIRateLimiter, OpenAIThrottledError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(RL, "time", clock)
+    monkeypatch.setattr(RL.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_rpm_allows_a_burst_then_queues(clock):
+    # 60 RPM → 1 por segundo, ráfaga de 10
+    limiter = OpenAIRateLimiter(rpm=60, tpm=0)
+
+    async def scenario():
+        return [await limiter.acquire(0, max_wait=5.0) for _ in range(12)]
+
+    waits = asyncio.run(scenario())
+    assert waits[:10] == [0.0] * 10
+    assert waits[10:] == pytest.approx([1.0, 1.0])
+
+
+def test_rejects_without_reserving_when_wait_exceeds_max_wait(clock):
+    limiter = OpenAIRateLimiter(rpm=0, tpm=600)  # 10 tokens/s, ráfaga de 100
+
+    async def scenario():
+        await limiter.acquire(100, max_wait=0.0)
+        with pytest.raises(OpenAIThrottledError) as excinfo:
+            await limiter.acquire(50, max_wait=1.0)
+        assert excinfo.value.retry_after == pytest.approx(5.0)
+        # El rechazo no consumió cupo: 2 s después alcanza para 20 tokens
+        clock.now += 2.0
+        return await limiter.acquire(20, max_wait=0.0)
+
+    assert asyncio.run(scenario()) == 0.0
+
+
+def test_oversized_request_only_waits_for_a_full_bucket(clock):
+    limiter = OpenAIRateLimiter(rpm=0, tpm=600)
+    assert asyncio.run(limiter.acquire(10_000, max_wait=0.0)) == 0.0
+
+
+def test_pause_only_affects_its_scope(clock):
+    limiter = OpenAIRateLimiter(rpm=0, tpm=0)
+    limiter.pause_until(clock.now + 30, scope="primary")
+    assert limiter.paused_for("primary") == pytest.approx(30.0)
+    assert limiter.paused_for("fallback") == 0.0
+
+    async def scenario():
+        assert await limiter.acquire(1, max_wait=0.0, scope="fallback") == 0.0
+        with pytest.raises(OpenAIThrottledError):
+            await limiter.acquire(1, max_wait=10.0, scope="primary")
+
+    asyncio.run(scenario())
+
+
+def test_estimate_tokens_counts_prompt_and_completion():
+    limiter = OpenAIRateLimiter(rpm=0, tpm=0, completion_tokens=100)
+    assert limiter.estimate_tokens([HumanMessage(content="x" * 400)]) == 200
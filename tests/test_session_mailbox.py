@@ -0,0 +1,82 @@
+import asyncio
+
+from orquestador.services.session_mailbox import SessionMailbox
+
+
+def test_running_step_is_cancelled_when_its_only_caller_leaves():
+    async def scenario():
+        mailbox = SessionMailbox()
+        started = asyncio.Event()
+        outcome = []
+
+        async def process(message):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+                outcome.append("finished")
+            except asyncio.CancelledError:
+                outcome.append("cancelled")
+                raise
+
+        caller = asyncio.create_task(mailbox.submit(1, "hola", process))
+        await started.wait()
+        caller.cancel()
+        await asyncio.sleep(0.01)
+        return outcome, mailbox.active_sessions()
+
+    outcome, active = asyncio.run(scenario())
+    assert outcome == ["cancelled"]
+    assert active == 0
+
+
+def test_queued_item_is_dropped_and_next_turn_still_runs():
+    async def scenario():
+        mailbox = SessionMailbox()
+        processed = []
+        release = asyncio.Event()
+
+        async def process(message):
+            processed.append(message)
+            if message == "primero":
+                await release.wait()
+            return message
+
+        first = asyncio.create_task(mailbox.submit(1, "primero", process))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(mailbox.submit(1, "segundo", process))
+        third = asyncio.create_task(mailbox.submit(1, "tercero", process))
+        await asyncio.sleep(0)
+        second.cancel()
+        release.set()
+        return processed, await first, await third
+
+    processed, first, third = asyncio.run(scenario())
+    assert processed == ["primero", "tercero"]
+    assert first == ("primero", True)
+    assert third == ("tercero", True)
+
+
+def test_remaining_coalesced_caller_owns_the_result_when_the_last_leaves():
+    async def scenario():
+        mailbox = SessionMailbox(window_seconds=0.01)
+        started = asyncio.Event()
+        owners = []
+
+        def process_for(caller):
+            async def process(message):
+                owners.append(caller)
+                started.set()
+                await asyncio.sleep(0.05)
+                return message
+            return process
+
+        first = asyncio.create_task(mailbox.submit(1, "a", process_for("a")))
+        second = asyncio.create_task(mailbox.submit(1, "b", process_for("b")))
+        await started.wait()
+        second.cancel()
+        return await first, owners
+
+    result, owners = asyncio.run(scenario())
+    assert result == ("a\nb", True)
+    # El paso se repitió con el process del caller que sigue esperando
+    assert owners == ["b", "a"]
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from orquestador.infrastructure.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "contexto"
+
+    async def scenario():
+        group = SingleFlight("test")
+        results = await asyncio.gather(*(group.do(1, fetch) for _ in range(5)))
+        return results, group.in_flight(1)
+
+    results, in_flight = asyncio.run(scenario())
+    assert results == ["contexto"] * 5
+    assert calls == [1]
+    assert not in_flight
+
+
+def test_different_keys_do_not_coalesce():
+    calls = []
+
+    async def scenario():
+        group = SingleFlight("test")
+
+        async def fetch(key):
+            calls.append(key)
+            return key
+
+        return await asyncio.gather(group.do(1, lambda: fetch(1)), group.do(2, lambda: fetch(2)))
+
+    assert asyncio.run(scenario()) == [1, 2]
+    assert sorted(calls) == [1, 2]
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_execution():
+    async def scenario():
+        group = SingleFlight("test")
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "contexto"
+
+        first = asyncio.create_task(group.do(1, fetch))
+        second = asyncio.create_task(group.do(1, fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return first, await second
+
+    first, result = asyncio.run(scenario())
+    assert first.cancelled()
+    assert result == "contexto"
+
+
+def test_error_reaches_every_waiter_and_key_is_forgotten():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        group = SingleFlight("test")
+        results = await asyncio.gather(group.do(1, failing), group.do(1, failing), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await group.do(1, failing)
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == [1, 1]
@@ -0,0 +1,41 @@
+import asyncio
+
+from orquestador.api import main
+from orquestador.infrastructure import metrics as app_metrics
+
+
+def _discarded(agent, state):
+    return app_metrics.speculative_mcp_discarded_total.labels(agent=agent, state=state)._value.get()
+
+
+def test_discard_waits_for_cancelled_specialist():
+    finished = []
+
+    async def specialist():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            finished.append(True)
+
+    async def scenario():
+        task = asyncio.create_task(specialist())
+        await asyncio.sleep(0)
+        await main._discard_speculation(task, "test_cancelled", "respond")
+        return task
+
+    before = _discarded("test_cancelled", "cancelled")
+    task = asyncio.run(scenario())
+    assert task.cancelled()
+    assert finished == [True]
+    assert _discarded("test_cancelled", "cancelled") == before + 1
+
+
+def test_discard_counts_specialist_that_already_answered():
+    async def scenario():
+        task = asyncio.create_task(asyncio.sleep(0, result="respuesta"))
+        await asyncio.sleep(0.01)
+        await main._discard_speculation(task, "test_completed", "respond")
+
+    before = _discarded("test_completed", "completed")
+    asyncio.run(scenario())
+    assert _discarded("test_completed", "completed") == before + 1
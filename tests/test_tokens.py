@@ -0,0 +1,34 @@
+import threading
+
+from orquestador.prompts import tokens
+
+
+class _Encoding:
+    name = "fake"
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+    def decode(self, parts):
+        return " ".join(parts)
+
+
+def test_count_tokens_does_not_block_while_the_encoder_loads(monkeypatch):
+    release = threading.Event()
+
+    def slow_encoding_for_model(model):
+        release.wait(5)
+        return _Encoding()
+
+    monkeypatch.setattr(tokens, "_encoder", None)
+    monkeypatch.setattr(tokens, "_encoder_ready", threading.Event())
+    monkeypatch.setattr(tokens, "_load_started", False)
+    monkeypatch.setattr(tokens, "TIKTOKEN_AVAILABLE", True)
+    monkeypatch.setattr(tokens.tiktoken, "encoding_for_model", slow_encoding_for_model)
+
+    # Mientras carga: estimación por caracteres (8 caracteres / 4), sin esperar
+    assert tokens.count_tokens("uno dos!") == 2
+    release.set()
+    assert tokens.warmup_tokenizer() is True
+    assert tokens.count_tokens("uno dos!") == 2
+    assert tokens.count_tokens("uno dos tres") == 3